@@ -1,25 +1,35 @@
 """
 Backfill amount_usd on deposit records using historical GBP/USD rates from Tiingo.
 
-For each deposit month, fetches the GBP/USD close rate from Tiingo's forex
-historical endpoint, then computes amount_usd = amount_gbp * gbpusd_rate.
+For each deposit month, looks up the GBP/USD close rate (or the nearest prior
+trading day's) and computes amount_usd = amount_gbp * gbpusd_rate. Rates come
+from a local store (utils/fx_store.py) that only asks Tiingo's forex
+historical endpoint for the days it has not seen yet, so re-runs on the same
+day make no Tiingo requests.
 
 Usage:
-    python scripts/backfill_deposit_usd.py          # dry run (shows what would change)
-    python scripts/backfill_deposit_usd.py --apply   # actually update NocoDB
+    python scripts/backfill_deposit_usd.py            # dry run (shows what would change)
+    python scripts/backfill_deposit_usd.py --offline  # dry run from the local mirror only
+    python scripts/backfill_deposit_usd.py --apply    # actually update NocoDB
+
+Dry runs read deposits from the local SQLite mirror (utils/mirror.py),
+refreshing it incrementally first unless --offline is given. --offline also
+uses only the rates already stored locally.
 
 Requires NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_TABLE_DEPOSITS, TIINGO_API_TOKEN
 in the .env file.
 """
 
-import json
 import os
 import sys
-import time
-import urllib.request
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from pathlib import Path
 
+from utils.fx_store import FXStore, tiingo_fetcher
+from utils.mirror import Mirror
+from utils.nocodb_client import NocoDBClient, transport_options
+from utils.shadow import resolve_table_ids
+
 # ---------------------------------------------------------------------------
 # Load .env
 # ---------------------------------------------------------------------------
@@ -36,106 +46,42 @@ if env_path.exists():
 NOCODB_BASE_URL = os.environ["NOCODB_BASE_URL"]
 NOCODB_API_TOKEN = os.environ["NOCODB_API_TOKEN"]
 NOCODB_TABLE_DEPOSITS = os.environ["NOCODB_TABLE_DEPOSITS"]
+NOCODB_TABLE_SETTINGS = os.environ.get("NOCODB_TABLE_SETTINGS")
 TIINGO_API_TOKEN = os.environ["TIINGO_API_TOKEN"]
 
 DRY_RUN = "--apply" not in sys.argv
+OFFLINE = "--offline" in sys.argv
+
+client = NocoDBClient(
+    base_url=NOCODB_BASE_URL,
+    api_token=NOCODB_API_TOKEN,
+    base_id="unused",  # not needed for direct table operations
+    **transport_options(),
+)
+
+if NOCODB_TABLE_SETTINGS and not OFFLINE:
+    # Follow a deposits table swapped in by a --shadow reload
+    NOCODB_TABLE_DEPOSITS = resolve_table_ids(
+        client, NOCODB_TABLE_SETTINGS, {"deposits": NOCODB_TABLE_DEPOSITS}
+    )["deposits"]
 
 
 # ---------------------------------------------------------------------------
 # NocoDB helpers
 # ---------------------------------------------------------------------------
-def nocodb_fetch(path: str, method: str = "GET", body=None):
-    url = f"{NOCODB_BASE_URL}{path}"
-    data = json.dumps(body).encode() if body else None
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "xc-token": NOCODB_API_TOKEN,
-            "Content-Type": "application/json",
-        },
-        method=method,
-    )
-    with urllib.request.urlopen(req) as resp:
-        return json.loads(resp.read())
-
-
 def fetch_all_deposits():
-    records = []
-    offset = 0
-    while True:
-        data = nocodb_fetch(
-            f"/api/v2/tables/{NOCODB_TABLE_DEPOSITS}/records?limit=200&offset={offset}"
-        )
-        records.extend(data["list"])
-        if data["pageInfo"]["isLastPage"]:
-            break
-        offset += 200
-    return records
+    if not DRY_RUN:
+        return list(client.iter_records(NOCODB_TABLE_DEPOSITS))
+    with Mirror() as mirror:
+        if not OFFLINE or not mirror.has("deposits"):
+            fetched = mirror.refresh(client, "deposits", NOCODB_TABLE_DEPOSITS)
+            print(f"Mirror refreshed ({fetched} changed deposit records fetched)")
+        return mirror.records("deposits")
 
 
 def bulk_update(records: list[dict]):
-    """Update records in batches of 50."""
-    for i in range(0, len(records), 50):
-        batch = records[i : i + 50]
-        nocodb_fetch(
-            f"/api/v2/tables/{NOCODB_TABLE_DEPOSITS}/records",
-            method="PATCH",
-            body=batch,
-        )
-        time.sleep(0.3)  # respect rate limit
-
-
-# ---------------------------------------------------------------------------
-# Tiingo forex helper
-# ---------------------------------------------------------------------------
-def fetch_all_gbpusd_rates(start: str, end: str) -> dict[str, float]:
-    """Fetch full GBP/USD daily history from Tiingo in a single API call.
-
-    Returns a dict mapping date string (YYYY-MM-DD) to close rate.
-    Retries with exponential backoff on 429 rate limit errors.
-    """
-    url = (
-        f"https://api.tiingo.com/tiingo/fx/gbpusd/prices"
-        f"?startDate={start}&endDate={end}&resampleFreq=1day"
-    )
-
-    for attempt in range(5):
-        req = urllib.request.Request(
-            url, headers={"Authorization": f"Token {TIINGO_API_TOKEN}"}
-        )
-        try:
-            with urllib.request.urlopen(req) as resp:
-                data = json.loads(resp.read())
-            break
-        except urllib.error.HTTPError as e:
-            if e.code == 429 and attempt < 4:
-                wait = 30 * (attempt + 1)
-                print(f"  Rate limited, waiting {wait}s (attempt {attempt + 1}/5)...")
-                time.sleep(wait)
-            else:
-                raise
-    else:
-        raise RuntimeError("Failed after 5 retries")
-
-    rates = {}
-    for entry in data:
-        date_key = entry["date"][:10]
-        rates[date_key] = entry["close"]
-    return rates
-
-
-def lookup_rate(
-    all_rates: dict[str, float], target_date: str
-) -> float | None:
-    """Look up rate for a date, falling back to nearest prior trading day."""
-    dt = datetime.strptime(target_date[:10], "%Y-%m-%d")
-    # Try the exact date, then go back up to 5 days for weekends/holidays
-    for offset in range(6):
-        check = (dt - timedelta(days=offset)).strftime("%Y-%m-%d")
-        if check in all_rates:
-            return all_rates[check]
-    return None
+    """Update records using the client's adaptive batch size."""
+    client.bulk_update(NOCODB_TABLE_DEPOSITS, records)
 
 
 # ---------------------------------------------------------------------------
@@ -155,19 +101,20 @@ def main():
     print(f"Unique months: {len(months)} ({months[0]} to {months[-1]})")
     print()
 
-    # Fetch full GBP/USD history in a single API call
-    print("Fetching GBP/USD history from Tiingo (single request)...")
-    start = (datetime.strptime(months[0], "%Y-%m-%d") - timedelta(days=7)).strftime(
-        "%Y-%m-%d"
-    )
-    end = datetime.now().strftime("%Y-%m-%d")
-    all_rates = fetch_all_gbpusd_rates(start, end)
-    print(f"  Got {len(all_rates)} daily rates ({start} to {end})")
+    # Top up the local GBP/USD store with whatever it lacks
+    fx = FXStore("gbpusd", fetch=tiingo_fetcher(TIINGO_API_TOKEN))
+    start = date.fromisoformat(months[0]) - timedelta(days=7)
+    if OFFLINE:
+        print(f"Using stored GBP/USD rates only ({len(fx.observed)} days)")
+    else:
+        print("Checking local GBP/USD rate store...")
+        if not fx.ensure(start):
+            print(f"  Up to date ({len(fx.observed)} days, no Tiingo request)")
 
     # Look up rate for each deposit month
     rates: dict[str, float] = {}
     for month in months:
-        rate = lookup_rate(all_rates, month)
+        rate = fx.rate(month)
         if rate:
             rates[month] = rate
             print(f"  {month}: GBP/USD = {rate:.6f}")
@@ -236,6 +183,8 @@ def main():
         f"Old single-rate conversion (at current rate): "
         f"would vary — compare on dashboard"
     )
+    client.report_metrics()
+    client.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+"""Backfill derived columns that migrate.py leaves empty.
+
+Jobs (see utils/backfill.py for the runner):
+    option_metrics          options.profit, days_held, return_pct,
+                            annualised_return_pct (closed positions as in
+                            the app's src/lib/options-shared.ts; see
+                            option_metrics for how open ones differ)
+    snapshot_gain_loss_pct  monthly_snapshots.gain_loss_pct
+
+Run from project root:
+    python scripts/backfill_derived.py                         # dry run, all jobs
+    python scripts/backfill_derived.py --offline               # dry run from the mirror only
+    python scripts/backfill_derived.py --only option_metrics   # pick jobs
+    python scripts/backfill_derived.py --apply                 # write changed rows
+    python scripts/backfill_derived.py --apply --restart       # ignore checkpoints
+
+Only rows whose value moved by more than the output's tolerance are
+written, BACKFILL_CONCURRENCY batches at a time (default 4, independent
+of NOCODB_CONCURRENCY). An interrupted --apply run resumes after the last
+chunk it finished. Dry runs read the local SQLite mirror
+(utils/mirror.py), refreshing it first unless --offline is given.
+
+Requires NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_BASE_ID in the .env file.
+"""
+
+import os
+import sys
+
+import numpy as np
+from dotenv import load_dotenv
+from utils.backfill import (
+    BackfillJob,
+    Output,
+    day,
+    num,
+    run_backfill,
+    text,
+    today_ordinal,
+)
+from utils.mirror import Mirror
+from utils.nocodb_client import NocoDBClient, transport_options
+from utils.shadow import resolve_table_ids
+
+DRY_RUN = "--apply" not in sys.argv
+OFFLINE = "--offline" in sys.argv
+
+# Strategies sold for premium: returns are measured on collateral
+SHORT_STRATEGIES = ("Wheel", "Collar", "VPCS", "PMCC")
+
+
+# ---------------------------------------------------------------------------
+# Computations (vectorised over a chunk of records)
+# ---------------------------------------------------------------------------
+
+
+def option_metrics(c: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """profit, days_held, return_pct and annualised_return_pct.
+
+    Closed positions get exactly what the app's options-shared.ts
+    computes: profit is computeProfit (premiums are per share;
+    expired/assigned options without a closing cost closed at 0),
+    days_held is computeDaysHeld and return_pct is computeReturnPct, i.e.
+    the annualised return on collateral (strike, or spread width, x qty x
+    100) for short strategies and the simple yield on the premium paid
+    otherwise, null when days_held <= 0. annualised_return_pct has no TS
+    counterpart: return_pct for short strategies, the yield x 365 /
+    days_held for long ones.
+
+    Positions without a close_date differ: the app measures them up to
+    today, so days_held, annualised_return_pct and the short return_pct
+    are left null instead of being stored and going stale the next day.
+    """
+    sell = c["buy_sell"] == "Sell"
+    short = np.isin(c["strategy_type"], SHORT_STRATEGIES)
+    closed = ~np.isnan(c["close_date"])
+    settled = np.isin(c["status"], ("Expired", "Assigned"))
+    close = np.where(np.isnan(c["close_premium"]) & settled, 0.0, c["close_premium"])
+    per_share = np.where(sell, c["premium"] - close, close - c["premium"])
+    profit = per_share * c["qty"] * 100
+
+    # computeDaysHeld measures open positions up to today; only the
+    # days_held <= 0 guard of the long yield uses that
+    end = np.where(closed, c["close_date"], today_ordinal())
+    held = end - c["opened"]
+    days_held = np.where(closed, held, np.nan)
+
+    width = np.where(
+        np.isnan(c["outer_strike"]), c["strike"], np.abs(c["strike"] - c["outer_strike"])
+    )
+    collateral = np.where(sell, width * c["qty"] * 100, np.nan)
+    cost = c["premium"] * c["qty"] * 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        short_pct = np.where(
+            (collateral > 0) & (days_held > 0),
+            profit / collateral * 365 / days_held * 100,
+            np.nan,
+        )
+        yield_pct = np.where((cost > 0) & (held > 0), profit / cost * 100, np.nan)
+        long_annualised = np.where(days_held > 0, yield_pct * 365 / days_held, np.nan)
+    return {
+        "profit": np.round(profit, 2),
+        "days_held": days_held,
+        "return_pct": np.round(np.where(short, short_pct, yield_pct), 4),
+        "annualised_return_pct": np.round(
+            np.where(short, short_pct, long_annualised), 4
+        ),
+    }
+
+
+def snapshot_gain_loss_pct(c: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Gain/loss as a percentage of the amount invested so far.
+
+    Same rule as migrate.snapshot_gain_loss_pct: 0 when nothing was
+    invested.
+    """
+    invested = c["total_invested"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(
+            np.nan_to_num(invested) != 0, c["gain_loss"] / invested * 100, 0.0
+        )
+    return {"gain_loss_pct": np.round(pct, 4)}
+
+
+JOBS = {
+    job.name: job
+    for job in (
+        BackfillJob(
+            "option_metrics",
+            "options",
+            (
+                text("buy_sell"),
+                text("status"),
+                text("strategy_type"),
+                num("premium"),
+                num("close_premium"),
+                num("qty"),
+                num("strike"),
+                num("outer_strike"),
+                day("opened"),
+                day("close_date"),
+            ),
+            option_metrics,
+            (
+                Output("profit"),
+                Output("days_held", tolerance=0.5, uidt="Number", integer=True),
+                Output("return_pct", tolerance=1e-4),
+                Output("annualised_return_pct", tolerance=1e-4),
+            ),
+        ),
+        BackfillJob(
+            "snapshot_gain_loss_pct",
+            "monthly_snapshots",
+            (num("gain_loss"), num("total_invested")),
+            snapshot_gain_loss_pct,
+            (Output("gain_loss_pct", tolerance=1e-4),),
+        ),
+    )
+}
+
+
+def job_names(flag: str) -> set[str] | None:
+    """Comma-separated job names after ``flag`` (``--only a,b`` or ``--only=a,b``)."""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return set(sys.argv[i + 1].split(","))
+        if arg.startswith(f"{flag}="):
+            return set(arg.split("=", 1)[1].split(","))
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main():
+    load_dotenv()
+
+    base_url = os.environ.get("NOCODB_BASE_URL")
+    api_token = os.environ.get("NOCODB_API_TOKEN")
+    base_id = os.environ.get("NOCODB_BASE_ID")
+
+    if not all([base_url, api_token, base_id]):
+        print("ERROR: Missing environment variables.")
+        print("Required: NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_BASE_ID")
+        sys.exit(1)
+
+    only = job_names("--only")
+    unknown = (only or set()) - set(JOBS)
+    if unknown:
+        print(f"ERROR: Unknown job(s): {', '.join(sorted(unknown))}")
+        print(f"Jobs: {', '.join(JOBS)}")
+        sys.exit(1)
+    jobs = [job for name, job in JOBS.items() if only is None or name in only]
+
+    print("=== Backfill derived columns ===")
+    print(f"Mode: {'DRY RUN' if DRY_RUN else 'APPLY'}")
+    print()
+
+    with NocoDBClient(base_url, api_token, base_id, **transport_options()) as client:
+        existing = {t["title"]: t["id"] for t in client.list_tables()}
+        table_ids = {job.table: existing[job.table] for job in jobs if job.table in existing}
+        if "settings" in existing and not OFFLINE:
+            # Follow tables swapped in by a --shadow reload
+            table_ids = resolve_table_ids(client, existing["settings"], table_ids)
+
+        with Mirror() as mirror:
+            for job in jobs:
+                table_id = table_ids.get(job.table)
+                if table_id is None:
+                    print(f"  SKIP {job.name}: no '{job.table}' table")
+                    continue
+                records = None
+                if DRY_RUN:
+                    if not OFFLINE or not mirror.has(job.table):
+                        fetched = mirror.refresh(client, job.table, table_id)
+                        print(f"  Mirror refreshed '{job.table}' ({fetched} changed records fetched)")
+                    records = mirror.iter_records(job.table)
+                else:
+                    added = client.ensure_columns(
+                        table_id,
+                        [{"column_name": o.name, "uidt": o.uidt} for o in job.outputs],
+                    )
+                    if added:
+                        print(f"  Added {', '.join(added)} to '{job.table}'")
+
+                stats = run_backfill(
+                    client,
+                    table_id,
+                    job,
+                    apply=not DRY_RUN,
+                    records=records,
+                    resume="--restart" not in sys.argv,
+                )
+                if stats.resumed_after:
+                    print(f"  {job.name}: resumed after Id {stats.resumed_after}")
+                print(
+                    f"  {job.name:<24} {stats.scanned:>7} scanned, "
+                    f"{stats.changed:>6} changed, {stats.written:>6} written "
+                    f"({stats.elapsed:.2f}s)"
+                )
+                for sample in stats.samples:
+                    print(f"    {sample}")
+
+    print()
+    if DRY_RUN:
+        print("Dry run — no changes made. Use --apply to write to NocoDB.")
+    else:
+        print("Done!")
+    client.report_metrics()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Offline benchmarks for NocoDBClient and the migration, against a fake server.
+
+Runs every scenario against utils/fake_nocodb.FakeNocoDB, a local
+in-process stand-in for the NocoDB v2 API, so numbers are repeatable and
+never touch the production base.
+
+Run from project root:
+    python scripts/benchmark.py                          # 1k, 100k, 1M records
+    python scripts/benchmark.py --sizes 1000,100000      # pick sizes
+    python scripts/benchmark.py --latency 0.02 --concurrency 8
+    python scripts/benchmark.py --only insert,scan --json bench.json
+
+Scenarios:
+    insert        bulk_insert, sequential and with --concurrency batches in flight
+    scan          iter_records with keyset (default) and offset pagination
+    delete        delete_all_records
+    migrate       full migrate() over a synthetic workbook (needs numbers-parser)
+
+Server knobs: --latency (s/request), --rate-limit (req/s), --error-rate,
+--max-batch (413 above this many records).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Keep learned batch sizes, caches and checkpoints out of the real state dir
+os.environ["FOLIO_STATE_DIR"] = tempfile.mkdtemp(prefix="folio-bench-")
+
+from utils.batching import BatchSizer
+from utils.fake_nocodb import FakeNocoDB
+from utils.nocodb_client import NocoDBClient
+
+SCENARIOS = ("insert", "scan", "delete", "migrate")
+PLATFORMS = ["IBKR", "Trading 212", "Freetrade", "Stake", "Etoro", "Hood"]
+TICKERS = [f"T{i:03d}" for i in range(300)]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+
+def synthetic_transactions(n: int) -> list[dict]:
+    start = datetime(2015, 1, 1)
+    return [
+        {
+            "symbol": TICKERS[i % len(TICKERS)],
+            "name": f"Company {i % len(TICKERS)}",
+            "type": "Buy" if i % 7 else "Sell",
+            "price": 10 + (i % 500) * 0.37,
+            "shares": 1 + i % 40,
+            "amount": (10 + (i % 500) * 0.37) * (1 + i % 40),
+            "eps": 0.5 + (i % 9) * 0.1,
+            "date": (start + timedelta(days=i % 3650)).strftime("%Y-%m-%d"),
+            "platform": PLATFORMS[i % 4],
+        }
+        for i in range(n)
+    ]
+
+
+class SyntheticTable:
+    def __init__(self, rows: list[list]):
+        self._rows = rows
+
+    def rows(self, values_only: bool = True) -> list[list]:
+        return self._rows
+
+    def iter_rows(self, values_only: bool = True):
+        return iter(self._rows)
+
+    @property
+    def num_rows(self) -> int:
+        return len(self._rows)
+
+
+class SyntheticSheet:
+    def __init__(self, tables: dict[str, list[list]]):
+        self.tables = {name: SyntheticTable(rows) for name, rows in tables.items()}
+
+
+class SyntheticWorkbook:
+    """Mimics the workbook layout migrate.py reads (see utils.workbook_cache)."""
+
+    def __init__(self, n: int):
+        self.fingerprint = f"synthetic-{n}"
+        start = datetime(2015, 1, 1)
+        months = max(12, n // 100)
+        n_options = max(10, n // 5)
+
+        tx = [["Symbol", "Name", "Price", "Shares", "EPS", "Date", "Platform", "Amount"]]
+        for r in synthetic_transactions(n):
+            shares = -r["shares"] if r["type"] == "Sell" else r["shares"]
+            tx.append([
+                r["symbol"], r["name"], r["price"], shares, r["eps"],
+                datetime.strptime(r["date"], "%Y-%m-%d"), r["platform"], r["amount"],
+            ])
+
+        month_dates = [start + timedelta(days=31 * i) for i in range(months)]
+        deposited = [["Month", "Total", "IBKR", None, "Trading 212", "Freetrade",
+                      "Stake", "Etoro", "Hood"]]
+        tracker = [["Month", None, "Invested so far", "Portfolio Value", "Gain/Loss",
+                    "Dividend", "Options Capital", "Premium", "Options return",
+                    "Total Earnings (EPS)", "Earnings Yield"]]
+        for i, month in enumerate(month_dates):
+            deposited.append([month, 600.0, 100.0, None, 100.0, 100.0, 100.0, 100.0, 100.0])
+            invested = 600.0 * (i + 1)
+            tracker.append([month, None, invested, invested * 1.1, invested * 0.1,
+                            5.0, 20.0, 30.0, 0.01, 12.0, 0.02])
+
+        wheel = [["Ticker", "Opened", "Strategy", "C / P", "Buy/Sell", "Expiration",
+                  "Strike", "Greeks (Delta)", "Greeks (IV%)", "Moneyness", "Qty",
+                  "Premium", "Collateral", "Status", "Date Closed", "Closing Cost",
+                  "Profit", "Days Held", "Return", "Notes", "Outer Strike", "Commision"]]
+        leaps = [["Ticker", "Opened", "Strategy", "C / P", "Buy/Sell", "Expiration",
+                  "Strike", "Greeks (Delta)", "Greeks (IV%)", "Moneyness", "Qty",
+                  "Premium", "Status", "Date Closed", "Closing Cost", "Profit",
+                  "Days Held", "Profit Yield", "Commision"]]
+        for i in range(n_options):
+            opened = start + timedelta(days=i % 3000)
+            expiry = opened + timedelta(days=30)
+            base = [TICKERS[i % len(TICKERS)], opened, "Wheel", "Put" if i % 2 else "Call",
+                    "Sell", expiry, 50.0 + i % 100, 0.3, 40.0, "OTM", 1, 1.5]
+            closed = [("Closed", expiry, 0.2, 1.3, timedelta(days=30))]
+            if i % 6:
+                wheel.append(base + [5000.0, *closed[0], 0.02, "note", None, 1.0])
+            else:
+                leaps.append(base + [*closed[0], 0.2, 1.0])
+
+        portfolio = [["Company Name", "Symbol", "Sector", "Strategy"]] + [
+            [f"Company {i}", t, "Tech", "Growth"] for i, t in enumerate(TICKERS)
+        ]
+        self.sheets = {
+            "Transactions": SyntheticSheet(
+                {"Transactions": tx, "Deposited": deposited, "Montly Tracker": tracker}
+            ),
+            "Options": SyntheticSheet(
+                {"Options Wheel Strategy": wheel, "Options LEAPS": leaps}
+            ),
+            "Portfolio": SyntheticSheet({"Table 1": portfolio}),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+
+def make_client(server: FakeNocoDB, concurrency: int) -> NocoDBClient:
+    return NocoDBClient(
+        server.url,
+        "bench-token",
+        server.base_id,
+        pool_size=max(concurrency, 4),
+        concurrency=concurrency,
+        batch_sizer=BatchSizer(persist=False),
+    )
+
+
+def timed(results: list, scenario: str, n: int, server: FakeNocoDB, fn) -> None:
+    before = server.request_count
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    row = {
+        "scenario": scenario,
+        "records": n,
+        "seconds": round(elapsed, 3),
+        "records_per_s": round(n / elapsed) if elapsed else None,
+        "requests": server.request_count - before,
+    }
+    results.append(row)
+    print(
+        f"  {scenario:<28} {n:>9,} rec {elapsed:>8.2f}s "
+        f"{row['records_per_s'] or 0:>10,} rec/s {row['requests']:>7,} req"
+    )
+
+
+def quiet(fn, *args, **kwargs):
+    """Run fn with per-batch progress lines suppressed."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def run_size(n: int, args, only: set[str]) -> list[dict]:
+    results: list[dict] = []
+    faults = {
+        "latency": args.latency,
+        "rate_limit": args.rate_limit,
+        "error_rate": args.error_rate,
+        "max_batch": args.max_batch,
+        "seed": 42,
+    }
+    records = synthetic_transactions(n)
+    print(f"\n=== {n:,} records ===")
+
+    with FakeNocoDB(**faults) as server:
+        table_id = server.create_table("transactions")
+        client = make_client(server, 1)
+        fast = make_client(server, args.concurrency)
+
+        if "insert" in only:
+            timed(results, "insert (sequential)", n, server,
+                  lambda: quiet(client.bulk_insert, table_id, records))
+            server.tables[table_id].rows.clear()
+            timed(results, f"insert (concurrency={args.concurrency})", n, server,
+                  lambda: quiet(fast.bulk_insert, table_id, records))
+        if server.count(table_id) < n:
+            server.tables[table_id].rows.clear()
+            server.seed(table_id, records)
+
+        if "scan" in only:
+            timed(results, "scan (keyset)", n, server,
+                  lambda: sum(1 for _ in client.iter_records(table_id, page_size=1000)))
+            # Deep offset pages are the quadratic case; cap it for big tables
+            if n <= 100_000:
+                timed(results, "scan (offset)", n, server,
+                      lambda: sum(1 for _ in client.iter_records(
+                          table_id, page_size=1000, keyset=False)))
+
+        if "delete" in only:
+            timed(results, f"delete (concurrency={args.concurrency})", n, server,
+                  lambda: fast.delete_all_records(table_id))
+
+        client.close()
+        fast.close()
+
+    if "migrate" in only:
+        results.extend(run_migrate(n, faults, args.concurrency))
+    return results
+
+
+def run_migrate(n: int, faults: dict, concurrency: int) -> list[dict]:
+    try:
+        import migrate as migrate_module
+    except ImportError as e:
+        print(f"  migrate                      skipped ({e})")
+        return []
+
+    results: list[dict] = []
+    workbook = SyntheticWorkbook(n)
+    with FakeNocoDB(**faults) as server:
+        os.environ.update({
+            "NOCODB_BASE_URL": server.url,
+            "NOCODB_API_TOKEN": "bench-token",
+            "NOCODB_BASE_ID": server.base_id,
+            "NOCODB_CONCURRENCY": str(concurrency),
+            "NOCODB_POOL_SIZE": str(max(concurrency * 2, 10)),
+        })
+        migrate_module.load_workbook = lambda path, use_cache=True: workbook
+        # migrate() reads its own flags (--only etc.) from sys.argv
+        argv, sys.argv = sys.argv, ["migrate.py"]
+        try:
+            timed(results, "migrate()", n, server, lambda: quiet(migrate_module.migrate))
+        finally:
+            sys.argv = argv
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--only", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-batch", type=int, default=None)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    only = set(args.only.split(","))
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = []
+    for n in sizes:
+        results.extend(run_size(n, args, only))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Write USD/GBP companion columns for every money column.
+
+Converts deposits, transactions, dividends, options and monthly_snapshots
+at each record's historical rate (see utils/fx_convert.MONEY_TABLES for
+the fields and the currency each platform reports in), one vectorised
+pass per table, and writes ``<field>_usd`` / ``<field>_gbp`` in bulk.
+Only rows whose companion changed by a cent or more are written.
+
+Run from project root:
+    python scripts/convert_currency.py                    # dry run
+    python scripts/convert_currency.py --offline          # dry run, mirror + stored rates only
+    python scripts/convert_currency.py --only deposits,dividends
+    python scripts/convert_currency.py --apply            # add missing columns and write
+
+Dry runs read from the local SQLite mirror (utils/mirror.py), refreshing it
+first unless --offline is given. Rates come from the local FX store
+(utils/fx_store.py), topped up from Tiingo unless --offline is given.
+
+Requires NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_BASE_ID and
+TIINGO_API_TOKEN in the .env file.
+"""
+
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+from utils.fx_convert import MONEY_TABLES, FXRates, convert_table, date_range
+from utils.fx_store import tiingo_fetcher
+from utils.mirror import Mirror
+from utils.nocodb_client import NocoDBClient, transport_options
+from utils.shadow import resolve_table_ids
+
+DRY_RUN = "--apply" not in sys.argv
+OFFLINE = "--offline" in sys.argv
+
+
+def table_names(flag: str) -> set[str] | None:
+    """Comma-separated table names after ``flag`` (``--only a,b`` or ``--only=a,b``)."""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return set(sys.argv[i + 1].split(","))
+        if arg.startswith(f"{flag}="):
+            return set(arg.split("=", 1)[1].split(","))
+    return None
+
+
+def load_records(
+    client: NocoDBClient, table_ids: dict[str, str]
+) -> dict[str, list[dict]]:
+    """Records of each table: live when applying, from the mirror otherwise."""
+    if not DRY_RUN:
+        return {
+            name: list(client.iter_records(tid, MONEY_TABLES[name].fields()))
+            for name, tid in table_ids.items()
+        }
+    with Mirror() as mirror:
+        records = {}
+        for name, tid in table_ids.items():
+            if not OFFLINE or not mirror.has(name):
+                fetched = mirror.refresh(client, name, tid)
+                print(f"  Mirror refreshed '{name}' ({fetched} changed records fetched)")
+            records[name] = mirror.records(name)
+        return records
+
+
+def main():
+    load_dotenv()
+
+    base_url = os.environ.get("NOCODB_BASE_URL")
+    api_token = os.environ.get("NOCODB_API_TOKEN")
+    base_id = os.environ.get("NOCODB_BASE_ID")
+    tiingo_token = os.environ.get("TIINGO_API_TOKEN")
+
+    if not all([base_url, api_token, base_id]) or not (tiingo_token or OFFLINE):
+        print("ERROR: Missing environment variables.")
+        print("Required: NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_BASE_ID, TIINGO_API_TOKEN")
+        sys.exit(1)
+
+    only = table_names("--only")
+    unknown = (only or set()) - set(MONEY_TABLES)
+    if unknown:
+        print(f"ERROR: Unknown table(s): {', '.join(sorted(unknown))}")
+        print(f"Tables: {', '.join(MONEY_TABLES)}")
+        sys.exit(1)
+
+    print("=== Convert money columns to USD/GBP ===")
+    print(f"Mode: {'DRY RUN' if DRY_RUN else 'APPLY'}")
+    print()
+
+    with NocoDBClient(base_url, api_token, base_id, **transport_options()) as client:
+        existing = {t["title"]: t["id"] for t in client.list_tables()}
+        table_ids = {
+            name: existing[name]
+            for name in MONEY_TABLES
+            if name in existing and (only is None or name in only)
+        }
+        if "settings" in existing and not OFFLINE:
+            # Follow tables swapped in by a --shadow reload
+            table_ids = resolve_table_ids(client, existing["settings"], table_ids)
+
+        if not DRY_RUN:
+            for name, tid in table_ids.items():
+                added = client.ensure_columns(
+                    tid,
+                    [
+                        {"column_name": c, "uidt": "Decimal"}
+                        for c in MONEY_TABLES[name].companions()
+                    ],
+                )
+                if added:
+                    print(f"  Added {', '.join(added)} to '{name}'")
+
+        records = load_records(client, table_ids)
+
+        # Every currency involved, over the widest date range, in one top-up
+        rates = FXRates(fetch=None if OFFLINE else tiingo_fetcher(tiingo_token))
+        currencies, starts = set(), []
+        for name, rows in records.items():
+            spec = MONEY_TABLES[name]
+            currencies.update(spec.currency_codes(rows)[0], spec.targets)
+            span = date_range(spec, rows)
+            if span:
+                starts.append(span[0])
+        if starts and not OFFLINE:
+            start = date.fromisoformat(min(starts)) - timedelta(days=7)
+            if not rates.ensure(currencies, start):
+                print("  FX rates up to date (no Tiingo request)")
+        print()
+
+        total = 0
+        for name, rows in records.items():
+            t0 = time.perf_counter()
+            updates = convert_table(MONEY_TABLES[name], rows, rates, log=print)
+            elapsed = time.perf_counter() - t0
+            print(
+                f"  {name:<18} {len(rows):>7} rows, {len(updates):>6} to update "
+                f"({elapsed * 1000:.1f} ms)"
+            )
+            if updates and not DRY_RUN:
+                client.bulk_update(table_ids[name], updates)
+            total += len(updates)
+
+        print(f"\nRecords to update: {total}")
+        if DRY_RUN:
+            print("\nDry run — no changes made. Use --apply to write to NocoDB.")
+        elif total:
+            print("Done!")
+        else:
+            print("\nNo updates needed.")
+        client.report_metrics()
+
+
+if __name__ == "__main__":
+    main()
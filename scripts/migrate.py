@@ -3,6 +3,36 @@
 Run from project root:
     python scripts/migrate.py          # Import data (skip if tables have records)
     python scripts/migrate.py --clean  # Clear all records first, then re-import
+    python scripts/migrate.py --shadow # Load into shadow tables, then swap them in
+    python scripts/migrate.py --incremental  # Send only changed rows (see below)
+    python scripts/migrate.py --no-cache  # Re-parse the workbook (see below)
+    python scripts/migrate.py --clean --only monthly_snapshots  # Reload one table
+    python scripts/migrate.py --skip symbols,settings
+
+Steps (--only / --skip take comma-separated names): symbol_metadata,
+transactions, deposits, options, monthly_snapshots, settings, symbols.
+Steps run concurrently where their declared inputs allow (see
+MIGRATION_STEPS); a step needed only for another step's inputs runs
+without uploading.
+
+The parsed workbook is cached per file content (utils/workbook_cache.py),
+so repeated runs skip the slow .numbers decode until the file changes.
+
+--shadow never empties a live table: each table is loaded into a fresh
+shadow copy and swapped in by switching its table id in the settings
+table (see utils/shadow.py), so the dashboard never sees partial data.
+
+Uploads are checkpointed per table (scripts/.state/checkpoints/): if a run
+dies part-way, re-running it with the same workbook skips the batches that
+were already acknowledged and tables that finished. Editing the workbook
+or passing --clean starts every table from scratch.
+
+--incremental syncs against row manifests (scripts/.state/manifests/):
+each table only receives inserts, PATCHes and deletes for the workbook
+rows that were added, changed or removed since the last sync, so a week's
+new rows cost a handful of requests. The first incremental run diffs
+against the live tables to build the manifests; it cannot be combined
+with --clean or --shadow.
 
 Requires:
     pip install -r scripts/requirements.txt
@@ -12,9 +42,40 @@ Requires:
 import os
 import sys
 import math
-from datetime import datetime, timedelta
-from numbers_parser import Document
-from utils.nocodb_client import NocoDBClient
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterator
+from utils.checkpoint import ImportJournal
+from utils.manifest import IncrementalSync, RowManifest
+from utils.nocodb_client import NocoDBClient, transport_options
+from utils.option_mapping import (
+    LEAPS_TABLE,
+    OPTION_FIELDS,
+    OPTION_KEY_FIELDS,
+    OPTIONS_SHEET,
+    WHEEL_TABLE,
+)
+from utils.pipeline import UploadPipeline
+from utils.projection import (
+    column,
+    constant,
+    derived,
+    iter_projected,
+    iter_row_chunks,
+    text_or_none,
+    upper_or_none,
+)
+from utils.schemas import TABLE_SCHEMAS
+from utils.shadow import (
+    create_shadow,
+    drop_retired,
+    read_pointers,
+    resolve_table_ids,
+    swap_grace,
+    swap_in,
+)
+from utils.steps import Step, StepContext, StepRunner, select_steps
+from utils.workbook_cache import ROW_CHUNK_SIZE, load_workbook
 from dotenv import load_dotenv
 
 # ---------------------------------------------------------------------------
@@ -48,303 +109,385 @@ def normalise_platform(raw) -> str | None:
 
 
 # ---------------------------------------------------------------------------
-# Date formatting
+# Deposit column mapping
 # ---------------------------------------------------------------------------
+# Deposited table layout (from .numbers exploration):
+#   [0] Month, [1] Total, [2] IBKR, [3] None (empty col), [4] Trading 212,
+#   [5] Freetrade, [6] Stake, [7] Etoro, [8] Hood
 
+DEPOSIT_COL_MAP = {
+    "IBKR": 2,
+    "Trading 212": 4,
+    "Freetrade": 5,
+    "Stake": 6,
+    "Etoro": 7,
+    "Hood": 8,
+}
 
-def format_date(value) -> str | None:
-    """Convert numbers-parser date to ISO format string (YYYY-MM-DD).
 
-    Handles datetime objects, timedelta objects (from Numbers), and
-    various string date formats.
+# ---------------------------------------------------------------------------
+# Moneyness normalisation
+# ---------------------------------------------------------------------------
+
+
+def normalise_moneyness(raw) -> str | None:
+    """Normalise moneyness value to OTM/ATM/ITM or None.
+
+    The spreadsheet uses '-' for unset values and sometimes has raw
+    numeric values instead of the categorical labels.
     """
-    if value is None:
+    if raw is None:
         return None
-    if isinstance(value, datetime):
-        return value.strftime("%Y-%m-%d")
-    if isinstance(value, str):
-        for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"):
-            try:
-                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
+    s = str(raw).strip().upper()
+    if s in ("OTM", "ATM", "ITM"):
+        return s
+    # '-' or numeric or other non-standard values
     return None
 
 
 # ---------------------------------------------------------------------------
-# Safe numeric conversion
+# Record mappings (see utils/projection.py)
 # ---------------------------------------------------------------------------
 
 
-def safe_float(value, default=None) -> float | None:
-    """Convert a value to float safely. Returns default if not convertible."""
-    if value is None:
-        return default
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip().replace(",", "")
-        if cleaned in ("", "-", "--", "\u2013"):
-            return default
-        try:
-            return float(cleaned)
-        except ValueError:
-            return default
-    return default
-
-
-def safe_int(value, default=None) -> int | None:
-    """Convert a value to int safely. Returns default if not convertible."""
-    f = safe_float(value, default=None)
-    if f is None:
-        return default
-    return int(f)
-
-
-def timedelta_to_days(value) -> int | None:
-    """Convert a timedelta to integer days. Handle None and non-timedelta."""
-    if value is None:
-        return None
-    if isinstance(value, timedelta):
-        return value.days
-    if isinstance(value, (int, float)):
-        return int(value)
-    return None
+def snapshot_gain_loss_pct(gain_loss: float, invested: float) -> float:
+    """Gain/loss as a percentage of the amount invested so far."""
+    return round((gain_loss / invested * 100) if invested else 0, 4)
+
+
+# One row per month with an amount column per platform (unpivoted later)
+DEPOSIT_FIELDS = (column("month", 0, kind="date"),) + tuple(
+    column(platform_raw, col_idx, kind="float")
+    for platform_raw, col_idx in DEPOSIT_COL_MAP.items()
+)
+
+# Transactions header: Symbol[0], Name[1], Price[2], Shares[3], EPS[4],
+#                      Date[5], Platform[6], Amount[7]
+TRANSACTION_FIELDS = (
+    column("symbol", 0, clean=upper_or_none),
+    column("name", 1, clean=lambda v: str(v).strip() if v else ""),
+    column("signed_shares", 3, kind="float", default=0, hidden=True),
+    derived("type", lambda shares: "Sell" if shares < 0 else "Buy", "signed_shares"),
+    column("price", 2, kind="float", default=0),
+    derived("shares", abs, "signed_shares"),
+    column("amount", 7, kind="float", default=0),
+    column("eps", 4, kind="float"),
+    column("date", 5, kind="date"),
+    column("platform", 6, clean=normalise_platform),
+)
+
+# Options: the columns shared with reimport_options.py, plus migrate's own
+_OPTION_TEXT_FIELDS = (
+    column("call_put", "c / p", "c/p", clean=text_or_none, default=""),
+    column("buy_sell", "buy/sell", clean=text_or_none, default=""),
+    column("moneyness", "moneyness", clean=normalise_moneyness),
+    column("status", "status", clean=text_or_none, default=""),
+    column("profit", "profit", kind="float"),
+    column("days_held", "days held", kind="days"),
+    constant("annualised_return_pct", None),
+)
+
+WHEEL_FIELDS = OPTION_FIELDS + _OPTION_TEXT_FIELDS + (
+    constant("strategy_type", "Wheel"),
+    column("collateral", "collateral", kind="float"),
+    column("return_pct", "return", kind="float"),
+    column("notes", "notes", clean=text_or_none, default=""),
+)
+
+LEAPS_FIELDS = OPTION_FIELDS + _OPTION_TEXT_FIELDS + (
+    constant("strategy_type", "LEAPS"),
+    constant("collateral", None),  # LEAPS don't have collateral column
+    column("return_pct", "profit yield", kind="float"),
+    constant("notes", None),  # LEAPS table has no notes column
+)
+
+# Montly Tracker header: Month[0], None[1], Invested so far[2],
+#   Portfolio Value[3], Gain/Loss[4], Dividend[5], Options Capital[6],
+#   Premium[7], Options return[8], Total Earnings (EPS)[9], Earnings Yield[10]
+SNAPSHOT_FIELDS = (
+    column("month", 0, kind="date"),
+    column("total_invested", 2, kind="float", default=0),
+    column("portfolio_value", 3, kind="float", default=0),
+    column("gain_loss", 4, kind="float", default=0),
+    derived("gain_loss_pct", snapshot_gain_loss_pct, "gain_loss", "total_invested"),
+    column("dividend_income", 5, kind="float", default=0),
+    column("options_premium", 7, kind="float", default=0),
+    column("options_capital_gains", 6, kind="float", default=0),
+    # Invested so far = cumulative deposits
+    derived("total_deposits", lambda invested: invested, "total_invested"),
+)
 
 
 # ---------------------------------------------------------------------------
-# NocoDB Table Schemas (DATA-02)
+# Extraction (each generator yields the records of one target table)
 # ---------------------------------------------------------------------------
 
-ID_COLUMN = {"column_name": "Id", "title": "Id", "uidt": "ID", "dt": "int4", "pk": True, "ai": True, "rqd": True}
-
-TABLE_SCHEMAS = {
-    "symbols": {
-        "table_name": "symbols",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "symbol", "uidt": "SingleLineText"},
-            {"column_name": "name", "uidt": "SingleLineText"},
-            {
-                "column_name": "sector",
-                "uidt": "SingleSelect",
-                "dtxp": "'Tech','Financial','Retail','Communication','Healthcare','Energy','Industrial','Real Estate','ETF','Crypto','Consumer','Technology'",
-            },
-            {
-                "column_name": "strategy",
-                "uidt": "SingleSelect",
-                "dtxp": "'Growth','Value','Risky'",
-            },
-            {"column_name": "current_price", "uidt": "Decimal"},
-            {"column_name": "previous_close", "uidt": "Decimal"},
-            {"column_name": "change_pct", "uidt": "Decimal"},
-            {"column_name": "day_high", "uidt": "Decimal"},
-            {"column_name": "day_low", "uidt": "Decimal"},
-            {"column_name": "year_high", "uidt": "Decimal"},
-            {"column_name": "year_low", "uidt": "Decimal"},
-            {"column_name": "market_cap", "uidt": "Number"},
-            {"column_name": "pe_ratio", "uidt": "Decimal"},
-            {"column_name": "eps", "uidt": "Decimal"},
-            {"column_name": "dividend_yield", "uidt": "Decimal"},
-            {"column_name": "avg_volume", "uidt": "Number"},
-            {"column_name": "last_price_update", "uidt": "DateTime"},
-        ],
-    },
-    "transactions": {
-        "table_name": "transactions",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "symbol", "uidt": "SingleLineText"},
-            {"column_name": "name", "uidt": "SingleLineText"},
-            {
-                "column_name": "type",
-                "uidt": "SingleSelect",
-                "dtxp": "'Buy','Sell'",
-            },
-            {"column_name": "price", "uidt": "Decimal"},
-            {"column_name": "shares", "uidt": "Decimal"},
-            {"column_name": "amount", "uidt": "Decimal"},
-            {"column_name": "eps", "uidt": "Decimal"},
-            {"column_name": "date", "uidt": "Date"},
-            {
-                "column_name": "platform",
-                "uidt": "SingleSelect",
-                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
-            },
-        ],
-    },
-    "options": {
-        "table_name": "options",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "ticker", "uidt": "SingleLineText"},
-            {"column_name": "opened", "uidt": "Date"},
-            {
-                "column_name": "strategy_type",
-                "uidt": "SingleSelect",
-                "dtxp": "'Wheel','LEAPS','Spread'",
-            },
-            {
-                "column_name": "call_put",
-                "uidt": "SingleSelect",
-                "dtxp": "'Call','Put'",
-            },
-            {
-                "column_name": "buy_sell",
-                "uidt": "SingleSelect",
-                "dtxp": "'Buy','Sell'",
-            },
-            {"column_name": "expiration", "uidt": "Date"},
-            {"column_name": "strike", "uidt": "Decimal"},
-            {"column_name": "delta", "uidt": "Decimal"},
-            {"column_name": "iv_pct", "uidt": "Decimal"},
-            {
-                "column_name": "moneyness",
-                "uidt": "SingleSelect",
-                "dtxp": "'OTM','ATM','ITM'",
-            },
-            {"column_name": "qty", "uidt": "Number"},
-            {"column_name": "premium", "uidt": "Decimal"},
-            {"column_name": "collateral", "uidt": "Decimal"},
-            {
-                "column_name": "status",
-                "uidt": "SingleSelect",
-                "dtxp": "'Open','Closed','Expired','Rolled','Assigned'",
-            },
-            {"column_name": "close_date", "uidt": "Date"},
-            {"column_name": "close_premium", "uidt": "Decimal"},
-            {"column_name": "profit", "uidt": "Decimal"},
-            {"column_name": "days_held", "uidt": "Number"},
-            {"column_name": "return_pct", "uidt": "Decimal"},
-            {"column_name": "annualised_return_pct", "uidt": "Decimal"},
-            {"column_name": "notes", "uidt": "LongText"},
-        ],
-    },
-    "deposits": {
-        "table_name": "deposits",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "month", "uidt": "Date"},
-            {"column_name": "amount", "uidt": "Decimal"},
-            {
-                "column_name": "platform",
-                "uidt": "SingleSelect",
-                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
-            },
-        ],
-    },
-    "dividends": {
-        "table_name": "dividends",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "symbol", "uidt": "SingleLineText"},
-            {"column_name": "amount", "uidt": "Decimal"},
-            {"column_name": "date", "uidt": "Date"},
-            {
-                "column_name": "platform",
-                "uidt": "SingleSelect",
-                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
-            },
-        ],
+SETTINGS_SEED = [
+    {
+        "key": "dividend_income_goal",
+        "value": "5000",
+        "description": "Annual dividend income target in GBP",
     },
-    "monthly_snapshots": {
-        "table_name": "monthly_snapshots",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "month", "uidt": "Date"},
-            {"column_name": "total_invested", "uidt": "Decimal"},
-            {"column_name": "portfolio_value", "uidt": "Decimal"},
-            {"column_name": "gain_loss", "uidt": "Decimal"},
-            {"column_name": "gain_loss_pct", "uidt": "Decimal"},
-            {"column_name": "dividend_income", "uidt": "Decimal"},
-            {"column_name": "options_premium", "uidt": "Decimal"},
-            {"column_name": "options_capital_gains", "uidt": "Decimal"},
-            {"column_name": "total_deposits", "uidt": "Decimal"},
-        ],
+    {
+        "key": "salary",
+        "value": "45000",
+        "description": "Annual salary for UK tax calculations",
     },
-    "price_history": {
-        "table_name": "price_history",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "symbol", "uidt": "SingleLineText"},
-            {"column_name": "date", "uidt": "Date"},
-            {"column_name": "close_price", "uidt": "Decimal"},
-            {"column_name": "volume", "uidt": "Number"},
-        ],
+    {
+        "key": "tax_year",
+        "value": "2024-25",
+        "description": "Current tax year",
     },
-    "settings": {
-        "table_name": "settings",
-        "columns": [
-            ID_COLUMN,
-            {"column_name": "key", "uidt": "SingleLineText"},
-            {"column_name": "value", "uidt": "SingleLineText"},
-            {"column_name": "description", "uidt": "SingleLineText"},
-        ],
+    {
+        "key": "default_currency",
+        "value": "GBP",
+        "description": "Display currency",
     },
-}
+]
 
 
-# ---------------------------------------------------------------------------
-# Deposit column mapping
-# ---------------------------------------------------------------------------
-# Deposited table layout (from .numbers exploration):
-#   [0] Month, [1] Total, [2] IBKR, [3] None (empty col), [4] Trading 212,
-#   [5] Freetrade, [6] Stake, [7] Etoro, [8] Hood
+class WorkbookTables:
+    """Streams sheet tables chunk by chunk (see utils/projection.py).
 
-DEPOSIT_COL_MAP = {
-    "IBKR": 2,
-    "Trading 212": 4,
-    "Freetrade": 5,
-    "Stake": 6,
-    "Etoro": 7,
-    "Hood": 8,
-}
+    Nothing is kept between calls: each step reads its own tables once,
+    and only one chunk of rows per table is decoded at a time.
+    """
 
+    def __init__(self, doc, chunk_size: int = ROW_CHUNK_SIZE):
+        self.doc = doc
+        self.chunk_size = chunk_size
 
-# ---------------------------------------------------------------------------
-# Options column mapping helpers
-# ---------------------------------------------------------------------------
+    def table(self, sheet: str, table: str):
+        return self.doc.sheets[sheet].tables[table]
 
+    def iter_rows(self, sheet: str, table: str) -> Iterator[list]:
+        """Data rows (header skipped), decoded one chunk at a time."""
+        chunks = iter_row_chunks(self.table(sheet, table), self.chunk_size)
+        for offset, rows in chunks:
+            yield from (rows[1:] if offset == 0 else rows)
 
-def build_header_map(header_row: list) -> dict[str, int]:
-    """Build a mapping of normalised header names to column indices.
+    def project(self, sheet: str, table: str, fields: tuple) -> Iterator[dict]:
+        """Records of one table through a compiled mapping, streamed."""
+        return iter_projected(self.table(sheet, table), fields, self.chunk_size)
 
-    Strips whitespace and lowercases header names for resilient matching.
-    """
-    mapping = {}
-    for i, h in enumerate(header_row):
-        if h is not None:
-            normalised = str(h).strip().lower()
-            mapping[normalised] = i
-    return mapping
 
+class SymbolCollector:
+    """Unique symbols seen by one extraction step; first sighting wins."""
 
-def get_col(row: list, header_map: dict, *candidate_names: str, default=None):
-    """Get a value from a row by trying multiple header name candidates."""
-    for name in candidate_names:
-        idx = header_map.get(name.lower())
-        if idx is not None and idx < len(row):
-            return row[idx]
-    return default
+    def __init__(self):
+        self.names = {}  # symbol -> name ("" if the sheet has none)
+
+    def add(self, symbol: str, name: str | None = None) -> None:
+        if symbol not in self.names:
+            self.names[symbol] = name or ""
+
+    def merge(self, other: "SymbolCollector") -> None:
+        for symbol, name in other.names.items():
+            self.add(symbol, name)
+
+
+def read_symbol_metadata(tables: WorkbookTables) -> dict[str, dict]:
+    """Portfolio Table 1 -> {"sector"|"strategy"|"name": {symbol: value}}."""
+    metadata = {"sector": {}, "strategy": {}, "name": {}}
+    try:
+        # Header: Company Name[0], Symbol[1], Sector[2], Strategy[3], ...
+        for row in tables.iter_rows("Portfolio", "Table 1"):
+            symbol = row[1]
+            if symbol is not None:
+                sym = str(symbol).strip().upper()
+                if row[2] is not None:
+                    metadata["sector"][sym] = str(row[2]).strip()
+                if row[3] is not None:
+                    metadata["strategy"][sym] = str(row[3]).strip()
+                if row[0] is not None:
+                    metadata["name"][sym] = str(row[0]).strip()
+    except (KeyError, IndexError) as e:
+        print(f"  Warning: Could not read Table 1 for sectors: {e}")
+    return metadata
+
+
+def symbol_records(metadata: dict[str, dict], seen: SymbolCollector) -> list[dict]:
+    """Symbol records with sector/strategy (DATA-05), sorted by symbol."""
+    return [
+        {
+            "symbol": sym,
+            "name": name or metadata["name"].get(sym, ""),
+            "sector": metadata["sector"].get(sym),
+            "strategy": metadata["strategy"].get(sym),
+        }
+        for sym, name in sorted(seen.names.items())
+    ]
+
+
+def extract_transactions(
+    tables: WorkbookTables, seen: SymbolCollector, stats: Counter
+) -> Iterator[dict]:
+    """Transactions sheet rows -> transaction records (DATA-01)."""
+    for record in tables.project("Transactions", "Transactions", TRANSACTION_FIELDS):
+        if record["symbol"] is None:
+            continue
+        seen.add(record["symbol"], record["name"])
+        stats["transactions"] += 1
+        yield record
+    print(f"  Extracted {stats['transactions']} transactions")
+
+
+def extract_deposits(tables: WorkbookTables, stats: Counter) -> Iterator[dict]:
+    """Deposited table -> one record per month and platform (DATA-03 unpivot)."""
+    for row in tables.project("Transactions", "Deposited", DEPOSIT_FIELDS):
+        month = row["month"]
+        if month is None:
+            continue
+        stats["deposit_months"] += 1
+        for platform_raw in DEPOSIT_COL_MAP:
+            amount = row[platform_raw]
+            if amount is not None and amount != 0:
+                stats["deposits"] += 1
+                yield {
+                    "month": month,
+                    "amount": amount,
+                    "platform": normalise_platform(platform_raw),
+                }
+    print(
+        f"  Extracted {stats['deposits']} deposit records "
+        f"from {stats['deposit_months']} months"
+    )
+
+
+def extract_options(
+    tables: WorkbookTables,
+    table: str,
+    fields: tuple,
+    seen: SymbolCollector,
+    stats: Counter,
+    stat: str,
+) -> Iterator[dict]:
+    """One Options sheet table -> option records (DATA-06)."""
+    for record in tables.project(OPTIONS_SHEET, table, fields):
+        if record["ticker"] is None:
+            continue  # blank tickers get neither an option nor a symbols row
+        seen.add(record["ticker"])
+        stats[stat] += 1
+        yield record
+
+
+def extract_wheel_options(
+    tables: WorkbookTables, seen: SymbolCollector, stats: Counter
+) -> Iterator[dict]:
+    """Options Wheel Strategy table -> option records."""
+    yield from extract_options(tables, WHEEL_TABLE, WHEEL_FIELDS, seen, stats, "wheel")
+    print(f"  Extracted {stats['wheel']} Wheel option records")
+
+
+def extract_leaps_options(
+    tables: WorkbookTables, seen: SymbolCollector, stats: Counter
+) -> Iterator[dict]:
+    """Options LEAPS table -> option records."""
+    yield from extract_options(tables, LEAPS_TABLE, LEAPS_FIELDS, seen, stats, "leaps")
+    print(f"  Extracted {stats['leaps']} LEAPS option records")
+
+
+def extract_snapshots(tables: WorkbookTables, stats: Counter) -> Iterator[dict]:
+    """Montly Tracker table -> monthly snapshot records."""
+    # Note: table name in spreadsheet is "Montly Tracker" (typo in original)
+    for record in tables.project("Transactions", "Montly Tracker", SNAPSHOT_FIELDS):
+        if record["month"] is None:
+            continue  # Skip summary rows
+        stats["snapshots"] += 1
+        yield record
+    print(f"  Extracted {stats['snapshots']} monthly snapshots")
 
 
 # ---------------------------------------------------------------------------
-# Moneyness normalisation
+# Migration steps (see utils/steps.py)
 # ---------------------------------------------------------------------------
+# Each step declares the products it needs and publishes; the runner works
+# out the order and runs independent steps concurrently. Symbols are the
+# only real dependency: they are collected while transactions and options
+# are extracted, and merged in that order so the first-seen name wins.
 
 
-def normalise_moneyness(raw) -> str | None:
-    """Normalise moneyness value to OTM/ATM/ITM or None.
+@dataclass
+class MigrationState:
+    tables: WorkbookTables
+    settings: list[dict]
+    stats: Counter = field(default_factory=Counter)
 
-    The spreadsheet uses '-' for unset values and sometimes has raw
-    numeric values instead of the categorical labels.
-    """
-    if raw is None:
-        return None
-    s = str(raw).strip().upper()
-    if s in ("OTM", "ATM", "ITM"):
-        return s
-    # '-' or numeric or other non-standard values
+
+def step_symbol_metadata(state: MigrationState, ctx: StepContext) -> None:
+    ctx.put("symbol_metadata", read_symbol_metadata(state.tables))
+
+
+def step_transactions(state: MigrationState, ctx: StepContext) -> Iterator[dict]:
+    seen = SymbolCollector()
+    yield from extract_transactions(state.tables, seen, state.stats)
+    ctx.put("transaction_symbols", seen)
+
+
+def step_deposits(state: MigrationState, ctx: StepContext) -> Iterator[dict]:
+    return extract_deposits(state.tables, state.stats)
+
+
+def step_options(state: MigrationState, ctx: StepContext) -> Iterator[dict]:
+    seen = SymbolCollector()
+    yield from extract_wheel_options(state.tables, seen, state.stats)
+    yield from extract_leaps_options(state.tables, seen, state.stats)
+    print(f"  Total options: {state.stats['wheel'] + state.stats['leaps']}")
+    ctx.put("option_symbols", seen)
+
+
+def step_monthly_snapshots(state: MigrationState, ctx: StepContext) -> Iterator[dict]:
+    return extract_snapshots(state.tables, state.stats)
+
+
+def step_settings(state: MigrationState, ctx: StepContext) -> list[dict]:
+    state.stats["settings"] = len(state.settings)
+    print(f"  Prepared {len(state.settings)} settings")
+    return state.settings
+
+
+def step_symbols(state: MigrationState, ctx: StepContext) -> list[dict]:
+    seen = SymbolCollector()
+    seen.merge(ctx.get("transaction_symbols"))
+    seen.merge(ctx.get("option_symbols"))
+    records = symbol_records(ctx.get("symbol_metadata"), seen)
+    state.stats["symbols"] = len(records)
+    print(f"  Found {len(records)} unique symbols")
+    return records
+
+
+MIGRATION_STEPS = [
+    Step("symbol_metadata", step_symbol_metadata, outputs=("symbol_metadata",)),
+    Step("transactions", step_transactions, table="transactions",
+         outputs=("transaction_symbols",)),
+    Step("deposits", step_deposits, table="deposits"),
+    Step("options", step_options, table="options", outputs=("option_symbols",)),
+    Step("monthly_snapshots", step_monthly_snapshots, table="monthly_snapshots"),
+    Step("settings", step_settings, table="settings"),
+    Step("symbols", step_symbols, table="symbols",
+         inputs=("symbol_metadata", "transaction_symbols", "option_symbols")),
+]
+
+
+# Natural keys for --incremental (see utils/manifest.py). Options from the
+# Wheel and LEAPS tables share a table, so the strategy is part of the key.
+SYNC_KEYS = {
+    "transactions": ("symbol", "date", "type", "shares", "price", "platform"),
+    "deposits": ("month", "platform"),
+    "options": OPTION_KEY_FIELDS + ("strategy_type",),
+    "monthly_snapshots": ("month",),
+    "settings": ("key",),
+    "symbols": ("symbol",),
+}
+
+
+def step_names(flag: str) -> set[str] | None:
+    """Comma-separated step names after ``flag`` (``--only a,b`` or ``--only=a,b``)."""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return set(sys.argv[i + 1].split(","))
+        if arg.startswith(f"{flag}="):
+            return set(arg.split("=", 1)[1].split(","))
     return None
 
 
@@ -368,11 +511,22 @@ def migrate():
         print("Copy .env.example to .env and fill in your values.")
         sys.exit(1)
 
+    # --only / --skip: pick which steps upload (dependencies still run)
+    try:
+        steps, selected = select_steps(
+            MIGRATION_STEPS, step_names("--only"), step_names("--skip")
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    upload_tables = [s.table for s in steps if s.name in selected and s.table]
+    partial_run = bool(step_names("--only") or step_names("--skip"))
+
     # Open the .numbers file
     numbers_file = "stocks-v2.numbers"
     print(f"Reading {numbers_file}...")
     try:
-        doc = Document(numbers_file)
+        doc = load_workbook(numbers_file, use_cache="--no-cache" not in sys.argv)
     except FileNotFoundError:
         print(f"ERROR: {numbers_file} not found.")
         print("Run this script from the project root: python scripts/migrate.py")
@@ -383,37 +537,96 @@ def migrate():
         print("Ensure snappy is installed: brew install snappy (macOS)")
         sys.exit(1)
 
-    # Create NocoDB client
+    # Checkpoint journals are tied to this exact workbook
+    fingerprint = doc.fingerprint
+
+    # Create NocoDB client (pooled keep-alive transport, see NOCODB_POOL_SIZE)
     client = NocoDBClient(
         base_url=base_url,
         api_token=api_token,
         base_id=base_id,
+        **transport_options(),
     )
 
     # --clean flag: delete all existing records before importing
-    clean_mode = "--clean" in sys.argv
+    # --shadow flag: load shadow tables and swap them in (implies a clean load)
+    # --incremental flag: sync changed rows only, via row manifests
+    shadow_mode = "--shadow" in sys.argv
+    clean_mode = "--clean" in sys.argv and not shadow_mode
+    incremental = "--incremental" in sys.argv
+    if incremental and (shadow_mode or clean_mode):
+        print("ERROR: --incremental cannot be combined with --clean or --shadow")
+        sys.exit(1)
     if clean_mode:
         print("\n--clean flag detected: will clear all existing records first.")
+    if shadow_mode:
+        print("\n--shadow flag detected: will load shadow tables and swap them in.")
+    if incremental:
+        print("\n--incremental flag detected: will sync changed rows only.")
 
     # Step 1: Ensure all 8 tables exist (idempotent)
     print("\n=== Step 1: Ensure tables exist ===")
     table_ids = client.ensure_tables(TABLE_SCHEMAS)
+    # Tables swapped in by an earlier --shadow run are found via settings
+    table_ids = resolve_table_ids(client, table_ids["settings"], table_ids)
+    pointers = read_pointers(client, table_ids["settings"])
 
-    # If --clean, delete all records from all tables
+    # If --clean, delete all records from all tables (keeping swap pointers)
     if clean_mode:
         print("\n=== Cleaning existing records ===")
-        for name, tid in table_ids.items():
-            deleted = client.delete_all_records(tid)
+        data_tables = {
+            n: t for n, t in table_ids.items()
+            if n != "settings" and (n in upload_tables or not partial_run)
+        }
+        deleted_counts = client.truncate_tables(data_tables)
+        if "settings" in upload_tables:
+            pointer_ids = {r["Id"] for r in pointers.values()}
+            deleted_counts["settings"] = client.delete_records(
+                table_ids["settings"],
+                [
+                    r["Id"]
+                    for r in client.iter_records(table_ids["settings"], fields="Id")
+                    if r["Id"] not in pointer_ids
+                ],
+            )
+        for name, deleted in deleted_counts.items():
             if deleted > 0:
                 print(f"  Deleted {deleted} records from '{name}'")
-    else:
-        # Check if tables already have records (skip if populated)
+        # Only the tables cleaned here lose their journals and manifests
+        for name in deleted_counts:
+            ImportJournal.reset(name)
+            RowManifest.reset(name)
+
+    # Shadow loads always start from empty tables, so they are not journalled
+    journals = (
+        {} if shadow_mode
+        else {
+            name: ImportJournal(name, fingerprint, table_ids[name], client.target)
+            for name in table_ids
+        }
+    )
+
+    if not clean_mode and not shadow_mode and not incremental:
+        # Check if tables already have records (skip if populated). Records
+        # acknowledged by an earlier run's journal are ours, not duplicates.
         print("\n  Checking for existing records...")
         has_data = False
-        for name, tid in table_ids.items():
-            resp = client.get_records(tid, {"limit": 1})
-            count = resp.get("pageInfo", {}).get("totalRows", 0)
-            if count > 0:
+        selected_ids = {n: table_ids[n] for n in upload_tables}
+        # Counted live: the cached counts may predate another script's writes
+        for name, count in client.row_counts(selected_ids, refresh=True).items():
+            if journals[name].acked_records > count:
+                # Rows were deleted since the journal was written
+                print(
+                    f"  '{name}' has {count} records but the journal acknowledges "
+                    f"{journals[name].acked_records}: importing from scratch"
+                )
+                journals[name].discard()
+            if journals[name].acked_records:
+                print(
+                    f"  Resuming '{name}': {journals[name].acked_records} records "
+                    "already imported"
+                )
+            elif count > 0:
                 print(f"  WARNING: Table '{name}' already has {count} records.")
                 has_data = True
         if has_data:
@@ -424,297 +637,56 @@ def migrate():
 
             time.sleep(3)
 
-    # -----------------------------------------------------------------------
-    # Step 2: Extract symbols with sector/strategy (DATA-05)
-    # -----------------------------------------------------------------------
-    print("\n=== Step 2: Extract symbols ===")
-
-    # Build sector/strategy mapping from Table 1 in Portfolio sheet
-    sector_map = {}  # symbol -> sector
-    strategy_map = {}  # symbol -> strategy
-    name_map = {}  # symbol -> company name
-    try:
-        t1 = doc.sheets["Portfolio"].tables["Table 1"]
-        t1_rows = t1.rows(values_only=True)
-        # Header: Company Name[0], Symbol[1], Sector[2], Strategy[3], ...
-        for row in t1_rows[1:]:
-            symbol = row[1]
-            if symbol is not None:
-                sym = str(symbol).strip().upper()
-                if row[2] is not None:
-                    sector_map[sym] = str(row[2]).strip()
-                if row[3] is not None:
-                    strategy_map[sym] = str(row[3]).strip()
-                if row[0] is not None:
-                    name_map[sym] = str(row[0]).strip()
-    except (KeyError, IndexError) as e:
-        print(f"  Warning: Could not read Table 1 for sectors: {e}")
-
-    # Collect unique symbols from transactions
-    tx_table = doc.sheets["Transactions"].tables["Transactions"]
-    tx_rows = tx_table.rows(values_only=True)
-    unique_symbols = {}  # symbol -> name
-    for row in tx_rows[1:]:
-        if row[0] is None or str(row[0]).strip() == "":
-            continue
-        sym = str(row[0]).strip().upper()
-        if sym not in unique_symbols:
-            name = str(row[1]).strip() if row[1] else name_map.get(sym, "")
-            unique_symbols[sym] = name
-
-    # Also add symbols from options that may not appear in transactions
-    try:
-        wheel_table = doc.sheets["Options"].tables["Options Wheel Strategy"]
-        for row in wheel_table.rows(values_only=True)[1:]:
-            if row[0] is not None:
-                sym = str(row[0]).strip().upper()
-                if sym not in unique_symbols:
-                    unique_symbols[sym] = name_map.get(sym, "")
-    except (KeyError, IndexError):
-        pass
-
-    try:
-        leaps_table = doc.sheets["Options"].tables["Options LEAPS"]
-        for row in leaps_table.rows(values_only=True)[1:]:
-            if row[0] is not None:
-                sym = str(row[0]).strip().upper()
-                if sym not in unique_symbols:
-                    unique_symbols[sym] = name_map.get(sym, "")
-    except (KeyError, IndexError):
-        pass
-
-    # Build symbol records
-    symbol_records = []
-    for sym, name in sorted(unique_symbols.items()):
-        record = {
-            "symbol": sym,
-            "name": name or name_map.get(sym, ""),
-            "sector": sector_map.get(sym),
-            "strategy": strategy_map.get(sym),
-        }
-        symbol_records.append(record)
-
-    print(f"  Found {len(symbol_records)} unique symbols")
-    client.bulk_insert(table_ids["symbols"], symbol_records)
-
-    # -----------------------------------------------------------------------
-    # Step 3: Import transactions (DATA-01)
-    # -----------------------------------------------------------------------
-    print("\n=== Step 3: Import transactions ===")
-    # Header: Symbol[0], Name[1], Price[2], Shares[3], EPS[4], Date[5],
-    #         Platform[6], Amount[7]
-
-    transactions = []
-    for row in tx_rows[1:]:
-        if row[0] is None or str(row[0]).strip() == "":
-            continue
-
-        shares_raw = safe_float(row[3], 0)
-        tx_type = "Sell" if shares_raw < 0 else "Buy"
-
-        record = {
-            "symbol": str(row[0]).strip().upper(),
-            "name": str(row[1]).strip() if row[1] else "",
-            "type": tx_type,
-            "price": safe_float(row[2], 0),
-            "shares": abs(shares_raw),
-            "amount": safe_float(row[7], 0),
-            "eps": safe_float(row[4]),
-            "date": format_date(row[5]),
-            "platform": normalise_platform(row[6]),
-        }
-        transactions.append(record)
-
-    print(f"  Extracted {len(transactions)} transactions")
-    client.bulk_insert(table_ids["transactions"], transactions)
-
-    # -----------------------------------------------------------------------
-    # Step 4: Import deposits - unpivot (DATA-03)
-    # -----------------------------------------------------------------------
-    print("\n=== Step 4: Import deposits (unpivot) ===")
-
-    deposit_table = doc.sheets["Transactions"].tables["Deposited"]
-    dep_rows = deposit_table.rows(values_only=True)
-
-    deposits = []
-    deposit_months = 0
-    for row in dep_rows[1:]:  # Skip header
-        month = format_date(row[0])
-        if month is None:
-            continue
-        deposit_months += 1
-        for platform_raw, col_idx in DEPOSIT_COL_MAP.items():
-            amount = safe_float(row[col_idx])
-            if amount is not None and amount != 0:
-                deposits.append(
-                    {
-                        "month": month,
-                        "amount": amount,
-                        "platform": normalise_platform(platform_raw),
-                    }
-                )
-
-    print(f"  Extracted {len(deposits)} deposit records from {deposit_months} months")
-    client.bulk_insert(table_ids["deposits"], deposits)
-
-    # -----------------------------------------------------------------------
-    # Step 5: Import options - Wheel (DATA-06)
-    # -----------------------------------------------------------------------
-    print("\n=== Step 5: Import options (Wheel) ===")
-
-    wheel_table = doc.sheets["Options"].tables["Options Wheel Strategy"]
-    wheel_rows = wheel_table.rows(values_only=True)
-    wheel_header = build_header_map(wheel_rows[0])
-
-    wheel_records = []
-    for row in wheel_rows[1:]:
-        ticker = get_col(row, wheel_header, "ticker")
-        if ticker is None or str(ticker).strip() == "":
-            continue
-
-        record = {
-            "ticker": str(ticker).strip().upper(),
-            "opened": format_date(get_col(row, wheel_header, "opened")),
-            "strategy_type": "Wheel",
-            "call_put": str(get_col(row, wheel_header, "c / p", "c/p", default="")).strip() or None,
-            "buy_sell": str(get_col(row, wheel_header, "buy/sell", default="")).strip() or None,
-            "expiration": format_date(get_col(row, wheel_header, "expiration")),
-            "strike": safe_float(get_col(row, wheel_header, "strike")),
-            "delta": safe_float(get_col(row, wheel_header, "greeks (delta)")),
-            "iv_pct": safe_float(get_col(row, wheel_header, "greeks (iv%)")),
-            "moneyness": normalise_moneyness(get_col(row, wheel_header, "moneyness")),
-            "qty": safe_int(get_col(row, wheel_header, "qty")),
-            "premium": safe_float(get_col(row, wheel_header, "premium")),
-            "collateral": safe_float(get_col(row, wheel_header, "collateral")),
-            "status": str(get_col(row, wheel_header, "status", default="")).strip() or None,
-            "close_date": format_date(get_col(row, wheel_header, "date closed")),
-            "close_premium": safe_float(get_col(row, wheel_header, "closing cost")),
-            "profit": safe_float(get_col(row, wheel_header, "profit")),
-            "days_held": timedelta_to_days(get_col(row, wheel_header, "days held")),
-            "return_pct": safe_float(get_col(row, wheel_header, "return")),
-            "annualised_return_pct": None,  # Not directly in Wheel table
-            "notes": str(get_col(row, wheel_header, "notes", default="")).strip() or None,
-        }
-        wheel_records.append(record)
-
-    print(f"  Extracted {len(wheel_records)} Wheel option records")
-
-    # -----------------------------------------------------------------------
-    # Step 6: Import options - LEAPS (DATA-06)
-    # -----------------------------------------------------------------------
-    print("\n=== Step 6: Import options (LEAPS) ===")
-
-    leaps_table = doc.sheets["Options"].tables["Options LEAPS"]
-    leaps_rows = leaps_table.rows(values_only=True)
-    leaps_header = build_header_map(leaps_rows[0])
-
-    leaps_records = []
-    for row in leaps_rows[1:]:
-        ticker = get_col(row, leaps_header, "ticker")
-        if ticker is None or str(ticker).strip() == "":
-            continue
-
-        record = {
-            "ticker": str(ticker).strip().upper(),
-            "opened": format_date(get_col(row, leaps_header, "opened")),
-            "strategy_type": "LEAPS",
-            "call_put": str(get_col(row, leaps_header, "c / p", "c/p", default="")).strip() or None,
-            "buy_sell": str(get_col(row, leaps_header, "buy/sell", default="")).strip() or None,
-            "expiration": format_date(get_col(row, leaps_header, "expiration")),
-            "strike": safe_float(get_col(row, leaps_header, "strike")),
-            "delta": safe_float(get_col(row, leaps_header, "greeks (delta)")),
-            "iv_pct": safe_float(get_col(row, leaps_header, "greeks (iv%)")),
-            "moneyness": normalise_moneyness(get_col(row, leaps_header, "moneyness")),
-            "qty": safe_int(get_col(row, leaps_header, "qty")),
-            "premium": safe_float(get_col(row, leaps_header, "premium")),
-            "collateral": None,  # LEAPS don't have collateral column
-            "status": str(get_col(row, leaps_header, "status", default="")).strip() or None,
-            "close_date": format_date(get_col(row, leaps_header, "date closed")),
-            "close_premium": safe_float(get_col(row, leaps_header, "closing cost")),
-            "profit": safe_float(get_col(row, leaps_header, "profit")),
-            "days_held": timedelta_to_days(get_col(row, leaps_header, "days held")),
-            "return_pct": safe_float(get_col(row, leaps_header, "profit yield")),
-            "annualised_return_pct": None,
-            "notes": None,  # LEAPS table has no notes column
+    settings = SETTINGS_SEED
+    if shadow_mode:
+        # Settings stay live (they hold the swap pointers): only add missing keys
+        present = {
+            r.get("key")
+            for r in client.iter_records(table_ids["settings"], fields="key")
         }
-        leaps_records.append(record)
-
-    print(f"  Extracted {len(leaps_records)} LEAPS option records")
-
-    # Combine and insert all options
-    all_options = wheel_records + leaps_records
-    print(f"  Total options: {len(all_options)}")
-    client.bulk_insert(table_ids["options"], all_options)
-
-    # -----------------------------------------------------------------------
-    # Step 7: Import monthly snapshots
-    # -----------------------------------------------------------------------
-    print("\n=== Step 7: Import monthly snapshots ===")
-
-    # Note: table name in spreadsheet is "Montly Tracker" (typo in original)
-    mt_table = doc.sheets["Transactions"].tables["Montly Tracker"]
-    mt_rows = mt_table.rows(values_only=True)
-    # Header: Month[0], None[1], Invested so far[2], Portfolio Value[3],
-    #         Gain/Loss[4], Dividend[5], Options Capital[6], Premium[7],
-    #         Options return[8], Total Earnings (EPS)[9], Earnings Yield[10]
-
-    snapshots = []
-    for row in mt_rows[1:]:
-        month = format_date(row[0])
-        if month is None:
-            continue  # Skip summary rows
-
-        # Calculate gain/loss percentage from gain/loss and portfolio value
-        invested = safe_float(row[2], 0)
-        portfolio_value = safe_float(row[3], 0)
-        gain_loss = safe_float(row[4], 0)
-        gain_loss_pct = (gain_loss / invested * 100) if invested else 0
-
-        record = {
-            "month": month,
-            "total_invested": invested,
-            "portfolio_value": portfolio_value,
-            "gain_loss": gain_loss,
-            "gain_loss_pct": round(gain_loss_pct, 4),
-            "dividend_income": safe_float(row[5], 0),
-            "options_premium": safe_float(row[7], 0),
-            "options_capital_gains": safe_float(row[6], 0),
-            "total_deposits": invested,  # Invested so far = cumulative deposits
+        settings = [s for s in settings if s["key"] not in present]
+
+    if shadow_mode:
+        print("\n=== Creating shadow tables ===")
+        targets = {
+            name: create_shadow(client, name, table_ids[name])
+            if name != "settings" else table_ids[name]
+            for name in upload_tables
         }
-        snapshots.append(record)
-
-    print(f"  Extracted {len(snapshots)} monthly snapshots")
-    client.bulk_insert(table_ids["monthly_snapshots"], snapshots)
-
-    # -----------------------------------------------------------------------
-    # Step 8: Seed settings table
-    # -----------------------------------------------------------------------
-    print("\n=== Step 8: Seed settings ===")
-
-    settings = [
-        {
-            "key": "dividend_income_goal",
-            "value": "5000",
-            "description": "Annual dividend income target in GBP",
-        },
-        {
-            "key": "salary",
-            "value": "45000",
-            "description": "Annual salary for UK tax calculations",
-        },
-        {
-            "key": "tax_year",
-            "value": "2024-25",
-            "description": "Current tax year",
-        },
-        {
-            "key": "default_currency",
-            "value": "GBP",
-            "description": "Display currency",
-        },
-    ]
-    client.bulk_insert(table_ids["settings"], settings)
-    print(f"  Inserted {len(settings)} settings")
+    else:
+        targets = table_ids
+
+    # Steps stream records into one bounded upload queue per table:
+    # extraction overlaps the uploads on the worker threads, and each sheet
+    # table is decoded ROW_CHUNK_SIZE rows at a time, so memory stays
+    # bounded however large the workbook is.
+    print(f"\n=== Running {len(steps)} steps, uploading {len(upload_tables)} tables ===")
+    state = MigrationState(WorkbookTables(doc), settings)
+    if incremental:
+        # Settings rows are edited in the dashboard: only add missing keys
+        pipeline = IncrementalSync(client, SYNC_KEYS, preserve={"settings"})
+    else:
+        pipeline = UploadPipeline(client, journals)
+    with pipeline:
+        runner = StepRunner(steps, state, pipeline, targets)
+        runner.run(selected)
+        print("\n=== Waiting for uploads to finish ===")
+    runner.print_timings()
+    if incremental:
+        print(f"\n  Incremental sync wrote {pipeline.writes} records")
+
+    if shadow_mode:
+        # Every shadow loaded successfully: switch readers over table by table
+        print("\n=== Swapping shadow tables in ===")
+        retired = []
+        for name, shadow_id in targets.items():
+            if name == "settings" or name not in upload_tables:
+                continue
+            swap_in(client, table_ids["settings"], name, table_ids[name], shadow_id)
+            retired.append(table_ids[name])
+            table_ids[name] = shadow_id
+            ImportJournal.reset(name)
+        drop_retired(client, retired, swap_grace())
 
     # -----------------------------------------------------------------------
     # Step 9: Print summary (DATA-07)
@@ -722,14 +694,18 @@ def migrate():
     print("\n" + "=" * 50)
     print("=== Migration Summary ===")
     print("=" * 50)
-    print(f"Symbols:           {len(symbol_records):>6}")
-    print(f"Transactions:      {len(transactions):>6}  (expected: ~963)")
-    print(f"Options (Wheel):   {len(wheel_records):>6}  (expected: ~163)")
-    print(f"Options (LEAPS):   {len(leaps_records):>6}  (expected: ~35)")
-    print(f"Options (Total):   {len(all_options):>6}  (expected: ~198)")
-    print(f"Deposits:          {len(deposits):>6}  (from {deposit_months} months)")
-    print(f"Monthly Snapshots: {len(snapshots):>6}  (expected: ~85)")
-    print(f"Settings:          {len(settings):>6}")
+    stats = state.stats
+    print(f"Symbols:           {stats['symbols']:>6}")
+    print(f"Transactions:      {stats['transactions']:>6}  (expected: ~963)")
+    print(f"Options (Wheel):   {stats['wheel']:>6}  (expected: ~163)")
+    print(f"Options (LEAPS):   {stats['leaps']:>6}  (expected: ~35)")
+    print(f"Options (Total):   {stats['wheel'] + stats['leaps']:>6}  (expected: ~198)")
+    print(f"Deposits:          {stats['deposits']:>6}  (from {stats['deposit_months']} months)")
+    print(f"Monthly Snapshots: {stats['snapshots']:>6}  (expected: ~85)")
+    print(f"Settings:          {stats['settings']:>6}")
+    skipped = [s.name for s in MIGRATION_STEPS if s.table and s.name not in selected]
+    if skipped:
+        print(f"Not uploaded:      {', '.join(skipped)}")
     print()
     print("Table IDs for dashboard/.env.local:")
     print(f"NOCODB_TABLE_SYMBOLS={table_ids['symbols']}")
@@ -741,6 +717,8 @@ def migrate():
     print(f"NOCODB_TABLE_PRICE_HISTORY={table_ids['price_history']}")
     print(f"NOCODB_TABLE_SETTINGS={table_ids['settings']}")
     print()
+    client.report_metrics()
+    client.close()
     print("Migration complete.")
 
 
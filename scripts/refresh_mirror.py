@@ -0,0 +1,43 @@
+"""Refresh the local SQLite mirror of all NocoDB tables.
+
+Run from project root:
+    python scripts/refresh_mirror.py
+
+The mirror lives in scripts/.state/mirror.sqlite (see utils/mirror.py);
+each run only downloads rows added or changed since the previous one.
+
+Requires NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_BASE_ID in the .env file.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+from utils.mirror import Mirror
+from utils.nocodb_client import NocoDBClient, transport_options
+from utils.schemas import TABLE_SCHEMAS
+
+
+def main():
+    load_dotenv()
+
+    base_url = os.environ.get("NOCODB_BASE_URL")
+    api_token = os.environ.get("NOCODB_API_TOKEN")
+    base_id = os.environ.get("NOCODB_BASE_ID")
+
+    if not all([base_url, api_token, base_id]):
+        print("ERROR: Missing environment variables.")
+        print("Required: NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_BASE_ID")
+        sys.exit(1)
+
+    with NocoDBClient(base_url, api_token, base_id, **transport_options()) as client:
+        existing = {t["title"]: t["id"] for t in client.list_tables()}
+        table_ids = {n: existing[n] for n in TABLE_SCHEMAS if n in existing}
+        with Mirror() as mirror:
+            fetched = mirror.refresh_all(client, table_ids)
+            print(f"Mirror: {mirror.path}")
+            for name, count in fetched.items():
+                print(f"  {name:<18} {mirror.count(name):>7} rows ({count} fetched)")
+
+
+if __name__ == "__main__":
+    main()
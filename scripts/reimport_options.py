@@ -1,14 +1,27 @@
 """Re-import options data from stocks-v2.numbers into NocoDB.
 
-Clears existing options records and imports fresh data from both
-Wheel and LEAPS tables with all fields populated:
+Syncs the options table with fresh data from both Wheel and LEAPS tables
+with all fields populated:
   - commission, outer_strike, platform (IBKR)
   - Strategy override: VPCS wherever outer_strike is present
   - Strategy mapping: Wheel, Collar, VPCS, PMCC, LEAPS, BET, Hedge
   - No moneyness or collateral (removed from DB)
 
+By default rows are matched to existing records on their natural key
+(ticker, opened, strike, expiration, call/put, buy/sell) and only the
+needed inserts, PATCHes and deletes are sent, so the dashboard never sees
+an empty options table. --replace restores the old delete-all + insert;
+--shadow does a full reload into a shadow table and swaps it in
+atomically (see utils/shadow.py), which needs NOCODB_BASE_ID and
+NOCODB_TABLE_SETTINGS as well.
+
 Run from project root:
-    python scripts/reimport_options.py
+    python scripts/reimport_options.py            # diff sync
+    python scripts/reimport_options.py --replace  # delete all, re-insert
+    python scripts/reimport_options.py --shadow   # load shadow table, swap in
+    python scripts/reimport_options.py --no-cache # re-parse the workbook
+
+The parsed workbook is cached per file content (utils/workbook_cache.py).
 
 Requires:
     pip install -r scripts/requirements.txt
@@ -16,71 +29,27 @@ Requires:
 
 import os
 import sys
-from datetime import datetime, timedelta
-from numbers_parser import Document
-from utils.nocodb_client import NocoDBClient
+from utils.diff_sync import apply_sync, plan_sync
+from utils.nocodb_client import NocoDBClient, transport_options
+from utils.option_mapping import (
+    LEAPS_TABLE,
+    OPTION_FIELDS,
+    OPTION_KEY_FIELDS,
+    OPTIONS_SHEET,
+    WHEEL_TABLE,
+)
+from utils.projection import column, constant, derived, project_table, text_or_none
+from utils.shadow import (
+    create_shadow,
+    drop_retired,
+    resolve_table_ids,
+    swap_grace,
+    swap_in,
+)
+from utils.workbook_cache import load_workbook
 from dotenv import load_dotenv
 
 
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-
-def format_date(value) -> str | None:
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value.strftime("%Y-%m-%d")
-    if isinstance(value, str):
-        for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"):
-            try:
-                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-    return None
-
-
-def safe_float(value, default=None) -> float | None:
-    if value is None:
-        return default
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip().replace(",", "")
-        if cleaned in ("", "-", "--", "\u2013"):
-            return default
-        try:
-            return float(cleaned)
-        except ValueError:
-            return default
-    return default
-
-
-def safe_int(value, default=None) -> int | None:
-    f = safe_float(value, default=None)
-    if f is None:
-        return default
-    return int(f)
-
-
-def build_header_map(header_row: list) -> dict[str, int]:
-    mapping = {}
-    for i, h in enumerate(header_row):
-        if h is not None:
-            normalised = str(h).strip().lower()
-            mapping[normalised] = i
-    return mapping
-
-
-def get_col(row: list, header_map: dict, *candidate_names: str, default=None):
-    for name in candidate_names:
-        idx = header_map.get(name.lower())
-        if idx is not None and idx < len(row):
-            return row[idx]
-    return default
-
-
 # ---------------------------------------------------------------------------
 # Strategy normalisation
 # ---------------------------------------------------------------------------
@@ -143,6 +112,40 @@ def normalise_status(raw) -> str | None:
     return status_map.get(s.lower(), s)
 
 
+# ---------------------------------------------------------------------------
+# Record mappings (shared columns in utils/option_mapping.py)
+# ---------------------------------------------------------------------------
+
+WHEEL_FIELDS = OPTION_FIELDS + (
+    column("outer_strike", "outer strike", kind="float"),
+    column("raw_strategy", "strategy", hidden=True),
+    derived("strategy_type", normalise_strategy, "raw_strategy", "outer_strike"),
+    column("call_put", "c / p", "c/p", clean=normalise_call_put),
+    column("buy_sell", "buy/sell", clean=normalise_buy_sell),
+    column("status", "status", clean=normalise_status),
+    column("commission", "commision", kind="float"),
+    constant("platform", "IBKR"),
+    column("notes", "notes", clean=text_or_none, default=""),
+)
+
+LEAPS_FIELDS = OPTION_FIELDS + (
+    constant("outer_strike", None),  # LEAPS table has no outer_strike column
+    column("strategy_type", "strategy", clean=normalise_strategy),
+    column("call_put", "c / p", "c/p", clean=normalise_call_put),
+    column("buy_sell", "buy/sell", clean=normalise_buy_sell),
+    column("status", "status", clean=normalise_status),
+    column("commission", "commision", kind="float"),
+    constant("platform", "IBKR"),
+    constant("notes", None),  # LEAPS table has no notes column
+)
+
+
+def extract_options(doc, table: str, fields: tuple) -> list[dict]:
+    """Option records of one Options sheet table (rows without a ticker skipped)."""
+    records = project_table(doc.sheets[OPTIONS_SHEET].tables[table], fields)
+    return [r for r in records if r["ticker"] is not None]
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -154,64 +157,41 @@ def reimport():
     base_url = os.environ.get("NOCODB_BASE_URL")
     api_token = os.environ.get("NOCODB_API_TOKEN")
     options_table_id = os.environ.get("NOCODB_TABLE_OPTIONS")
+    settings_table_id = os.environ.get("NOCODB_TABLE_SETTINGS")
+    base_id = os.environ.get("NOCODB_BASE_ID")
+    shadow_mode = "--shadow" in sys.argv
 
     if not all([base_url, api_token, options_table_id]):
         print("ERROR: Missing environment variables.")
         print("Required: NOCODB_BASE_URL, NOCODB_API_TOKEN, NOCODB_TABLE_OPTIONS")
         sys.exit(1)
+    if shadow_mode and not all([base_id, settings_table_id]):
+        print("ERROR: --shadow also requires NOCODB_BASE_ID and NOCODB_TABLE_SETTINGS")
+        sys.exit(1)
 
-    # We only need the client for delete + insert, use it directly
+    # The base id is only needed to create and swap shadow tables
     client = NocoDBClient(
         base_url=base_url,
         api_token=api_token,
-        base_id="unused",  # not needed for direct table operations
+        base_id=base_id or "unused",
+        **transport_options(),
     )
+    if settings_table_id:
+        # An earlier shadow swap may have replaced the table in the env
+        options_table_id = resolve_table_ids(
+            client, settings_table_id, {"options": options_table_id}
+        )["options"]
 
     # Open spreadsheet
     numbers_file = "/Users/skylight/Downloads/stocks-v2.numbers"
     print(f"Reading {numbers_file}...")
-    doc = Document(numbers_file)
+    doc = load_workbook(numbers_file, use_cache="--no-cache" not in sys.argv)
 
     # -----------------------------------------------------------------------
     # Extract Wheel options
     # -----------------------------------------------------------------------
     print("\n=== Extracting Wheel options ===")
-    wheel_table = doc.sheets["Options"].tables["Options Wheel Strategy"]
-    wheel_rows = wheel_table.rows(values_only=True)
-    wheel_header = build_header_map(wheel_rows[0])
-
-    wheel_records = []
-    for row in wheel_rows[1:]:
-        ticker = get_col(row, wheel_header, "ticker")
-        if ticker is None or str(ticker).strip() == "":
-            continue
-
-        outer_strike = safe_float(get_col(row, wheel_header, "outer strike"))
-        raw_strategy = get_col(row, wheel_header, "strategy")
-        commission = safe_float(get_col(row, wheel_header, "commision"))
-
-        record = {
-            "ticker": str(ticker).strip().upper(),
-            "opened": format_date(get_col(row, wheel_header, "opened")),
-            "strategy_type": normalise_strategy(raw_strategy, outer_strike),
-            "call_put": normalise_call_put(get_col(row, wheel_header, "c / p", "c/p")),
-            "buy_sell": normalise_buy_sell(get_col(row, wheel_header, "buy/sell")),
-            "expiration": format_date(get_col(row, wheel_header, "expiration")),
-            "strike": safe_float(get_col(row, wheel_header, "strike")),
-            "delta": safe_float(get_col(row, wheel_header, "greeks (delta)")),
-            "iv_pct": safe_float(get_col(row, wheel_header, "greeks (iv%)")),
-            "qty": safe_int(get_col(row, wheel_header, "qty")),
-            "premium": safe_float(get_col(row, wheel_header, "premium")),
-            "status": normalise_status(get_col(row, wheel_header, "status")),
-            "close_date": format_date(get_col(row, wheel_header, "date closed")),
-            "close_premium": safe_float(get_col(row, wheel_header, "closing cost")),
-            "outer_strike": outer_strike,
-            "commission": commission,
-            "platform": "IBKR",
-            "notes": str(get_col(row, wheel_header, "notes", default="")).strip() or None,
-        }
-        wheel_records.append(record)
-
+    wheel_records = extract_options(doc, WHEEL_TABLE, WHEEL_FIELDS)
     print(f"  Extracted {len(wheel_records)} Wheel-table records")
 
     # Show strategy breakdown
@@ -226,41 +206,7 @@ def reimport():
     # Extract LEAPS options
     # -----------------------------------------------------------------------
     print("\n=== Extracting LEAPS options ===")
-    leaps_table = doc.sheets["Options"].tables["Options LEAPS"]
-    leaps_rows = leaps_table.rows(values_only=True)
-    leaps_header = build_header_map(leaps_rows[0])
-
-    leaps_records = []
-    for row in leaps_rows[1:]:
-        ticker = get_col(row, leaps_header, "ticker")
-        if ticker is None or str(ticker).strip() == "":
-            continue
-
-        raw_strategy = get_col(row, leaps_header, "strategy")
-        commission = safe_float(get_col(row, leaps_header, "commision"))
-
-        record = {
-            "ticker": str(ticker).strip().upper(),
-            "opened": format_date(get_col(row, leaps_header, "opened")),
-            "strategy_type": normalise_strategy(raw_strategy),
-            "call_put": normalise_call_put(get_col(row, leaps_header, "c / p", "c/p")),
-            "buy_sell": normalise_buy_sell(get_col(row, leaps_header, "buy/sell")),
-            "expiration": format_date(get_col(row, leaps_header, "expiration")),
-            "strike": safe_float(get_col(row, leaps_header, "strike")),
-            "delta": safe_float(get_col(row, leaps_header, "greeks (delta)")),
-            "iv_pct": safe_float(get_col(row, leaps_header, "greeks (iv%)")),
-            "qty": safe_int(get_col(row, leaps_header, "qty")),
-            "premium": safe_float(get_col(row, leaps_header, "premium")),
-            "status": normalise_status(get_col(row, leaps_header, "status")),
-            "close_date": format_date(get_col(row, leaps_header, "date closed")),
-            "close_premium": safe_float(get_col(row, leaps_header, "closing cost")),
-            "outer_strike": None,  # LEAPS table has no outer_strike column
-            "commission": commission,
-            "platform": "IBKR",
-            "notes": None,  # LEAPS table has no notes column
-        }
-        leaps_records.append(record)
-
+    leaps_records = extract_options(doc, LEAPS_TABLE, LEAPS_FIELDS)
     print(f"  Extracted {len(leaps_records)} LEAPS-table records")
 
     strat_counts = {}
@@ -276,14 +222,32 @@ def reimport():
     all_options = wheel_records + leaps_records
     print(f"\n=== Total options: {len(all_options)} ===")
 
-    # Clear existing records
-    print("\nClearing existing options records...")
-    deleted = client.delete_all_records(options_table_id)
-    print(f"  Deleted {deleted} existing records")
-
-    # Insert new records
-    print("\nInserting new records...")
-    client.bulk_insert(options_table_id, all_options)
+    if shadow_mode:
+        print("\nLoading options into a shadow table...")
+        shadow_id = create_shadow(client, "options", options_table_id)
+        client.bulk_insert(shadow_id, all_options)
+        swap_in(client, settings_table_id, "options", options_table_id, shadow_id)
+        drop_retired(client, [options_table_id], swap_grace())
+    elif "--replace" in sys.argv:
+        # Clear existing records
+        print("\nClearing existing options records...")
+        deleted = client.delete_all_records(options_table_id)
+        print(f"  Deleted {deleted} existing records")
+
+        # Insert new records
+        print("\nInserting new records...")
+        client.bulk_insert(options_table_id, all_options)
+    else:
+        print("\nDiffing against existing options records...")
+        existing = client.iter_records(
+            options_table_id, fields=list(all_options[0]) if all_options else None
+        )
+        plan = plan_sync(existing, all_options, OPTION_KEY_FIELDS)
+        print(
+            f"  {len(plan.inserts)} to insert, {len(plan.updates)} to update, "
+            f"{len(plan.deletes)} to delete, {plan.unchanged} unchanged"
+        )
+        apply_sync(client, options_table_id, plan)
 
     # Summary
     print("\n" + "=" * 50)
@@ -296,6 +260,8 @@ def reimport():
     for s, c in sorted(all_strats.items()):
         print(f"  {s}: {c}")
     print(f"  TOTAL: {len(all_options)}")
+    client.report_metrics()
+    client.close()
     print("\nDone.")
 
 
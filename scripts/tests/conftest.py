@@ -0,0 +1,36 @@
+"""Shared fixtures for the script tests.
+
+Tests run against utils/fake_nocodb.FakeNocoDB with the state directory
+redirected to a temporary one, so nothing touches a real NocoDB or
+scripts/.state.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Must be set before utils.state is imported
+os.environ["FOLIO_STATE_DIR"] = tempfile.mkdtemp(prefix="folio-test-")
+os.environ["NOCODB_META_TTL"] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.fake_nocodb import FakeNocoDB  # noqa: E402
+from utils.state import STATE_DIR  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def state_dir():
+    """An empty state directory for every test."""
+    shutil.rmtree(STATE_DIR, ignore_errors=True)
+    STATE_DIR.mkdir(parents=True)
+    yield STATE_DIR
+
+
+@pytest.fixture
+def server():
+    with FakeNocoDB() as fake:
+        yield fake
@@ -0,0 +1,30 @@
+"""AsyncNocoDBClient against FakeNocoDB."""
+
+import asyncio
+
+from utils.async_nocodb_client import AsyncNocoDBClient
+
+
+def test_gathers_work_across_tables(server):
+    async def run():
+        async with AsyncNocoDBClient(server.url, "token", server.base_id) as client:
+            ids = await client.ensure_tables(
+                {name: {"title": name, "columns": []} for name in ("a", "b", "c")}
+            )
+            counts = await asyncio.gather(
+                *(
+                    client.bulk_insert(tid, [{"n": i} for i in range(120)], batch_size=25)
+                    for tid in ids.values()
+                )
+            )
+            seen = [r["n"] async for r in client.iter_records(ids["b"], page_size=50)]
+            page = await client.get_records(ids["c"], {"limit": 5})
+            deleted = await client.truncate_tables(ids)
+            return ids, counts, seen, page, deleted
+
+    ids, counts, seen, page, deleted = asyncio.run(run())
+    assert counts == [120, 120, 120]
+    assert seen == list(range(120))
+    assert len(page["list"]) == 5
+    assert deleted == {"a": 120, "b": 120, "c": 120}
+    assert all(server.count(tid) == 0 for tid in ids.values())
@@ -0,0 +1,71 @@
+"""run_backfill write concurrency against FakeNocoDB."""
+
+import threading
+
+import pytest
+
+from backfill_derived import JOBS
+from utils.backfill import DEFAULT_CONCURRENCY, run_backfill
+from utils.fake_nocodb import FakeNocoDB
+from utils.nocodb_client import NocoDBClient
+
+JOB = JOBS["snapshot_gain_loss_pct"]
+ROWS = 1000  # ten PATCH batches at the default batch size
+
+
+@pytest.fixture
+def snapshots(monkeypatch):
+    """(server, table_id, client, peak PATCHes in flight) with stale rows."""
+    monkeypatch.delenv("BACKFILL_CONCURRENCY", raising=False)
+    with FakeNocoDB(latency=0.05) as server:
+        table_id = server.create_table("monthly_snapshots")
+        server.seed(table_id, [
+            {"gain_loss": float(i), "total_invested": 1000.0, "gain_loss_pct": None}
+            for i in range(ROWS)
+        ])
+        client = NocoDBClient(server.url, "token", server.base_id)  # concurrency 1
+        in_flight, peak, lock = [0], [0], threading.Lock()
+        send = client._request
+
+        def tracked(method, path, **kwargs):
+            if method != "PATCH":
+                return send(method, path, **kwargs)
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            try:
+                return send(method, path, **kwargs)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        monkeypatch.setattr(client, "_request", tracked)
+        yield server, table_id, client, peak
+        client.close()
+
+
+def gain_loss_pcts(server: FakeNocoDB, table_id: str) -> list:
+    return sorted(r["gain_loss_pct"] for r in server.tables[table_id].rows.values())
+
+
+def test_backfill_writes_concurrently_by_default(snapshots):
+    server, table_id, client, peak = snapshots
+    stats = run_backfill(client, table_id, JOB, apply=True)
+
+    assert stats.written == ROWS
+    assert 1 < peak[0] <= DEFAULT_CONCURRENCY
+    assert gain_loss_pcts(server, table_id) == [i / 10 for i in range(ROWS)]
+
+
+def test_backfill_concurrency_from_the_environment(monkeypatch, snapshots):
+    server, table_id, client, peak = snapshots
+    monkeypatch.setenv("BACKFILL_CONCURRENCY", "1")
+    assert run_backfill(client, table_id, JOB, apply=True).written == ROWS
+    assert peak[0] == 1
+
+
+def test_backfill_concurrency_argument_wins(monkeypatch, snapshots):
+    server, table_id, client, peak = snapshots
+    monkeypatch.setenv("BACKFILL_CONCURRENCY", "1")
+    assert run_backfill(client, table_id, JOB, apply=True, concurrency=2).written == ROWS
+    assert peak[0] == 2
@@ -0,0 +1,85 @@
+"""option_metrics against a scalar port of src/lib/options-shared.ts."""
+
+import math
+import random
+from datetime import date, timedelta
+
+from backfill_derived import SHORT_STRATEGIES, option_metrics
+from utils.backfill import day, num, source_columns, text
+
+SOURCES = (
+    text("buy_sell"), text("status"), text("strategy_type"), num("premium"),
+    num("close_premium"), num("qty"), num("strike"), num("outer_strike"),
+    day("opened"), day("close_date"),
+)
+
+
+def compute_return_pct(opt: dict) -> float | None:
+    """computeReturnPct (with computeProfit, computeDaysHeld, computeCollateral)."""
+    close = opt["close_premium"]
+    if close is None and opt["status"] in ("Expired", "Assigned"):
+        close = 0
+    if close is None:
+        return None
+    sign = 1 if opt["buy_sell"] == "Sell" else -1
+    profit = sign * (opt["premium"] - close) * opt["qty"] * 100
+    end = date.fromisoformat(opt["close_date"]) if opt["close_date"] else date.today()
+    days = (end - date.fromisoformat(opt["opened"])).days
+    if days <= 0:
+        return None
+    if opt["strategy_type"] in SHORT_STRATEGIES:
+        if opt["buy_sell"] != "Sell":
+            return None
+        width = (
+            abs(opt["strike"] - opt["outer_strike"])
+            if opt["outer_strike"] is not None else opt["strike"]
+        )
+        collateral = width * opt["qty"] * 100
+        return profit / collateral * 365 / days * 100 if collateral > 0 else None
+    cost = opt["premium"] * opt["qty"] * 100
+    return profit / cost * 100 if cost > 0 else None
+
+
+def random_option(rng: random.Random) -> dict:
+    opened = date(2023, 1, 1) + timedelta(days=rng.randrange(600))
+    closed = rng.random() < 0.7
+    return {
+        "buy_sell": rng.choice(("Buy", "Sell")),
+        "status": rng.choice(("Open", "Closed", "Expired", "Assigned", "Rolled")),
+        "strategy_type": rng.choice(("Wheel", "Collar", "VPCS", "PMCC", "LEAPS", "BET")),
+        "premium": round(rng.uniform(0, 20), 2),
+        "close_premium": round(rng.uniform(0, 20), 2) if rng.random() < 0.6 else None,
+        "qty": rng.randint(1, 5),
+        "strike": round(rng.uniform(5, 500), 1),
+        "outer_strike": round(rng.uniform(5, 500), 1) if rng.random() < 0.3 else None,
+        "opened": opened.isoformat(),
+        "close_date": (
+            (opened + timedelta(days=rng.randrange(-2, 120))).isoformat()
+            if closed else None
+        ),
+    }
+
+
+def test_closed_positions_match_compute_return_pct():
+    rng = random.Random(7)
+    options = [random_option(rng) for _ in range(2000)]
+    result = option_metrics(source_columns(SOURCES, options))
+    for i, opt in enumerate(options):
+        if not opt["close_date"]:
+            continue
+        expected = compute_return_pct(opt)
+        got = result["return_pct"][i]
+        if expected is None:
+            assert math.isnan(got), opt
+        else:
+            assert abs(got - expected) <= 1e-4, opt
+
+
+def test_open_positions_store_no_date_dependent_values():
+    rng = random.Random(11)
+    options = [random_option(rng) | {"close_date": None} for _ in range(500)]
+    result = option_metrics(source_columns(SOURCES, options))
+    short = [o["strategy_type"] in SHORT_STRATEGIES for o in options]
+    assert all(math.isnan(v) for v in result["days_held"])
+    assert all(math.isnan(v) for v in result["annualised_return_pct"])
+    assert all(math.isnan(v) for v, s in zip(result["return_pct"], short) if s)
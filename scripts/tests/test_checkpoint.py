@@ -0,0 +1,138 @@
+"""Import journals must not outlive the rows they acknowledge."""
+
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import migrate
+from utils.checkpoint import ImportJournal
+from utils.fake_nocodb import FakeNocoDB
+from utils.manifest import RowManifest
+from utils.nocodb_client import NocoDBClient
+
+
+def run_migrate(monkeypatch, server: FakeNocoDB, *args: str) -> None:
+    """migrate() against ``server``, uploading settings only (no workbook needed)."""
+    monkeypatch.setenv("NOCODB_BASE_URL", server.url)
+    monkeypatch.setenv("NOCODB_API_TOKEN", "token")
+    monkeypatch.setenv("NOCODB_BASE_ID", server.base_id)
+    monkeypatch.setattr("sys.argv", ["migrate.py", "--only", "settings", *args])
+    monkeypatch.setattr(
+        migrate,
+        "load_workbook",
+        lambda *a, **k: SimpleNamespace(fingerprint="workbook", sheets={}),
+    )
+    migrate.migrate()
+
+
+def settings_rows(server: FakeNocoDB) -> int:
+    (table_id,) = [t.table_id for t in server.tables.values() if t.title == "settings"]
+    return server.count(table_id)
+
+
+def test_journal_is_ignored_on_another_base(monkeypatch, server):
+    run_migrate(monkeypatch, server)
+    assert settings_rows(server) == len(migrate.SETTINGS_SEED)
+
+    with FakeNocoDB() as other:
+        run_migrate(monkeypatch, other)
+        assert settings_rows(other) == len(migrate.SETTINGS_SEED)
+
+
+def test_journal_is_discarded_when_rows_were_deleted(monkeypatch, server):
+    run_migrate(monkeypatch, server)
+    for table in server.tables.values():
+        table.rows.clear()
+
+    run_migrate(monkeypatch, server)
+    assert settings_rows(server) == len(migrate.SETTINGS_SEED)
+
+
+def test_journal_is_ignored_for_a_recreated_table(server):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    records = [{"n": i} for i in range(10)]
+    first = server.create_table("things")
+    journal = ImportJournal("things", "fp", first, client.target)
+    client.bulk_insert(first, records, journal=journal)
+
+    second = server.create_table("things")
+    journal = ImportJournal("things", "fp", second, client.target)
+    assert not journal.done and journal.acked_records == 0
+    client.bulk_insert(second, records, journal=journal)
+    assert server.count(second) == 10
+    client.close()
+
+
+def test_split_batch_acknowledges_the_half_that_was_written(monkeypatch):
+    with FakeNocoDB(max_batch=50) as server:
+        table_id = server.create_table("things")
+        records = [{"n": i} for i in range(100)]
+        client = NocoDBClient(server.url, "token", server.base_id)
+        journal = ImportJournal("things", "fp", table_id, client.target)
+
+        # 413 on the whole batch, the first half goes in, the second gets a 400
+        send = client._request
+        posts = []
+
+        def flaky(method, path, **kwargs):
+            if method == "POST":
+                posts.append(kwargs.get("batch_size"))
+                if len(posts) == 3:
+                    response = requests.Response()
+                    response.status_code = 400
+                    raise requests.HTTPError("400 Bad Request", response=response)
+            return send(method, path, **kwargs)
+
+        monkeypatch.setattr(client, "_request", flaky)
+        with pytest.raises(requests.HTTPError):
+            client.bulk_insert(table_id, records, batch_size=100, journal=journal)
+        assert server.count(table_id) == 50
+        assert journal.acked == [[0, 50]]
+
+        monkeypatch.setattr(client, "_request", send)
+        journal = ImportJournal("things", "fp", table_id, client.target)
+        client.bulk_insert(table_id, records, batch_size=100, journal=journal)
+        assert server.count(table_id) == 100
+        assert [r["n"] for r in server.tables[table_id].rows.values()] == list(range(100))
+        client.close()
+
+
+def test_inserts_are_not_retried_after_a_server_error(monkeypatch, server):
+    table_id = server.create_table("things")
+    client = NocoDBClient(server.url, "token", server.base_id)
+    send = client._request
+    posts = []
+
+    def committed_then_failed(method, path, **kwargs):
+        response = send(method, path, **kwargs)
+        if method == "POST":
+            posts.append(response)
+            failed = requests.Response()
+            failed.status_code = 502
+            raise requests.HTTPError("502 Bad Gateway", response=failed)
+        return response
+
+    monkeypatch.setattr(client, "_request", committed_then_failed)
+    with pytest.raises(requests.HTTPError):
+        client.bulk_insert(table_id, [{"n": i} for i in range(10)], batch_size=10)
+    assert len(posts) == 1
+    assert server.count(table_id) == 10
+    client.close()
+
+
+def test_clean_only_resets_the_cleaned_tables(monkeypatch, server, state_dir):
+    run_migrate(monkeypatch, server)
+    (deposits,) = [t.table_id for t in server.tables.values() if t.title == "deposits"]
+    client = NocoDBClient(server.url, "token", server.base_id)
+    journal = ImportJournal("deposits", "workbook", deposits, client.target)
+    journal.ack(0, 10)
+    journal.complete()
+    manifest = RowManifest("deposits", deposits, ("month", "platform"))
+    manifest.save([])
+    client.close()
+
+    run_migrate(monkeypatch, server, "--clean")
+    assert settings_rows(server) == len(migrate.SETTINGS_SEED)
+    assert ImportJournal("deposits", "workbook", deposits, client.target).done
+    assert (state_dir / "manifests" / "deposits.json").exists()
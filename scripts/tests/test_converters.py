@@ -0,0 +1,170 @@
+"""Column converters against the baseline per-cell rules.
+
+The oracle is a verbatim copy of the scalar helpers migrate.py used
+before extraction was compiled per column, so the compiled and cached
+paths are pinned to that behaviour even if utils.converters changes.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from utils.converters import RawColumn, convert_column, text_date_format
+from utils.workbook_cache import _encode
+
+
+# ---------------------------------------------------------------------------
+# Baseline rules (scripts/migrate.py before the converter rewrite)
+# ---------------------------------------------------------------------------
+
+
+def format_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str):
+        for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"):
+            try:
+                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+    return None
+
+
+def safe_float(value, default=None):
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip().replace(",", "")
+        if cleaned in ("", "-", "--", "–"):
+            return default
+        try:
+            return float(cleaned)
+        except ValueError:
+            return default
+    return default
+
+
+def safe_int(value, default=None):
+    f = safe_float(value, default=None)
+    if f is None:
+        return default
+    return int(f)
+
+
+def timedelta_to_days(value):
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return value.days
+    if isinstance(value, (int, float)):
+        return int(value)
+    return None
+
+
+BASELINE = {
+    "float": safe_float,
+    "int": safe_int,
+    "date": lambda v, default=None: format_date(v),
+    "days": lambda v, default=None: timedelta_to_days(v),
+}
+
+
+def raw(values: list) -> RawColumn:
+    """The column as the workbook cache stores it."""
+    strings: dict[str, int] = {}
+    encoded = [_encode(v, strings) for v in values]
+    return RawColumn(
+        np.array([e[0] for e in encoded], dtype=np.uint8),
+        np.array([e[1] for e in encoded], dtype=np.float64),
+        np.array([e[2] for e in encoded], dtype=np.int32),
+        list(strings),
+    )
+
+
+def both_paths(kind: str, values: list, default=None) -> tuple[list, list]:
+    return (
+        convert_column(kind, values, default),
+        convert_column(kind, raw(values), default),
+    )
+
+
+NUMBERS = [
+    None, 0, 7, -3, 2.5, -0.75, 1e6, True, False,
+    "1,234.5", "-1,000", " 12 ", "3.", ".5", "1e3",
+    "-", "--", "–", "", "   ", "abc", "12abc", "$5",
+]
+
+
+@pytest.mark.parametrize("kind", ["float", "int"])
+@pytest.mark.parametrize("default", [None, 0])
+def test_numbers_match_baseline(kind, default):
+    expected = [BASELINE[kind](v, default) for v in NUMBERS]
+    compiled, cached = both_paths(kind, NUMBERS, default)
+    assert compiled == expected
+    assert cached == expected
+    assert [type(v) for v in cached] == [type(v) for v in expected]
+
+
+@pytest.mark.parametrize("kind", ["float", "int"])
+def test_all_numeric_columns_match_baseline(kind):
+    values = [None, 1, 2.25, -4, 1e-9, 123456789]
+    expected = [BASELINE[kind](v) for v in values]
+    assert both_paths(kind, values) == (expected, expected)
+
+
+def test_days_match_baseline():
+    values = [
+        None, timedelta(days=3), timedelta(days=2, hours=23), timedelta(hours=-1),
+        timedelta(0), 5, 2.9, -1.5, "7", True,
+    ]
+    expected = [timedelta_to_days(v) for v in values]
+    assert both_paths("days", values) == (expected, expected)
+
+
+@pytest.mark.parametrize("values", [
+    # ISO text, datetimes and blanks mixed
+    [datetime(2024, 1, 2, 15, 30), "2024-03-04", None, "", "not a date",
+     datetime(2023, 12, 31, 23, 59, 59), "2024-02-29"],
+    # Day-first column
+    ["25/12/2023", "01/02/2024", "31/01/2024", None],
+    # Month-first column
+    ["12/25/2023", "01/31/2024", "02/29/2024"],
+    # Mixed formats: ISO strings in a day-first column
+    ["13/01/2024", "2024-05-06", "28/02/2024"],
+    # UTC-aware datetimes
+    [datetime(2024, 6, 1, 0, 0, tzinfo=timezone.utc), None],
+])
+def test_dates_match_baseline(values):
+    expected = [format_date(v) for v in values]
+    assert both_paths("date", values) == (expected, expected)
+
+
+def test_ambiguous_dates_follow_the_detected_column_format():
+    # Documented divergence: "03/04/2024" alone would be read day-first by
+    # the per-cell rules, but this column is month-first
+    values = ["04/25/2024", "03/04/2024"]
+    assert text_date_format(values) == "%m/%d/%Y"
+    assert format_date("03/04/2024") == "2024-04-03"
+    expected = ["2024-04-25", "2024-03-04"]
+    assert both_paths("date", values) == (expected, expected)
+
+
+def test_format_detected_on_an_earlier_chunk_is_kept():
+    first, second = ["04/25/2024"], ["03/04/2024"]
+    fmt = text_date_format(first)
+    assert convert_column("date", second, date_format=fmt) == ["2024-03-04"]
+    assert convert_column("date", raw(second), date_format=fmt) == ["2024-03-04"]
+    # Without it, the chunk on its own reads day-first like the baseline
+    assert convert_column("date", second) == ["2024-04-03"]
+
+
+def test_unknown_kind_raises():
+    with pytest.raises(ValueError):
+        convert_column("money", [1])
+    with pytest.raises(ValueError):
+        convert_column("money", raw([1]))
@@ -0,0 +1,110 @@
+"""plan_sync / apply_sync against FakeNocoDB."""
+
+from collections import Counter
+
+import pytest
+
+from utils.diff_sync import apply_sync, plan_sync
+from utils.nocodb_client import NocoDBClient
+
+KEY = ("ticker", "opened")
+FIELDS = ("ticker", "opened", "premium", "status")
+
+
+def option(ticker: str, opened: str, premium: float = 1.0, status: str = "Open") -> dict:
+    return {"ticker": ticker, "opened": opened, "premium": premium, "status": status}
+
+
+def rows(server, table_id: str) -> Counter:
+    return Counter(
+        tuple(r.get(f) for f in FIELDS) for r in server.tables[table_id].rows.values()
+    )
+
+
+def sync(client: NocoDBClient, table_id: str, incoming: list[dict]):
+    plan = plan_sync(client.iter_records(table_id), incoming, KEY)
+    apply_sync(client, table_id, plan)
+    return plan
+
+
+@pytest.fixture
+def table(server):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    table_id = server.create_table("options")
+    yield client, table_id
+    client.close()
+
+
+def test_plan_inserts_updates_and_deletes(server, table):
+    client, table_id = table
+    server.seed(table_id, [
+        option("AAPL", "2024-01-02"),
+        option("MSFT", "2024-01-03", premium=2.0),
+        option("TSLA", "2024-01-04"),
+    ])
+    incoming = [
+        option("AAPL", "2024-01-02"),  # unchanged
+        option("MSFT", "2024-01-03", premium=2.5, status="Closed"),  # edited
+        option("NVDA", "2024-01-05"),  # new; TSLA is gone
+    ]
+    plan = sync(client, table_id, incoming)
+
+    assert plan.unchanged == 1
+    assert [{k: v for k, v in u.items() if k != "Id"} for u in plan.updates] == [
+        {"premium": 2.5, "status": "Closed"}
+    ]
+    assert plan.inserts == [option("NVDA", "2024-01-05")]
+    assert len(plan.deletes) == 1
+    assert rows(server, table_id) == Counter(tuple(r[f] for f in FIELDS) for r in incoming)
+
+    # A second sync has nothing left to do
+    assert sync(client, table_id, incoming).total_writes == 0
+
+
+def test_rows_sharing_a_key_are_paired_in_order(server, table):
+    client, table_id = table
+    server.seed(table_id, [option("AAPL", "2024-01-02")] * 2)
+
+    plan = sync(client, table_id, [option("AAPL", "2024-01-02")] * 3)
+    assert (len(plan.inserts), len(plan.updates), len(plan.deletes)) == (1, 0, 0)
+    assert server.count(table_id) == 3
+
+    plan = sync(client, table_id, [option("AAPL", "2024-01-02")])
+    assert (len(plan.inserts), len(plan.updates), len(plan.deletes)) == (0, 0, 2)
+    assert server.count(table_id) == 1
+
+
+def test_fields_the_importer_does_not_send_are_left_alone(server, table):
+    client, table_id = table
+    (row_id,) = server.seed(table_id, [{**option("AAPL", "2024-01-02"), "profit": 42}])
+    # int vs float and "" vs null are not differences
+    plan = sync(client, table_id, [option("AAPL", "2024-01-02", premium=1)])
+    assert plan.total_writes == 0
+    plan = sync(client, table_id, [{**option("AAPL", "2024-01-02"), "status": ""}])
+    assert plan.updates == [{"Id": row_id, "status": ""}]
+    assert server.tables[table_id].rows[row_id]["profit"] == 42
+
+
+def test_partially_applied_sync_converges_on_rerun(server, table, monkeypatch):
+    client, table_id = table
+    server.seed(table_id, [option("AAPL", "2024-01-02"), option("TSLA", "2024-01-04")])
+    incoming = [
+        option("AAPL", "2024-01-02", premium=3.0),
+        option("NVDA", "2024-01-05"),
+        option("NVDA", "2024-01-05"),
+    ]
+
+    # Deletes go through, then the updates fail: inserts never run
+    def fail(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(client, "bulk_update", fail)
+    with pytest.raises(RuntimeError):
+        sync(client, table_id, incoming)
+    assert server.count(table_id) == 1
+    monkeypatch.undo()
+
+    plan = sync(client, table_id, incoming)
+    assert (len(plan.inserts), len(plan.updates), len(plan.deletes)) == (2, 1, 0)
+    assert rows(server, table_id) == Counter(tuple(r[f] for f in FIELDS) for r in incoming)
+    assert sync(client, table_id, incoming).total_writes == 0
@@ -0,0 +1,139 @@
+"""FXStore lookups, persistence and top-ups, with a fake rate source.
+
+Lookups are checked against the walk-back lookup backfill_deposit_usd.py
+used before the dense store (exact day, else up to five days earlier).
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from utils.fx_store import FXStore, day_ordinal
+
+
+def lookup_rate(all_rates: dict[str, float], target_date: str) -> float | None:
+    """Baseline: the exact date, else the nearest of the 5 days before it."""
+    dt = datetime.strptime(target_date[:10], "%Y-%m-%d")
+    for offset in range(6):
+        check = (dt - timedelta(days=offset)).strftime("%Y-%m-%d")
+        if check in all_rates:
+            return all_rates[check]
+    return None
+
+
+def days(start: str, end: str) -> list[str]:
+    lo, hi = date.fromisoformat(start), date.fromisoformat(end)
+    return [(lo + timedelta(days=i)).isoformat() for i in range((hi - lo).days + 1)]
+
+
+# Weekends, a one-day holiday, and a 9-day outage longer than MAX_GAP_DAYS
+MARKET = {
+    day: 1.20 + i / 1000
+    for i, day in enumerate(days("2024-01-01", "2024-02-29"))
+    if date.fromisoformat(day).weekday() < 5
+    and day != "2024-01-15"
+    and not "2024-02-05" <= day <= "2024-02-13"
+}
+
+
+class Source:
+    """Serves ``MARKET`` (or a later version of it) and logs every call."""
+
+    def __init__(self, market: dict[str, float]):
+        self.market = dict(market)
+        self.calls: list[tuple[date, date]] = []
+
+    def __call__(self, pair: str, start: date, end: date) -> dict[str, float]:
+        self.calls.append((start, end))
+        return {
+            day: rate for day, rate in self.market.items()
+            if start.isoformat() <= day <= end.isoformat()
+        }
+
+
+@pytest.fixture
+def store():
+    source = Source(MARKET)
+    fx = FXStore("GBPUSD", fetch=source)
+    fx.ensure("2024-01-01", "2024-02-29")
+    return fx
+
+
+def test_lookups_match_the_walk_back(store):
+    for day in days("2023-12-20", "2024-03-15"):
+        assert store.rate(day) == lookup_rate(MARKET, day), day
+
+
+def test_vectorised_lookups_match_rate(store):
+    span = days("2023-12-20", "2024-03-15")
+    expected = [store.rate(day) for day in span]
+    for query in (span, np.array([day_ordinal(d) for d in span])):
+        got = store.rates(query)
+        assert [None if np.isnan(v) else v for v in got] == expected
+
+
+def test_no_rate_before_the_first_observation(store):
+    assert store.rate("2023-12-31") is None
+    assert store.rate(date(1999, 1, 1)) is None
+    assert store.rate("2024-01-01T09:30:00") == MARKET["2024-01-01"]
+    assert np.isnan(store.rates(["2023-12-31"])).all()
+
+
+def test_gaps_fill_forward_up_to_max_gap(store):
+    assert store.rate("2024-01-13") == MARKET["2024-01-12"]  # Saturday
+    assert store.rate("2024-01-15") == MARKET["2024-01-12"]  # holiday Monday
+    assert store.rate("2024-02-07") == MARKET["2024-02-02"]  # 5 days on
+    assert store.rate("2024-02-08") is None  # 6 days on: too stale
+    assert store.rate("2024-02-14") == MARKET["2024-02-14"]
+    assert store.rate("2024-03-05") == MARKET["2024-02-29"]
+    assert store.rate("2024-03-06") is None
+
+
+def test_rates_persist_across_instances(store):
+    reloaded = FXStore("gbpusd")  # no fetcher: must not need one
+    assert reloaded.ensure("2024-01-10", "2024-02-20") == 0
+    assert reloaded.observed == MARKET
+    span = days("2023-12-20", "2024-03-15")
+    assert [reloaded.rate(d) for d in span] == [store.rate(d) for d in span]
+
+    with pytest.raises(RuntimeError, match="no fetcher"):
+        reloaded.ensure("2024-01-10", "2024-03-10")
+
+
+def test_covered_range_makes_no_calls(store):
+    calls = len(store.fetch.calls)
+    assert store.ensure("2024-01-05", "2024-02-10") == 0
+    assert len(store.fetch.calls) == calls
+
+
+def test_newer_rates_are_appended(store):
+    source = Source(MARKET)
+    source.market["2024-02-29"] = 1.5  # the stored close was intraday
+    source.market.update({day: 1.3 for day in days("2024-03-01", "2024-03-08")})
+    fx = FXStore("gbpusd", fetch=source)
+
+    assert fx.ensure("2024-01-01", "2024-03-08") == 1
+    # Only the tail is fetched, from the last stored day
+    assert source.calls == [(date(2024, 2, 29), date(2024, 3, 8))]
+    assert fx.rate("2024-02-29") == 1.5
+    assert fx.rate("2024-03-08") == 1.3
+    assert fx.rate("2024-03-13") == 1.3
+    assert fx.rate("2024-01-02") == MARKET["2024-01-02"]
+
+    reloaded = FXStore("gbpusd")
+    assert reloaded.fetched_through == "2024-03-08"
+    assert reloaded.rate("2024-03-08") == 1.3
+    assert reloaded.rate("2024-02-29") == 1.5
+
+
+def test_older_rates_are_prepended(store):
+    source = Source({"2023-12-28": 1.1, "2023-12-29": 1.11, **MARKET})
+    fx = FXStore("gbpusd", fetch=source)
+
+    assert fx.ensure("2023-12-25", "2024-02-29") == 1
+    assert source.calls == [(date(2023, 12, 25), date(2023, 12, 31))]
+    assert fx.rate("2023-12-31") == 1.11
+    assert fx.rate("2023-12-27") is None
+    assert fx.fetched_from == "2023-12-25"
+    assert FXStore("gbpusd").rate("2023-12-28") == 1.1
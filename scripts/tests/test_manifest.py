@@ -0,0 +1,272 @@
+"""Row manifests and --incremental sync against FakeNocoDB."""
+
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import migrate
+from utils.fake_nocodb import FakeNocoDB
+from utils.manifest import IncrementalSync, RowManifest, sync_table
+from utils.nocodb_client import NocoDBClient
+
+KEY = ("month", "platform")
+
+
+def deposit(month: str, platform: str, amount: float) -> dict:
+    return {"month": month, "platform": platform, "amount": amount}
+
+
+RECORDS = [
+    deposit("2024-01-01", "IBKR", 100.0),
+    deposit("2024-01-01", "Trading 212", 50.0),
+    deposit("2024-02-01", "IBKR", 120.0),
+]
+
+
+def contents(server: FakeNocoDB, table_id: str) -> dict[int, tuple]:
+    return {
+        row_id: (r["month"], r["platform"], r["amount"])
+        for row_id, r in server.tables[table_id].rows.items()
+    }
+
+
+@pytest.fixture
+def table(monkeypatch, server):
+    """(client, table_id, requests sent by method)."""
+    client = NocoDBClient(server.url, "token", server.base_id)
+    sent = Counter()
+    send = client._request
+
+    def counted(method, path, **kwargs):
+        sent[method] += 1
+        return send(method, path, **kwargs)
+
+    monkeypatch.setattr(client, "_request", counted)
+    yield client, server.create_table("deposits"), sent
+    client.close()
+
+
+def test_first_run_inserts_and_records_ids(server, table):
+    client, table_id, _ = table
+    plan = sync_table(client, "deposits", table_id, RECORDS, KEY)
+
+    assert len(plan.inserts) == len(RECORDS)
+    manifest = RowManifest("deposits", table_id, KEY)
+    assert manifest.valid
+    ids = sorted(row_id for rows in manifest.rows.values() for _, row_id in rows)
+    assert ids == sorted(server.tables[table_id].rows)
+
+
+def test_unchanged_rerun_sends_nothing(server, table):
+    client, table_id, sent = table
+    sync_table(client, "deposits", table_id, RECORDS, KEY)
+    before = contents(server, table_id)
+
+    sent.clear()
+    plan = sync_table(client, "deposits", table_id, list(reversed(RECORDS)), KEY)
+    assert plan.total_writes == 0
+    assert plan.unchanged == len(RECORDS)
+    assert sent == {}  # answered from the manifest alone
+    assert contents(server, table_id) == before
+
+
+def test_edited_row_is_patched_in_place(server, table):
+    client, table_id, sent = table
+    sync_table(client, "deposits", table_id, RECORDS, KEY)
+    ids = {v[:2]: k for k, v in contents(server, table_id).items()}
+
+    edited = [*RECORDS[:2], deposit("2024-02-01", "IBKR", 125.0)]
+    sent.clear()
+    plan = sync_table(client, "deposits", table_id, edited, KEY)
+    assert (len(plan.inserts), len(plan.updates), len(plan.deletes)) == (0, 1, 0)
+    assert plan.updates[0]["Id"] == ids[("2024-02-01", "IBKR")]
+    assert sent == {"PATCH": 1}
+    assert contents(server, table_id)[ids[("2024-02-01", "IBKR")]][2] == 125.0
+
+    assert sync_table(client, "deposits", table_id, edited, KEY).total_writes == 0
+
+
+def test_deleted_row_is_deleted(server, table):
+    client, table_id, sent = table
+    sync_table(client, "deposits", table_id, RECORDS, KEY)
+    ids = {v[:2]: k for k, v in contents(server, table_id).items()}
+
+    sent.clear()
+    plan = sync_table(client, "deposits", table_id, RECORDS[1:], KEY)
+    assert plan.deletes == [ids[("2024-01-01", "IBKR")]]
+    assert sent == {"DELETE": 1}
+    assert sorted(contents(server, table_id).values()) == sorted(
+        tuple(r.values()) for r in RECORDS[1:]
+    )
+    assert sync_table(client, "deposits", table_id, RECORDS[1:], KEY).total_writes == 0
+
+
+def test_inserted_duplicates_get_distinct_ids(server, table):
+    client, table_id, _ = table
+    sync_table(client, "deposits", table_id, RECORDS, KEY)
+    twice = [*RECORDS, deposit("2024-03-01", "IBKR", 10.0), deposit("2024-03-01", "IBKR", 10.0)]
+
+    plan = sync_table(client, "deposits", table_id, twice, KEY)
+    assert len(plan.inserts) == 2
+    manifest = RowManifest("deposits", table_id, KEY)
+    ids = [row_id for rows in manifest.rows.values() for _, row_id in rows]
+    assert len(ids) == len(set(ids)) == server.count(table_id) == 5
+    assert sync_table(client, "deposits", table_id, twice, KEY).total_writes == 0
+
+
+def test_manifest_is_ignored_for_another_table_or_key(server, table):
+    client, table_id, _ = table
+    sync_table(client, "deposits", table_id, RECORDS, KEY)
+
+    assert not RowManifest("deposits", server.create_table("deposits"), KEY).valid
+    assert not RowManifest("deposits", table_id, ("month",)).valid
+
+
+def test_failed_sync_leaves_no_manifest(monkeypatch, server, table):
+    client, table_id, _ = table
+    sync_table(client, "deposits", table_id, RECORDS, KEY)
+
+    def down(*args, **kwargs):
+        raise RuntimeError("server gone")
+
+    monkeypatch.setattr(client, "bulk_update", down)
+    with pytest.raises(RuntimeError):
+        sync_table(client, "deposits", table_id, [deposit("2024-01-01", "IBKR", 1.0)], KEY)
+    assert not RowManifest("deposits", table_id, KEY).valid
+
+
+def test_preserve_only_adds_missing_keys_on_the_first_sync(server, table):
+    client, table_id, _ = table
+    server.seed(table_id, [deposit("2024-01-01", "IBKR", 999.0), deposit("2023-12-01", "Hood", 1.0)])
+
+    plan = sync_table(client, "deposits", table_id, RECORDS, KEY, preserve=True)
+    assert (len(plan.inserts), len(plan.updates), len(plan.deletes)) == (2, 0, 0)
+    assert server.count(table_id) == 4
+    assert deposit("2024-01-01", "IBKR", 999.0) in [
+        {k: r[k] for k in ("month", "platform", "amount")}
+        for r in server.tables[table_id].rows.values()
+    ]
+
+
+# ---------------------------------------------------------------------------
+# IncrementalSync
+# ---------------------------------------------------------------------------
+
+
+def test_incremental_sync_sinks(server, table):
+    client, table_id, _ = table
+    with IncrementalSync(client, {"deposits": KEY}) as sync:
+        with sync.sink("deposits", table_id) as sink:
+            sink.extend(RECORDS)
+        with pytest.raises(ValueError):
+            sync.sink("deposits", table_id)
+        with pytest.raises(ValueError):
+            sync.sink("options", "m0000options")
+    assert sync.counts == {"deposits": len(RECORDS)}
+    assert sync.writes == len(RECORDS)
+    assert server.count(table_id) == len(RECORDS)
+
+
+def test_aborted_sink_writes_nothing(server, table):
+    client, table_id, sent = table
+    sync = IncrementalSync(client, {"deposits": KEY})
+    with pytest.raises(RuntimeError):
+        with sync.sink("deposits", table_id) as sink:
+            sink.put(RECORDS[0])
+            raise RuntimeError("extraction failed")
+    assert sent == {}
+    assert server.count(table_id) == 0
+    assert not RowManifest("deposits", table_id, KEY).valid
+
+
+# ---------------------------------------------------------------------------
+# migrate.py --incremental
+# ---------------------------------------------------------------------------
+
+DEPOSITED_HEADER = ["Month", "Total", "IBKR", None, "Trading 212", "Freetrade",
+                    "Stake", "Etoro", "Hood"]
+
+
+class Table:
+    def __init__(self, rows: list[list]):
+        self._rows = rows
+
+    def iter_rows(self, values_only: bool = True):
+        return (tuple(row) for row in self._rows)
+
+
+def workbook(deposited: list[list]):
+    rows = [DEPOSITED_HEADER, *deposited]
+    sheet = SimpleNamespace(tables={"Deposited": Table(rows)})
+    return SimpleNamespace(fingerprint=str(rows), sheets={"Transactions": sheet})
+
+
+def month(m: int, ibkr, t212=None) -> list:
+    return [datetime(2024, m, 1), None, ibkr, None, t212, None, None, None, None]
+
+
+def run_deposits(monkeypatch, server: FakeNocoDB, deposited, *args: str) -> None:
+    monkeypatch.setenv("NOCODB_BASE_URL", server.url)
+    monkeypatch.setenv("NOCODB_API_TOKEN", "token")
+    monkeypatch.setenv("NOCODB_BASE_ID", server.base_id)
+    monkeypatch.setattr("sys.argv", ["migrate.py", "--only", "deposits", *args])
+    monkeypatch.setattr(migrate, "load_workbook", lambda *a, **k: workbook(deposited))
+    migrate.migrate()
+
+
+def deposits(server: FakeNocoDB) -> dict[int, tuple]:
+    (table_id,) = [t.table_id for t in server.tables.values() if t.title == "deposits"]
+    return contents(server, table_id)
+
+
+def test_incremental_runs(monkeypatch, capsys, server):
+    sheet = [month(1, 100.0, 50.0), month(2, 120.0)]
+    run_deposits(monkeypatch, server, sheet, "--incremental")  # first run
+    first = deposits(server)
+    assert sorted(first.values()) == [
+        ("2024-01-01", "IBKR", 100.0),
+        ("2024-01-01", "Trading 212", 50.0),
+        ("2024-02-01", "IBKR", 120.0),
+    ]
+
+    capsys.readouterr()
+    run_deposits(monkeypatch, server, sheet, "--incremental")  # unchanged
+    assert "Incremental sync wrote 0 records" in capsys.readouterr().out
+    assert deposits(server) == first
+
+    sheet = [month(1, 100.0), month(2, 125.0), month(3, 10.0)]  # edit, delete, add
+    run_deposits(monkeypatch, server, sheet, "--incremental")
+    assert "Incremental sync wrote 3 records" in capsys.readouterr().out
+    after = deposits(server)
+    ids = {v[:2]: k for k, v in first.items()}
+    assert after[ids[("2024-02-01", "IBKR")]] == ("2024-02-01", "IBKR", 125.0)
+    assert ids[("2024-01-01", "Trading 212")] not in after
+    assert sorted(after.values()) == [
+        ("2024-01-01", "IBKR", 100.0),
+        ("2024-02-01", "IBKR", 125.0),
+        ("2024-03-01", "IBKR", 10.0),
+    ]
+
+
+def test_incremental_rerun_after_clean(monkeypatch, capsys, server):
+    sheet = [month(1, 100.0, 50.0), month(2, 120.0)]
+    run_deposits(monkeypatch, server, sheet, "--incremental")
+    old_ids = set(deposits(server))
+
+    # --clean reloads the table under new Ids, so the manifest must go
+    run_deposits(monkeypatch, server, sheet, "--clean")
+    assert not set(deposits(server)) & old_ids
+
+    capsys.readouterr()
+    sheet = [month(1, 100.0, 55.0), month(2, 120.0)]
+    run_deposits(monkeypatch, server, sheet, "--incremental")
+    out = capsys.readouterr().out
+    assert "No manifest for 'deposits'" in out
+    assert "Incremental sync wrote 1 records" in out
+    assert sorted(deposits(server).values()) == [
+        ("2024-01-01", "IBKR", 100.0),
+        ("2024-01-01", "Trading 212", 55.0),
+        ("2024-02-01", "IBKR", 120.0),
+    ]
@@ -0,0 +1,64 @@
+"""Mirror.refresh against FakeNocoDB."""
+
+import pytest
+
+from utils.mirror import Mirror
+from utils.nocodb_client import NocoDBClient
+
+
+@pytest.fixture
+def setup(server, state_dir):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    with Mirror(state_dir / "mirror.sqlite") as mirror:
+        yield client, mirror
+    client.close()
+
+
+def amounts(mirror: Mirror) -> dict[int, float]:
+    return {r["Id"]: r["amount"] for r in mirror.iter_records("deposits")}
+
+
+def test_tables_without_updated_at_see_edits(server, setup):
+    client, mirror = setup
+    table_id = server.create_table("deposits")
+    server.seed(table_id, [{"amount": float(i)} for i in range(5)])
+    rows = server.tables[table_id].rows
+    for row in rows.values():
+        del row["UpdatedAt"]
+
+    mirror.refresh(client, "deposits", table_id)
+    assert amounts(mirror) == {1: 0.0, 2: 1.0, 3: 2.0, 4: 3.0, 5: 4.0}
+
+    # Edit an existing row (no UpdatedAt to find it by), delete and add one
+    rows[2]["amount"] = 99.0
+    del rows[4]
+    (new_id,) = server.seed(table_id, [{"amount": 7.0}])
+    del rows[new_id]["UpdatedAt"]
+
+    mirror.refresh(client, "deposits", table_id)
+    assert amounts(mirror) == {1: 0.0, 2: 99.0, 3: 2.0, 5: 4.0, 6: 7.0}
+
+
+def test_tables_with_updated_at_refresh_incrementally(server, setup):
+    client, mirror = setup
+    table_id = server.create_table("deposits")
+    server.seed(table_id, [{"amount": float(i)} for i in range(50)])
+    assert mirror.refresh(client, "deposits", table_id) == 50
+
+    client.bulk_update(table_id, [{"Id": 3, "amount": 99.0}])
+    client.delete_records(table_id, [10])
+    # Only rows updated since the last refresh's day come back
+    mirror.refresh(client, "deposits", table_id)
+    assert amounts(mirror)[3] == 99.0
+    assert 10 not in amounts(mirror)
+    assert mirror.count("deposits") == 49
+
+
+def test_empty_table_switches_to_incremental_once_rows_appear(server, setup):
+    client, mirror = setup
+    table_id = server.create_table("deposits")
+    mirror.refresh(client, "deposits", table_id)
+    server.seed(table_id, [{"amount": 1.0}])
+    mirror.refresh(client, "deposits", table_id)
+    assert mirror._meta("deposits")["has_updated_at"]
+    assert amounts(mirror) == {1: 1.0}
@@ -0,0 +1,39 @@
+"""NocoDBClient write paths against FakeNocoDB."""
+
+from utils.fake_nocodb import FakeNocoDB
+from utils.nocodb_client import NocoDBClient
+
+
+def test_insert_batches_reports_every_batch_in_order():
+    with FakeNocoDB(latency=0.005, latency_per_record=0.0002) as server:
+        table_id = server.create_table("things")
+        client = NocoDBClient(server.url, "token", server.base_id, pool_size=8)
+        # Eight batches in flight finish in whatever order the server answers
+        records = [{"n": i} for i in range(1000)]
+        results = client.insert_batches(table_id, records, batch_size=50, max_in_flight=8)
+        client.close()
+
+    assert [r.index for r in results] == list(range(20))
+    assert [r.offset for r in results] == list(range(0, 1000, 50))
+    assert all(r.ok and r.size == 50 for r in results)
+    assert server.count(table_id) == 1000
+
+
+def test_insert_batches_captures_failures_per_batch():
+    with FakeNocoDB(error_rate=0.3, seed=3) as server:
+        table_id = server.create_table("things")
+        client = NocoDBClient(server.url, "token", server.base_id)
+        records = [{"n": i} for i in range(400)]
+        results = client.insert_batches(table_id, records, batch_size=20, max_in_flight=4)
+        client.close()
+
+    assert [r.index for r in results] == list(range(20))
+    failed = [r for r in results if not r.ok]
+    assert failed and all(r.error is not None for r in failed)
+    # Exactly the acknowledged batches were written
+    assert server.count(table_id) == sum(r.size for r in results if r.ok)
+    written = sorted(row["n"] for row in server.tables[table_id].rows.values())
+    expected = sorted(
+        n for r in results if r.ok for n in range(r.offset, r.offset + r.size)
+    )
+    assert written == expected
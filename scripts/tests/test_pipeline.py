@@ -0,0 +1,83 @@
+"""UploadPipeline against FakeNocoDB."""
+
+import threading
+
+import pytest
+
+from utils.checkpoint import ImportJournal
+from utils.nocodb_client import NocoDBClient
+from utils.pipeline import PipelineAborted, UploadPipeline
+
+
+@pytest.fixture
+def client(server):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    yield client
+    client.close()
+
+
+def test_uploads_every_table(server, client):
+    ids = {name: server.create_table(name) for name in ("a", "b")}
+    journals = {
+        name: ImportJournal(name, "fp", table_id, client.target)
+        for name, table_id in ids.items()
+    }
+    with UploadPipeline(client, journals, chunk_size=7, max_chunks=2) as pipeline:
+        for name, table_id in ids.items():
+            with pipeline.sink(name, table_id) as sink:
+                sink.extend({"n": i} for i in range(50))
+    assert pipeline.counts == {"a": 50, "b": 50}
+    assert all(server.count(t) == 50 for t in ids.values())
+    assert all(j.done for j in journals.values())
+
+
+def test_queue_is_bounded(server, client):
+    # A slow server: the producer must wait instead of buffering everything
+    server.faults.latency = 0.02
+    table_id = server.create_table("a")
+    peak = 0
+    with UploadPipeline(client, chunk_size=5, max_chunks=2) as pipeline:
+        with pipeline.sink("a", table_id) as sink:
+            for i in range(100):
+                sink.put({"n": i})
+                peak = max(peak, sink._queue.qsize())
+    assert peak <= 2
+    assert server.count(table_id) == 100
+
+
+def test_worker_error_is_raised_without_blocking_the_producer(server, client):
+    table_id = server.create_table("a")
+    with pytest.raises(Exception, match="404"):
+        with UploadPipeline(client, chunk_size=5, max_chunks=1) as pipeline:
+            with pipeline.sink("a", "missing") as sink:
+                # Far more than the queue holds: would deadlock if the
+                # failed worker stopped draining it
+                sink.extend({"n": i} for i in range(500))
+            with pipeline.sink("b", table_id) as other:
+                other.extend({"n": i} for i in range(20))
+    assert isinstance(pipeline.sinks["a"].error, Exception)
+    assert pipeline.sinks["b"].error is None
+    assert server.count(table_id) == 20
+
+
+def test_producer_failure_uploads_queued_chunks_but_leaves_journal_open(server, client):
+    table_id = server.create_table("a")
+    journal = ImportJournal("a", "fp", table_id, client.target)
+    with pytest.raises(ValueError, match="bad row"):
+        with UploadPipeline(client, {"a": journal}, chunk_size=10) as pipeline:
+            with pipeline.sink("a", table_id) as sink:
+                for i in range(35):
+                    sink.put({"n": i})
+                raise ValueError("bad row")
+    assert isinstance(pipeline.sinks["a"].error, PipelineAborted)
+    assert server.count(table_id) == 35
+    assert journal.acked_records == 35 and not journal.done
+    assert not any(t.name.startswith("upload-") for t in threading.enumerate())
+
+
+def test_one_sink_per_table(server, client):
+    table_id = server.create_table("a")
+    with UploadPipeline(client) as pipeline:
+        pipeline.sink("a", table_id)
+        with pytest.raises(ValueError):
+            pipeline.sink("a", table_id)
@@ -0,0 +1,149 @@
+"""Token-bucket pacing on a fake clock, and 429 retries in the client."""
+
+import time
+
+import pytest
+
+from utils.fake_nocodb import FakeNocoDB
+from utils.nocodb_client import NocoDBClient
+from utils.rate_limit import GROWTH, MIN_RATE, RateLimiter
+
+
+class Clock:
+    """Fake time: ``sleep`` advances it and records how long it slept."""
+
+    def __init__(self):
+        self.now = 1_000.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def limiter(clock: Clock, rate=None, burst=None) -> RateLimiter:
+    return RateLimiter("api.test", rate, burst, clock=clock, sleep=clock.sleep)
+
+
+def test_fresh_bucket_allows_one_burst(clock):
+    bucket = limiter(clock, rate=2, burst=5)
+    assert [bucket.acquire() for _ in range(5)] == [0.0] * 5
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1_000.5)
+
+
+def test_burst_defaults_to_one_second_of_rate(clock):
+    assert limiter(clock, rate=4).burst == 4
+    assert limiter(clock, rate=0.5).burst == 1
+
+
+def test_refill_rate_paces_sustained_requests(clock):
+    bucket = limiter(clock, rate=10, burst=3)
+    for _ in range(3):
+        bucket.acquire()
+    start = clock.now
+    for _ in range(50):
+        bucket.acquire()
+    assert clock.now - start == pytest.approx(5.0)
+
+
+def test_idle_refill_is_capped_at_the_burst(clock):
+    bucket = limiter(clock, rate=2, burst=3)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 1.0  # refills 2 tokens
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() > 0
+
+    clock.now += 3600  # an hour idle refills only up to the burst
+    assert [bucket.acquire() for _ in range(3)] == [0.0] * 3
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_unlimited_never_waits(clock):
+    bucket = limiter(clock)
+    assert sum(bucket.acquire() for _ in range(1000)) == 0
+    assert clock.slept == []
+
+
+def test_429_halves_the_rate_and_successes_regrow_it(clock):
+    bucket = limiter(clock, rate=8, burst=8)
+    bucket.observe(429)
+    assert bucket.rate == 4
+    assert bucket.acquire() == pytest.approx(0.25)  # the bucket was emptied
+
+    for _ in range(10):
+        bucket.observe(200)
+    assert bucket.rate == pytest.approx(4 * GROWTH**10)
+    for _ in range(100):
+        bucket.observe(200)
+    assert bucket.rate == 8  # back at, never above, the configured limit
+
+    for _ in range(20):
+        bucket.observe(429)
+    assert bucket.rate == MIN_RATE
+
+
+def test_429_without_a_limit_starts_from_the_observed_rate(clock):
+    bucket = limiter(clock)
+    for _ in range(11):
+        bucket.acquire()
+        clock.now += 0.1  # 10 requests per second
+    bucket.observe(429)
+    assert bucket.rate == pytest.approx(5.0)
+
+
+def test_retry_after_pauses_every_caller(clock):
+    bucket = limiter(clock, rate=100, burst=100)
+    bucket.observe(429, {"Retry-After": "3"})
+    # The bucket refills while paused, so no token wait follows the pause
+    assert bucket.acquire() == pytest.approx(3.0)
+    assert bucket.backoff(1, {"Retry-After": "2"}) == 2.0
+
+
+def test_rate_limit_headers_cap_the_bucket(clock):
+    bucket = limiter(clock, rate=10, burst=10)
+    bucket.observe(200, {"X-RateLimit-Remaining": "2"})
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() > 0
+
+    bucket.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7"})
+    assert bucket.acquire() >= 7.0
+
+
+def read_many(server: FakeNocoDB, bucket: RateLimiter, n: int) -> dict:
+    """``n`` single-record reads; returns the GET metrics summary."""
+    table_id = server.create_table("things")
+    client = NocoDBClient(server.url, "token", server.base_id, limiter=bucket)
+    for _ in range(n):
+        client.get_records(table_id, {"limit": 1})
+    client.close()
+    (reads,) = [s for key, s in client.metrics.summary().items() if key.startswith("GET")]
+    return reads
+
+
+def test_client_follows_rate_limit_headers_without_429s():
+    with FakeNocoDB(rate_limit=20) as server:
+        start = time.monotonic()
+        reads = read_many(server, RateLimiter("fake"), 40)
+        elapsed = time.monotonic() - start
+    assert reads["statuses"] == {"200": 40}
+    assert elapsed >= 0.9  # 20 from the burst, then 20 per second
+
+
+def test_client_retries_429_and_learns_the_rate(monkeypatch):
+    with FakeNocoDB(rate_limit=20) as server:
+        monkeypatch.setattr(server, "rate_headers", lambda: {})  # Retry-After only
+        bucket = RateLimiter("fake")  # starts unlimited
+        reads = read_many(server, bucket, 40)
+    assert reads["statuses"]["200"] == 40  # every 429 was retried
+    assert reads["statuses"]["429"] == reads["retries"] > 0
+    assert bucket.rate is not None  # learned from the first 429
@@ -0,0 +1,67 @@
+"""Shadow loads keep the live table's columns across the swap."""
+
+from utils.nocodb_client import NocoDBClient
+from utils.schemas import TABLE_SCHEMAS
+from utils.shadow import create_shadow, resolve_table_ids, swap_in
+
+
+def column_names(client: NocoDBClient, table_id: str) -> list[str]:
+    return [
+        c.get("column_name") or c.get("title")
+        for c in client.table_columns(table_id, refresh=True)
+    ]
+
+
+def test_swap_keeps_every_live_column(server):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    ids = client.ensure_tables(
+        {n: TABLE_SCHEMAS[n] for n in ("settings", "options", "deposits")}
+    )
+    # Columns added after creation: currency companions, and a column
+    # described the way the NocoDB meta API returns select options
+    client.ensure_columns(
+        ids["options"],
+        [{"column_name": c, "uidt": "Decimal"} for c in ("premium_usd", "premium_gbp")],
+    )
+    client.add_column(ids["options"], {
+        "title": "broker_account",
+        "column_name": "broker_account",
+        "uidt": "SingleSelect",
+        "colOptions": {"options": [{"title": "ISA"}, {"title": "GIA"}]},
+    })
+    server.tables[ids["options"]].columns.append(
+        {"title": "CreatedAt", "column_name": "created_at", "uidt": "CreatedTime", "system": True}
+    )
+    server.seed(ids["options"], [{"ticker": "AAPL", "outer_strike": 150.0, "premium_usd": 2.0}])
+
+    for name in ("options", "deposits"):
+        live = ids[name]
+        before = column_names(client, live)
+        shadow = create_shadow(client, name, live)
+        client.bulk_insert(shadow, [{"ticker": "AAPL"}] if name == "options" else [])
+        swap_in(client, ids["settings"], name, live, shadow)
+
+        current = resolve_table_ids(client, ids["settings"], {name: live})[name]
+        assert current == shadow
+        after = column_names(client, current)
+        assert [c for c in before if c != "created_at"] == after
+
+    current = resolve_table_ids(client, ids["settings"], {"options": ids["options"]})
+    columns = {
+        c["column_name"]: c
+        for c in client.table_columns(current["options"], refresh=True)
+    }
+    assert columns["broker_account"]["dtxp"] == "'ISA','GIA'"
+    for column in ("outer_strike", "commission", "platform", "premium_usd", "premium_gbp"):
+        assert column in columns
+    assert "Collar" in columns["strategy_type"]["dtxp"]
+    client.close()
+
+
+def test_shadow_adds_schema_columns_the_live_table_lacks(server):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    live = server.create_table("deposits", [{"column_name": "month", "uidt": "Date"}])
+    shadow = create_shadow(client, "deposits", live)
+    assert column_names(client, shadow)[:2] == ["Id", "month"]
+    assert set(column_names(client, shadow)) >= {"amount", "amount_usd", "platform"}
+    client.close()
@@ -0,0 +1,114 @@
+"""Step selection and DAG execution."""
+
+import threading
+import time
+
+import pytest
+
+import migrate
+from utils.nocodb_client import NocoDBClient
+from utils.pipeline import UploadPipeline
+from utils.steps import Step, StepRunner, select_steps
+
+
+def test_only_pulls_in_producers_without_uploading_them():
+    steps, selected = select_steps(migrate.MIGRATION_STEPS, only={"symbols"})
+    assert selected == {"symbols"}
+    assert [s.name for s in steps] == [
+        "symbol_metadata", "transactions", "options", "symbols"
+    ]
+
+
+def test_skip_keeps_producers_a_selected_step_needs():
+    steps, selected = select_steps(migrate.MIGRATION_STEPS, skip={"transactions"})
+    assert "transactions" not in selected
+    assert "transactions" in [s.name for s in steps]
+    assert "symbols" in selected
+
+    steps, selected = select_steps(migrate.MIGRATION_STEPS, skip={"symbols", "deposits"})
+    assert {s.name for s in steps} == {
+        "symbol_metadata", "transactions", "options", "monthly_snapshots", "settings"
+    }
+
+
+def test_unknown_steps_and_missing_producers_raise():
+    with pytest.raises(ValueError, match="Unknown step"):
+        select_steps(migrate.MIGRATION_STEPS, only={"nope"})
+    orphan = [Step("b", lambda s, c: None, inputs=("a_out",))]
+    with pytest.raises(ValueError, match="No step produces"):
+        select_steps(orphan)
+
+
+def make_steps(log: list, lock: threading.Lock) -> list[Step]:
+    def step(name, outputs=(), records=0, delay=0.0):
+        def run(state, ctx):
+            with lock:
+                log.append(("start", name))
+            for i in ctx.step.inputs:
+                assert ctx.get(i) == f"{i}!"
+            time.sleep(delay)
+            for o in outputs:
+                ctx.put(o, f"{o}!")
+            with lock:
+                log.append(("end", name))
+            return ({"step": name, "n": i} for i in range(records))
+        return run
+
+    return [
+        Step("slow", step("slow", ("x",), records=3, delay=0.05), table="t_slow", outputs=("x",)),
+        Step("fast", step("fast", ("y",), records=2), table="t_fast", outputs=("y",)),
+        Step("join", step("join", records=4), table="t_join", inputs=("x", "y")),
+        Step("free", step("free", records=1), table="t_free"),
+    ]
+
+
+@pytest.fixture
+def runner_env(server):
+    client = NocoDBClient(server.url, "token", server.base_id)
+    targets = {t: server.create_table(t) for t in ("t_slow", "t_fast", "t_join", "t_free")}
+    yield client, targets
+    client.close()
+
+
+def test_runner_orders_by_dependencies_and_uploads_only_selected(server, runner_env):
+    client, targets = runner_env
+    log, lock = [], threading.Lock()
+    steps, selected = select_steps(make_steps(log, lock), only={"join", "free"})
+    with UploadPipeline(client) as pipeline:
+        runner = StepRunner(steps, None, pipeline, targets)
+        timings = runner.run(selected)
+
+    # join starts only after both producers ended
+    join_start = log.index(("start", "join"))
+    assert log.index(("end", "slow")) < join_start
+    assert log.index(("end", "fast")) < join_start
+    # Independent steps ran concurrently with the slow one
+    assert log.index(("start", "fast")) < log.index(("end", "slow"))
+    assert timings["join"].deps == ["fast", "slow"]
+    assert {n: t.records for n, t in timings.items()} == {
+        "slow": 3, "fast": 2, "join": 4, "free": 1
+    }
+    # Producers ran for their outputs only
+    counts = {t: server.count(tid) for t, tid in targets.items()}
+    assert counts == {"t_slow": 0, "t_fast": 0, "t_join": 4, "t_free": 1}
+
+
+def test_runner_rejects_cycles_undeclared_outputs_and_shared_tables(runner_env):
+    client, targets = runner_env
+    noop = lambda state, ctx: None  # noqa: E731
+    cycle = [
+        Step("a", noop, inputs=("b_out",), outputs=("a_out",)),
+        Step("b", noop, inputs=("a_out",), outputs=("b_out",)),
+    ]
+    with UploadPipeline(client) as pipeline:
+        with pytest.raises(RuntimeError, match="cycle"):
+            StepRunner(cycle, None, pipeline, targets).run(set())
+        lazy = [Step("a", noop, outputs=("a_out",))]
+        with pytest.raises(RuntimeError, match="did not produce"):
+            StepRunner(lazy, None, pipeline, targets).run(set())
+        shared = [
+            Step("a", noop, table="t_free"),
+            Step("b", noop, table="t_free"),
+        ]
+        with pytest.raises(ValueError, match="only one step"):
+            StepRunner(shared, None, pipeline, targets).run({"a", "b"})
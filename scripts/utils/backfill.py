@@ -0,0 +1,267 @@
+"""Derived-column backfills: compute columns from other columns, write only changes.
+
+A ``BackfillJob`` declares the table, the source fields it reads (typed,
+see ``num`` / ``day`` / ``text``), a vectorised ``compute`` function and
+its ``Output`` columns with a change tolerance each:
+
+    JOB = BackfillJob(
+        "snapshot_gain_loss_pct",
+        "monthly_snapshots",
+        (num("gain_loss"), num("total_invested")),
+        lambda c: {"gain_loss_pct": np.round(c["gain_loss"] / c["total_invested"] * 100, 4)},
+        (Output("gain_loss_pct", tolerance=1e-4),),
+    )
+
+``run_backfill`` streams the table page by page and, per chunk of
+``chunk_size`` records, turns the source fields into numpy arrays, calls
+``compute`` once, keeps the rows where an output moved by more than its
+tolerance (or changed between null and a value) and PATCHes them through
+``bulk_update`` with ``concurrency`` batches in flight (default
+``BACKFILL_CONCURRENCY``, see ``backfill_concurrency``). After each chunk
+is written the last ``Id`` is saved to ``backfills/<job>.json`` in the
+state directory, so an interrupted run resumes after it; the checkpoint
+is removed once the whole table is done. Dry runs compute and count but
+neither write nor checkpoint.
+
+``compute`` returns one float array per output; NaN means null.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+from .converters import safe_float
+from .fx_store import day_ordinal
+from .nocodb_client import NocoDBClient
+from .state import STATE_DIR, load_json, save_json
+
+BACKFILL_DIR = "backfills"
+CHUNK_SIZE = 2000  # records computed (and written) per step
+PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 4  # PATCH batches in flight
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    kind: str  # "num" -> float (NaN if null), "day" -> day ordinal (NaN), "text"
+
+
+def num(name: str) -> Source:
+    return Source(name, "num")
+
+
+def day(name: str) -> Source:
+    """A date field as days since 1970-01-01 (float, NaN if empty)."""
+    return Source(name, "day")
+
+
+def text(name: str) -> Source:
+    return Source(name, "text")
+
+
+@dataclass(frozen=True)
+class Output:
+    name: str
+    tolerance: float = 0.01  # smaller differences are not written
+    uidt: str = "Decimal"  # column type if the column has to be added
+    integer: bool = False  # write as int (e.g. day counts)
+
+
+@dataclass(frozen=True)
+class BackfillJob:
+    name: str
+    table: str
+    sources: tuple[Source, ...]
+    compute: Callable[[dict[str, np.ndarray]], dict[str, np.ndarray]]
+    outputs: tuple[Output, ...]
+    description: str = ""
+
+    def fields(self) -> list[str]:
+        return ["Id", *dict.fromkeys(
+            [s.name for s in self.sources] + [o.name for o in self.outputs]
+        )]
+
+
+@dataclass
+class BackfillStats:
+    job: str
+    scanned: int = 0
+    changed: int = 0
+    written: int = 0
+    resumed_after: int = 0
+    elapsed: float = 0.0
+    samples: list[dict] = field(default_factory=list)  # first few changes
+
+
+# ---------------------------------------------------------------------------
+# Column extraction
+# ---------------------------------------------------------------------------
+
+
+def _floats(values: list) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)  # None -> NaN
+    except (TypeError, ValueError):
+        return np.array([safe_float(v, np.nan) for v in values], dtype=np.float64)
+
+
+def _days(values: list) -> np.ndarray:
+    cache: dict = {}
+    out = np.empty(len(values))
+    for i, v in enumerate(values):
+        if v not in cache:
+            cache[v] = float(day_ordinal(str(v))) if v else np.nan
+        out[i] = cache[v]
+    return out
+
+
+def source_columns(sources: Iterable[Source], records: list[dict]) -> dict[str, np.ndarray]:
+    """Typed numpy columns for ``records``."""
+    columns = {}
+    for s in sources:
+        values = [r.get(s.name) for r in records]
+        if s.kind == "num":
+            columns[s.name] = _floats(values)
+        elif s.kind == "day":
+            columns[s.name] = _days(values)
+        else:
+            columns[s.name] = np.array(values, dtype=object)
+    return columns
+
+
+def today_ordinal() -> int:
+    return day_ordinal(date.today())
+
+
+# ---------------------------------------------------------------------------
+# Change detection
+# ---------------------------------------------------------------------------
+
+
+def changed_rows(job: BackfillJob, records: list[dict]) -> list[dict]:
+    """``{"Id", output: value, ...}`` for records whose outputs changed."""
+    if not records:
+        return []
+    results = job.compute(source_columns(job.sources, records))
+    ids = [r["Id"] for r in records]
+    updates: dict[int, dict] = {}
+    for out in job.outputs:
+        new = np.asarray(results[out.name], dtype=np.float64)
+        old = _floats([r.get(out.name) for r in records])
+        new_null, old_null = np.isnan(new), np.isnan(old)
+        with np.errstate(invalid="ignore"):
+            moved = np.abs(new - old) > out.tolerance
+        stale = (new_null != old_null) | (~new_null & ~old_null & moved)
+        for i in np.flatnonzero(stale).tolist():
+            value = None if new_null[i] else (
+                int(round(new[i])) if out.integer else float(new[i])
+            )
+            updates.setdefault(ids[i], {"Id": ids[i]})[out.name] = value
+    return list(updates.values())
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+
+class BackfillCheckpoint:
+    """Last fully written ``Id`` of an interrupted backfill."""
+
+    def __init__(self, job: str, table_id: str):
+        self.name = f"{BACKFILL_DIR}/{job}.json"
+        self.table_id = table_id
+        (STATE_DIR / BACKFILL_DIR).mkdir(parents=True, exist_ok=True)
+        state = load_json(self.name, {})
+        self.after_id = state.get("after_id", 0) if state.get("table_id") == table_id else 0
+
+    def save(self, after_id: int) -> None:
+        self.after_id = after_id
+        save_json(self.name, {"table_id": self.table_id, "after_id": after_id})
+
+    def clear(self) -> None:
+        path = STATE_DIR / self.name
+        if path.exists():
+            os.remove(path)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def backfill_concurrency() -> int:
+    """PATCH batches kept in flight (``BACKFILL_CONCURRENCY``, default 4).
+
+    Independent of NOCODB_CONCURRENCY, which defaults to 1 for the
+    importers: backfill writes are PATCHes of existing Ids, so a batch
+    repeated after a failure rewrites the same values.
+    """
+    return int(os.environ.get("BACKFILL_CONCURRENCY", DEFAULT_CONCURRENCY))
+
+
+def _chunks(records: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    source = iter(records)
+    while chunk := list(islice(source, size)):
+        yield chunk
+
+
+def run_backfill(
+    client: NocoDBClient,
+    table_id: str,
+    job: BackfillJob,
+    apply: bool = False,
+    records: Iterable[dict] | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    concurrency: int | None = None,
+    resume: bool = True,
+) -> BackfillStats:
+    """Backfill ``job``'s outputs on ``table_id``.
+
+    ``records`` replaces the live scan (e.g. mirrored records for a dry
+    run). With ``apply`` changed rows are written and the run checkpoints
+    after every chunk; ``resume=False`` ignores an earlier checkpoint.
+    ``concurrency`` defaults to ``backfill_concurrency()``.
+    """
+    concurrency = concurrency or backfill_concurrency()
+    stats = BackfillStats(job.name)
+    start = time.perf_counter()
+    checkpoint = BackfillCheckpoint(job.name, table_id) if apply else None
+    after = checkpoint.after_id if checkpoint and resume else 0
+    stats.resumed_after = after
+    if records is None:
+        # Sources the table lacks (e.g. optional columns) read as null
+        known = {
+            c.get("column_name") or c.get("title")
+            for c in client.table_columns(table_id)
+        }
+        fields = [f for f in job.fields() if f in known or f == "Id" or not known]
+        where = f"(Id,gt,{after})" if after else None
+        records = client.iter_records(
+            table_id, fields=fields, where=where, page_size=PAGE_SIZE
+        )
+    elif after:
+        records = (r for r in records if r["Id"] > after)
+
+    for chunk in _chunks(records, chunk_size):
+        updates = changed_rows(job, chunk)
+        stats.scanned += len(chunk)
+        stats.changed += len(updates)
+        if len(stats.samples) < 5:
+            stats.samples.extend(updates[: 5 - len(stats.samples)])
+        if apply:
+            if updates:
+                stats.written += client.bulk_update(
+                    table_id, updates, concurrency=concurrency
+                )
+            checkpoint.save(chunk[-1]["Id"])
+    if checkpoint:
+        checkpoint.clear()
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,101 @@
+"""Adaptive batch sizing for NocoDB bulk writes.
+
+A single ``BatchSizer`` is shared by every write path (insert, update,
+delete). It tunes the batch size per table from what each request costs:
+
+  - fast, small requests grow the batch (x1.5)
+  - requests slower than the latency target shrink it (x0.75)
+  - 413 Payload Too Large halves it and caps future growth below the
+    failing size
+  - 429 / 5xx halve it (the server is telling us to back off)
+
+Learned sizes are persisted to ``batch_sizes.json`` in the state
+directory, so the next run starts from what worked last time.
+"""
+
+import threading
+
+from .state import load_json, save_json
+
+STATE_FILE = "batch_sizes.json"
+
+DEFAULT_SIZE = 100
+MIN_SIZE = 10
+MAX_SIZE = 1000
+TARGET_LATENCY = 2.0  # seconds per request
+MAX_PAYLOAD_BYTES = 1_000_000
+
+
+def is_retryable(status: int | None) -> bool:
+    """True for responses that mean "send less / slower", not "bad data"."""
+    return status is not None and (status in (413, 429) or status >= 500)
+
+
+class BatchSizer:
+    """Per-table batch size controller (thread-safe)."""
+
+    def __init__(
+        self,
+        default: int = DEFAULT_SIZE,
+        min_size: int = MIN_SIZE,
+        max_size: int = MAX_SIZE,
+        target_latency: float = TARGET_LATENCY,
+        max_payload_bytes: int = MAX_PAYLOAD_BYTES,
+        persist: bool = True,
+    ):
+        self.default = default
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency = target_latency
+        self.max_payload_bytes = max_payload_bytes
+        self.persist = persist
+        self._lock = threading.Lock()
+        state = load_json(STATE_FILE, {}) if persist else {}
+        self._sizes: dict[str, int] = state.get("sizes", {})
+        self._ceilings: dict[str, int] = state.get("ceilings", {})
+
+    def size(self, table_id: str) -> int:
+        """Current batch size for a table."""
+        with self._lock:
+            return self._sizes.get(table_id, self.default)
+
+    def _clamp(self, table_id: str, size: float) -> int:
+        ceiling = self._ceilings.get(table_id, self.max_size)
+        return int(max(self.min_size, min(size, ceiling, self.max_size)))
+
+    def record(
+        self,
+        table_id: str,
+        size: int,
+        latency: float,
+        payload_bytes: int = 0,
+        status: int | None = 200,
+    ) -> int:
+        """Feed back one request outcome. Returns the new batch size."""
+        with self._lock:
+            current = self._sizes.get(table_id, self.default)
+            if status == 413:
+                self._ceilings[table_id] = max(self.min_size, size - 1)
+                new = size / 2
+            elif is_retryable(status):
+                new = min(current, size) / 2
+            elif latency > self.target_latency:
+                new = current * 0.75
+            elif (
+                latency < self.target_latency / 2
+                and size >= current
+                and payload_bytes * 1.5 < self.max_payload_bytes
+            ):
+                new = current * 1.5
+            else:
+                new = current
+            self._sizes[table_id] = self._clamp(table_id, new)
+            return self._sizes[table_id]
+
+    def save(self) -> None:
+        """Persist learned sizes for the next run."""
+        if not self.persist:
+            return
+        with self._lock:
+            data = {"sizes": dict(self._sizes), "ceilings": dict(self._ceilings)}
+        save_json(STATE_FILE, data)
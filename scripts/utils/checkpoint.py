@@ -0,0 +1,122 @@
+"""Checkpoint journal for resumable bulk imports.
+
+Each acknowledged batch is recorded as a ``[start, end)`` record-offset
+range in ``checkpoints/<table>.json`` in the state directory, together
+with a fingerprint of the source data. Re-running an import with the same
+fingerprint skips every acknowledged range, so a run that died on batch 37
+of 50 only sends the remaining batches; a different fingerprint (the
+workbook changed) discards the old journal. So does a different table
+id or target (``base_url|base_id``): a journal only describes rows in the
+table it was written against, not a recreated table or another base.
+Offsets rather than batch numbers are stored because adaptive batch sizes
+differ between runs.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+from .state import STATE_DIR, load_json, save_json
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+def file_fingerprint(path: str | Path) -> str:
+    """SHA-256 of a file, or of every file in a package directory.
+
+    ``.numbers`` documents can be saved either as a single zip file or as
+    a directory package, so both are supported.
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        digest.update(str(file.relative_to(path) if path.is_dir() else file.name).encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportJournal:
+    """Acknowledged-range journal for one table import."""
+
+    def __init__(self, table: str, fingerprint: str, table_id: str, target: str = ""):
+        self.table = table
+        self.fingerprint = fingerprint
+        self.table_id = table_id
+        self.target = target
+        self.name = f"{CHECKPOINT_DIR}/{table}.json"
+        (STATE_DIR / CHECKPOINT_DIR).mkdir(parents=True, exist_ok=True)
+        state = load_json(self.name, {})
+        if (
+            state.get("fingerprint") == fingerprint
+            and state.get("table_id") == table_id
+            and state.get("target") == target
+        ):
+            self.acked: list[list[int]] = state.get("acked", [])
+            self.done: bool = state.get("done", False)
+        else:
+            self.acked = []
+            self.done = False
+
+    @property
+    def acked_records(self) -> int:
+        return sum(end - start for start, end in self.acked)
+
+    @property
+    def resuming(self) -> bool:
+        return bool(self.acked) and not self.done
+
+    def skip_to(self, offset: int) -> int:
+        """First offset >= ``offset`` that is not inside an acknowledged range."""
+        for start, end in self.acked:
+            if start <= offset < end:
+                return end
+        return offset
+
+    def limit_from(self, offset: int) -> int | None:
+        """Records that can be sent from ``offset`` before hitting an acked range."""
+        starts = [start for start, _ in self.acked if start > offset]
+        return min(starts) - offset if starts else None
+
+    def ack(self, start: int, end: int) -> None:
+        """Record a batch as written and persist the journal."""
+        ranges = sorted([*self.acked, [start, end]])
+        merged: list[list[int]] = []
+        for s, e in ranges:
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        self.acked = merged
+        self._save()
+
+    def complete(self) -> None:
+        self.done = True
+        self._save()
+
+    def discard(self) -> None:
+        """Forget every acknowledged range (the rows are no longer there)."""
+        self.acked = []
+        self.done = False
+        ImportJournal.reset(self.table)
+
+    def _save(self) -> None:
+        save_json(
+            self.name,
+            {
+                "fingerprint": self.fingerprint,
+                "table_id": self.table_id,
+                "target": self.target,
+                "acked": self.acked,
+                "done": self.done,
+            },
+        )
+
+    @staticmethod
+    def reset(table: str) -> None:
+        """Forget one table's journal (used after the table is truncated)."""
+        path = STATE_DIR / CHECKPOINT_DIR / f"{table}.json"
+        if path.exists():
+            os.remove(path)
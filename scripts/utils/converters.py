@@ -0,0 +1,311 @@
+"""Per-column type converters for spreadsheet extraction.
+
+The scalar helpers (``format_date``, ``safe_float``, ``safe_int``,
+``timedelta_to_days``) define the conversion rules. Applying them cell by
+cell re-detects the cell type and retries every date format for every row,
+so ``convert_column`` instead:
+
+  1. samples the column once (``profile_column``) to find which value
+     types occur and, for text dates, the first format in ``DATE_FORMATS``
+     that parses every sampled string;
+  2. compiles a converter specialised to that profile;
+  3. converts the whole column in one batch. Columns from the workbook
+     cache (``RawColumn``, see utils/workbook_cache.py) are converted with
+     numpy over the type-tag/value arrays, and text is parsed once per
+     distinct string. Plain value lists use the specialised Python
+     converter with a per-string memo.
+
+A text date that does not match the detected format falls back to the
+per-cell rules, so mixed columns still convert. Ambiguous day/month
+strings follow the column's detected format rather than per-cell
+guessing.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from .workbook_cache import (
+    TAG_BOOL,
+    TAG_DATETIME,
+    TAG_DATETIME_UTC,
+    TAG_DURATION,
+    TAG_FLOAT,
+    TAG_INT,
+    TAG_TEXT,
+)
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y")
+EMPTY_NUMBERS = ("", "-", "--", "–")
+SAMPLE_SIZE = 64
+
+
+# ---------------------------------------------------------------------------
+# Scalar rules
+# ---------------------------------------------------------------------------
+
+
+def format_date(value) -> str | None:
+    """Convert numbers-parser date to ISO format string (YYYY-MM-DD).
+
+    Handles datetime objects and various string date formats.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str):
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+    return None
+
+
+def safe_float(value, default=None) -> float | None:
+    """Convert a value to float safely. Returns default if not convertible."""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip().replace(",", "")
+        if cleaned in EMPTY_NUMBERS:
+            return default
+        try:
+            return float(cleaned)
+        except ValueError:
+            return default
+    return default
+
+
+def safe_int(value, default=None) -> int | None:
+    """Convert a value to int safely. Returns default if not convertible."""
+    f = safe_float(value, default=None)
+    if f is None:
+        return default
+    return int(f)
+
+
+def timedelta_to_days(value) -> int | None:
+    """Convert a timedelta to integer days. Handle None and non-timedelta."""
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        return value.days
+    if isinstance(value, (int, float)):
+        return int(value)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Column profiling
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class RawColumn:
+    """One cached column: type tags, numeric values, text indices."""
+
+    tags: np.ndarray
+    nums: np.ndarray
+    text: np.ndarray
+    strings: list[str]
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+@dataclass
+class ColumnProfile:
+    types: set[type]
+    date_format: str | None = None
+
+
+def detect_date_format(strings: Sequence[str]) -> str | None:
+    """First format in DATE_FORMATS that parses every sampled string."""
+    sample = [s for s in strings[:SAMPLE_SIZE] if s]
+    for fmt in DATE_FORMATS:
+        try:
+            for s in sample:
+                datetime.strptime(s, fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+
+def text_date_format(column: "Sequence | RawColumn") -> str | None:
+    """Detected format of a column's text dates (None if none fits)."""
+    if isinstance(column, RawColumn):
+        used = np.unique(column.text[column.tags == TAG_TEXT])
+        return detect_date_format([column.strings[i] for i in used[:SAMPLE_SIZE]])
+    return detect_date_format([v for v in column if isinstance(v, str)])
+
+
+def profile_column(values: Sequence) -> ColumnProfile:
+    """Value types present in a column, plus the date format of its text."""
+    types = {type(v) for v in values}
+    texts = [v for v in values if isinstance(v, str)]
+    return ColumnProfile(types, detect_date_format(texts) if texts else None)
+
+
+def _date_parser(fmt: str | None) -> Callable[[str], str | None]:
+    """Text-date parser for a detected format, falling back to all formats."""
+
+    def parse(value: str) -> str | None:
+        if fmt:
+            try:
+                return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                pass
+        return format_date(value)
+
+    return parse
+
+
+def _memoised(fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    memo: dict = {}
+
+    def convert(value):
+        if value not in memo:
+            memo[value] = fn(value)
+        return memo[value]
+
+    return convert
+
+
+# ---------------------------------------------------------------------------
+# Compiled converters for plain value lists
+# ---------------------------------------------------------------------------
+
+
+def compile_converter(
+    kind: str, values: Sequence, default=None, date_format: str | None = None
+) -> Callable[[Any], Any]:
+    """Build a per-cell converter specialised to this column's contents.
+
+    ``kind`` is one of "float", "int", "date", "days". ``date_format``
+    overrides the detected text date format.
+    """
+    profile = profile_column(values)
+    types = profile.types - {type(None)}
+
+    if kind == "date":
+        parse_text = _memoised(_date_parser(date_format or profile.date_format))
+        if types <= {datetime}:
+            return lambda v: v.strftime("%Y-%m-%d") if v is not None else None
+        return lambda v: (
+            v.strftime("%Y-%m-%d") if isinstance(v, datetime)
+            else parse_text(v) if isinstance(v, str)
+            else None
+        )
+
+    if kind in ("float", "int"):
+        to_number = (lambda f: int(f)) if kind == "int" else (lambda f: f)
+        if types <= {float, int}:
+            return lambda v: to_number(float(v)) if v is not None else default
+        parse_text = _memoised(lambda s: safe_float(s))
+
+        def convert(v):
+            if isinstance(v, (int, float)):
+                return to_number(float(v))
+            if isinstance(v, str):
+                f = parse_text(v)
+                return default if f is None else to_number(f)
+            return default
+
+        return convert
+
+    if kind == "days":
+        return timedelta_to_days
+
+    raise ValueError(f"Unknown converter kind: {kind}")
+
+
+# ---------------------------------------------------------------------------
+# Vectorised converters for cached columns
+# ---------------------------------------------------------------------------
+
+
+def _fill(values: list, missing: np.ndarray, default) -> list:
+    for i in np.flatnonzero(missing).tolist():
+        values[i] = default
+    return values
+
+
+def _raw_numbers(col: RawColumn) -> tuple[np.ndarray, np.ndarray]:
+    """(float values, valid mask) following ``safe_float``."""
+    numeric = (col.tags == TAG_FLOAT) | (col.tags == TAG_INT) | (col.tags == TAG_BOOL)
+    values = np.where(numeric, col.nums, 0.0)
+    valid = numeric.copy()
+    text = col.tags == TAG_TEXT
+    if text.any():
+        parsed = [safe_float(s) for s in col.strings]
+        lookup = np.array([np.nan if p is None else p for p in parsed], dtype=np.float64)
+        ok = np.array([p is not None for p in parsed], dtype=bool)
+        idx = col.text[text]
+        values[text] = lookup[idx]
+        valid[text] = ok[idx]
+    return values, valid
+
+
+def _convert_raw(
+    kind: str, col: RawColumn, default, date_format: str | None = None
+) -> list:
+    if kind == "float":
+        values, valid = _raw_numbers(col)
+        return _fill(values.tolist(), ~valid, default)
+
+    if kind == "int":
+        values, valid = _raw_numbers(col)
+        ints = np.trunc(np.where(valid, values, 0.0)).astype(np.int64)
+        return _fill(ints.tolist(), ~valid, default)
+
+    if kind == "days":
+        days = np.zeros(len(col), dtype=np.int64)
+        duration = col.tags == TAG_DURATION
+        days[duration] = np.floor(col.nums[duration] / 86400).astype(np.int64)
+        numeric = (col.tags == TAG_FLOAT) | (col.tags == TAG_INT) | (col.tags == TAG_BOOL)
+        days[numeric] = np.trunc(col.nums[numeric]).astype(np.int64)
+        return _fill(days.tolist(), ~(duration | numeric), None)
+
+    if kind == "date":
+        out = np.full(len(col), None, dtype=object)
+        dated = (col.tags == TAG_DATETIME) | (col.tags == TAG_DATETIME_UTC)
+        if dated.any():
+            micros = np.round(col.nums[dated] * 1e6).astype(np.int64)
+            out[dated] = np.datetime_as_string(micros.astype("datetime64[us]"), unit="D")
+        text = col.tags == TAG_TEXT
+        if text.any():
+            used = np.unique(col.text[text])
+            parse = _date_parser(
+                date_format or detect_date_format([col.strings[i] for i in used])
+            )
+            lookup = np.full(len(col.strings), None, dtype=object)
+            for i in used.tolist():
+                lookup[i] = parse(col.strings[i])
+            out[text] = lookup[col.text[text]]
+        return out.tolist()
+
+    raise ValueError(f"Unknown converter kind: {kind}")
+
+
+def convert_column(
+    kind: str,
+    column: Sequence | RawColumn,
+    default=None,
+    date_format: str | None = None,
+) -> list:
+    """Convert a whole column in one batch. See the module docstring.
+
+    Pass ``date_format`` to keep the format detected on an earlier chunk
+    of the same column (see ``text_date_format``).
+    """
+    if isinstance(column, RawColumn):
+        return _convert_raw(kind, column, default, date_format)
+    convert = compile_converter(kind, column, default, date_format)
+    return [convert(v) for v in column]
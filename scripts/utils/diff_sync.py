@@ -0,0 +1,102 @@
+"""Diff-based table sync: send only the writes that are actually needed.
+
+Incoming records are matched to existing NocoDB records on a natural key
+(e.g. ticker + opened + strike + expiration + call_put + buy_sell for
+options). Matched records whose fields differ become PATCHes, unmatched
+incoming records become inserts and unmatched existing records become
+deletes. Rows that share a natural key (identical repeated trades) are
+paired up in order, so duplicates are neither lost nor multiplied.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .nocodb_client import NocoDBClient
+
+FLOAT_TOLERANCE = 1e-6
+
+
+@dataclass
+class SyncPlan:
+    """Writes required to make a table match the incoming records."""
+
+    inserts: list[dict] = field(default_factory=list)
+    updates: list[dict] = field(default_factory=list)  # each carries "Id"
+    deletes: list[int] = field(default_factory=list)  # record Ids
+    unchanged: int = 0
+    # (Id, incoming record) for every incoming record matched to a row
+    matched: list[tuple[int, dict]] = field(default_factory=list)
+
+    @property
+    def total_writes(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+
+def normalise_value(value):
+    """Normalise a field value for comparison with NocoDB's JSON output."""
+    if value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def values_equal(a, b) -> bool:
+    a, b = normalise_value(a), normalise_value(b)
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) <= FLOAT_TOLERANCE * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+def natural_key(record: dict, key_fields: tuple[str, ...]) -> tuple:
+    return tuple(normalise_value(record.get(f)) for f in key_fields)
+
+
+def plan_sync(
+    existing: Iterable[dict],
+    incoming: Iterable[dict],
+    key_fields: tuple[str, ...],
+) -> SyncPlan:
+    """Compare existing records (with ``Id``) to incoming ones.
+
+    Only the fields present on each incoming record are compared, so
+    columns the importer doesn't own (e.g. computed ones) are left alone.
+    """
+    by_key: dict[tuple, list[dict]] = defaultdict(list)
+    for record in existing:
+        by_key[natural_key(record, key_fields)].append(record)
+
+    plan = SyncPlan()
+    for record in incoming:
+        matches = by_key.get(natural_key(record, key_fields))
+        if not matches:
+            plan.inserts.append(record)
+            continue
+        current = matches.pop(0)
+        plan.matched.append((current["Id"], record))
+        changed = {
+            name: value
+            for name, value in record.items()
+            if not values_equal(value, current.get(name))
+        }
+        if changed:
+            plan.updates.append({"Id": current["Id"], **changed})
+        else:
+            plan.unchanged += 1
+
+    for leftovers in by_key.values():
+        plan.deletes.extend(r["Id"] for r in leftovers)
+    return plan
+
+
+def apply_sync(client: NocoDBClient, table_id: str, plan: SyncPlan) -> None:
+    """Execute a plan: deletes, then updates, then inserts."""
+    if plan.deletes:
+        client.delete_records(table_id, plan.deletes)
+    if plan.updates:
+        client.bulk_update(table_id, plan.updates)
+    if plan.inserts:
+        client.bulk_insert(table_id, plan.inserts)
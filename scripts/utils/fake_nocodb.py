@@ -0,0 +1,377 @@
+"""In-process stand-in for the NocoDB v2 endpoints the scripts use.
+
+Serves, from memory:
+  - GET/POST /api/v2/meta/bases/{base_id}/tables
+  - GET/PATCH/DELETE /api/v2/meta/tables/{table_id}  (PATCH renames)
+  - POST     /api/v2/meta/tables/{table_id}/columns
+  - GET      /api/v2/tables/{table_id}/records   (limit, offset, fields,
+             sort=Id/-Id, where with eq/neq/gt/gte/lt/lte joined by ~and)
+  - GET      /api/v2/tables/{table_id}/records/count
+  - POST/PATCH/DELETE /api/v2/tables/{table_id}/records  (list bodies)
+
+List responses carry NocoDB's ``pageInfo`` and records get ``Id``,
+``CreatedAt`` and ``UpdatedAt`` like the real server. Latency, rate
+limiting (429 + Retry-After, X-RateLimit-* on every response) and faults (random 5xx, 413 above a batch
+size) are configurable, so client behaviour and throughput can be
+measured offline and repeatably:
+
+    with FakeNocoDB(latency=0.02, rate_limit=50) as server:
+        client = NocoDBClient(server.url, "token", server.base_id)
+"""
+
+import bisect
+import gzip
+import json
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WHERE_CLAUSE = re.compile(r"\(([^,()]+),(\w+),(?:exactDate,)?([^()]*)\)")
+MAX_LIMIT = 1000
+
+
+@dataclass
+class FaultConfig:
+    """Knobs for simulated server behaviour."""
+
+    latency: float = 0.0  # seconds added to every request
+    latency_per_record: float = 0.0  # extra seconds per written record
+    rate_limit: float | None = None  # requests per second, None = unlimited
+    error_rate: float = 0.0  # probability of a 500 response
+    max_batch: int | None = None  # bodies with more records get 413
+    seed: int | None = None
+
+
+@dataclass
+class FakeTable:
+    table_id: str
+    title: str
+    columns: list[dict]
+    ids: list[int] = field(default_factory=list)  # ascending, may hold dead ids
+    rows: dict[int, dict] = field(default_factory=dict)
+    next_id: int = 1
+
+    def live_ids(self) -> list[int]:
+        """Sorted ids, compacted once more than 10% of entries are dead.
+
+        Compaction is O(n) but amortised over many deletes, which keeps
+        million-row delete benchmarks linear.
+        """
+        if len(self.ids) - len(self.rows) > max(64, len(self.ids) // 10):
+            self.ids = [i for i in self.ids if i in self.rows]
+        return self.ids
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S+00:00")
+
+
+def _coerce(raw: str, sample):
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _matches(record: dict, clauses: list[tuple[str, str, str]]) -> bool:
+    for name, op, raw in clauses:
+        value = record.get(name)
+        if value is None:
+            if op == "eq" and raw in ("", "null"):
+                continue
+            if op == "neq" and raw not in ("", "null"):
+                continue
+            return False
+        target = _coerce(raw, value)
+        if isinstance(value, str) and op not in ("eq", "neq"):
+            value = value[: len(target)]  # date-prefix comparison (exactDate)
+        if op == "eq" and not value == target:
+            return False
+        if op == "neq" and not value != target:
+            return False
+        if op == "gt" and not value > target:
+            return False
+        if op == "gte" and not value >= target:
+            return False
+        if op == "lt" and not value < target:
+            return False
+        if op == "lte" and not value <= target:
+            return False
+    return True
+
+
+class FakeNocoDB:
+    """Threaded HTTP server holding NocoDB tables in memory."""
+
+    def __init__(self, base_id: str = "pfake", **faults):
+        self.base_id = base_id
+        self.faults = FaultConfig(**faults)
+        self.tables: dict[str, FakeTable] = {}
+        self.request_count = 0
+        self._created = 0
+        self._lock = threading.RLock()
+        self._rng = random.Random(self.faults.seed)
+        self._tokens = self.faults.rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeNocoDB":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeNocoDB":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # -----------------------------------------------------------------------
+    # Direct data access (seeding / assertions without HTTP)
+    # -----------------------------------------------------------------------
+
+    def create_table(self, title: str, columns: list[dict] | None = None) -> str:
+        with self._lock:
+            self._created += 1
+            table_id = f"m{self._created:04d}{title[:8]}"
+            self.tables[table_id] = FakeTable(table_id, title, columns or [])
+            return table_id
+
+    def seed(self, table_id: str, records: list[dict]) -> list[int]:
+        with self._lock:
+            return self._insert(self.tables[table_id], records)
+
+    def count(self, table_id: str) -> int:
+        return len(self.tables[table_id].rows)
+
+    # -----------------------------------------------------------------------
+    # Simulation
+    # -----------------------------------------------------------------------
+
+    def _take_token(self) -> float | None:
+        """Return seconds to wait if rate limited, else None."""
+        rate = self.faults.rate_limit
+        if not rate:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(rate, self._tokens + (now - self._refilled) * rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / rate
+
+    def rate_headers(self) -> dict[str, str]:
+        """``X-RateLimit-*`` headers describing the current token budget."""
+        rate = self.faults.rate_limit
+        if not rate:
+            return {}
+        with self._lock:
+            tokens = self._tokens
+        return {
+            "X-RateLimit-Limit": f"{rate:g}",
+            "X-RateLimit-Remaining": str(int(tokens)),
+            # Seconds until the next request will be accepted
+            "X-RateLimit-Reset": f"{max(0.0, 1 - tokens) / rate:.3f}",
+        }
+
+    def _insert(self, table: FakeTable, records: list[dict]) -> list[int]:
+        stamp = _now()
+        new_ids = []
+        for record in records:
+            row = {k: v for k, v in record.items() if k != "Id"}
+            row["Id"] = table.next_id
+            row["CreatedAt"] = row["UpdatedAt"] = stamp
+            table.rows[table.next_id] = row
+            table.ids.append(table.next_id)
+            new_ids.append(table.next_id)
+            table.next_id += 1
+        return new_ids
+
+    def _list(self, table: FakeTable, query: dict) -> dict:
+        limit = min(int(query.get("limit", 25)), MAX_LIMIT)
+        offset = int(query.get("offset", 0))
+        clauses = WHERE_CLAUSE.findall(query.get("where", ""))
+        descending = query.get("sort", "") == "-Id"
+
+        ids = table.live_ids()
+        # Keyset cursors (Id > n) binary-search their start like an index would
+        cursor = [c for c in clauses if c[0] == "Id" and c[1] == "gt"]
+        start = bisect.bisect_right(ids, int(float(cursor[0][2]))) if cursor else 0
+        rest = [c for c in clauses if c not in cursor]
+        # Walk by index: slicing would copy the tail on every page
+        positions = (
+            range(len(ids) - 1, start - 1, -1) if descending else range(start, len(ids))
+        )
+
+        matched = []
+        seen = 0
+        has_more = False
+        for pos in positions:
+            row = table.rows.get(ids[pos])
+            if row is None or (rest and not _matches(row, rest)):
+                continue
+            if seen >= offset + limit:
+                has_more = True
+                if not rest:
+                    break
+            elif seen >= offset:
+                matched.append(row)
+            seen += 1
+        # Without extra filters the scan stops early; estimate the total from
+        # the id list (exact unless deletes are awaiting compaction).
+        total = seen if rest else max(seen, len(ids) - start)
+
+        fields = query.get("fields")
+        if fields:
+            names = fields.split(",")
+            matched = [{k: r.get(k) for k in names} for r in matched]
+        return {
+            "list": matched,
+            "pageInfo": {
+                "totalRows": total,
+                "page": offset // limit + 1 if limit else 1,
+                "pageSize": limit,
+                "isFirstPage": offset == 0,
+                "isLastPage": not has_more,
+            },
+        }
+
+    def handle(self, method: str, path: str, query: dict, body) -> tuple[int, object, dict]:
+        """Dispatch one request. Returns (status, json body, headers)."""
+        self.request_count += 1
+        wait = self._take_token()
+        if wait is not None:
+            return 429, {"msg": "Too many requests"}, {"Retry-After": f"{wait:.3f}"}
+        if self.faults.error_rate and self._rng.random() < self.faults.error_rate:
+            return 500, {"msg": "Injected fault"}, {}
+        if (
+            self.faults.max_batch
+            and isinstance(body, list)
+            and len(body) > self.faults.max_batch
+        ):
+            return 413, {"msg": "Payload too large"}, {}
+
+        parts = path.strip("/").split("/")
+        with self._lock:
+            # /api/v2/meta/bases/{base}/tables
+            if parts[2:4] == ["meta", "bases"] and parts[5:] == ["tables"]:
+                if method == "GET":
+                    return 200, {"list": [
+                        {"id": t.table_id, "title": t.title} for t in self.tables.values()
+                    ]}, {}
+                title = body.get("title") or body["table_name"]
+                table_id = self.create_table(title, body.get("columns", []))
+                return 200, {"id": table_id, "title": title}, {}
+            # /api/v2/meta/tables/{id}[/columns]
+            if parts[2:4] == ["meta", "tables"]:
+                table = self.tables.get(parts[4])
+                if table is None:
+                    return 404, {"msg": "Table not found"}, {}
+                if parts[5:] == ["columns"] and method == "POST":
+                    table.columns.append(body)
+                    return 200, {"id": table.table_id, "columns": table.columns}, {}
+                if method == "PATCH":
+                    table.title = body.get("title", table.title)
+                    return 200, {"msg": "The table has been updated successfully"}, {}
+                if method == "DELETE":
+                    del self.tables[table.table_id]
+                    return 200, True, {}
+                return 200, {"id": table.table_id, "title": table.title,
+                             "columns": table.columns}, {}
+            # /api/v2/tables/{id}/records[/count]
+            if parts[2] == "tables" and parts[4] == "records":
+                table = self.tables.get(parts[3])
+                if table is None:
+                    return 404, {"msg": "Table not found"}, {}
+                if parts[5:] == ["count"]:
+                    clauses = WHERE_CLAUSE.findall(query.get("where", ""))
+                    if clauses:
+                        count = sum(
+                            1 for r in table.rows.values() if _matches(r, clauses)
+                        )
+                    else:
+                        count = len(table.rows)
+                    return 200, {"count": count}, {}
+                if method == "GET":
+                    return 200, self._list(table, query), {}
+                if method == "POST":
+                    return 200, [{"Id": i} for i in self._insert(table, body)], {}
+                if method == "PATCH":
+                    stamp = _now()
+                    for record in body:
+                        row = table.rows.get(record["Id"])
+                        if row is not None:
+                            row.update(record)
+                            row["UpdatedAt"] = stamp
+                    return 200, [{"Id": r["Id"]} for r in body], {}
+                if method == "DELETE":
+                    for record in body:
+                        table.rows.pop(record["Id"], None)
+                    return 200, [{"Id": r["Id"]} for r in body], {}
+        return 404, {"msg": f"No route for {method} {path}"}, {}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without
+                # TCP_NODELAY delayed ACKs add ~40ms to every response.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _serve(self):
+                url = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if self.headers.get("Content-Encoding") == "gzip":
+                    raw = gzip.decompress(raw)
+                body = json.loads(raw) if raw else None
+
+                records = len(body) if isinstance(body, list) else 0
+                delay = server.faults.latency + server.faults.latency_per_record * records
+                if delay:
+                    time.sleep(delay)
+
+                status, payload, headers = server.handle(
+                    self.command, url.path, query, body
+                )
+                headers = {**server.rate_headers(), **headers}
+                out = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(out)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _serve
+
+        return Handler
@@ -0,0 +1,227 @@
+"""Vectorised currency conversion of money columns.
+
+Every money table mixes currencies: amounts are recorded in the currency
+of the broker account they came from. ``MONEY_TABLES`` declares, per
+table, the date field, the money fields and how a record's currency is
+found. ``convert_table`` then converts a whole table in one pass:
+
+  - dates are de-duplicated and parsed to day ordinals once, and
+    currencies are factorised to small integer codes;
+  - each currency's daily X/USD rates are gathered from its ``FXStore``
+    dense array for all rows at once;
+  - ``<field>_usd`` / ``<field>_gbp`` companions are computed as array
+    arithmetic and compared with the stored values, so only rows whose
+    companion moved by more than ``TOLERANCE`` are returned for writing.
+
+Rows without a date, amount or known rate get no companion value (the
+stored one is left alone).
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from .converters import safe_float
+from .fx_store import FXStore, Fetcher, day_ordinals
+
+BASE_CURRENCY = "USD"  # every FXStore pair is <currency>USD
+TOLERANCE = 0.01  # companions closer than this to the stored value are kept
+
+# Currency each broker account reports amounts in
+PLATFORM_CURRENCY = {
+    "IBKR": "USD",
+    "Trading 212": "GBP",
+    "Freetrade": "GBP",
+    "Stake": "USD",
+    "eToro": "USD",
+    "Robinhood": "USD",
+}
+
+
+@dataclass(frozen=True)
+class MoneyTable:
+    name: str
+    date_field: str
+    amount_fields: tuple[str, ...]
+    currency: str | None = None  # fixed currency for the whole table
+    currency_field: str = "platform"  # otherwise looked up per record
+    currency_map: dict | None = None  # currency_field value -> currency
+    default_currency: str = BASE_CURRENCY
+    targets: tuple[str, ...] = ("USD", "GBP")
+
+    def companions(self) -> list[str]:
+        """Names of the companion columns this table gets."""
+        return [f"{f}_{t.lower()}" for f in self.amount_fields for t in self.targets]
+
+    def fields(self) -> list[str]:
+        """Fields read to convert the table (including current companions)."""
+        names = ["Id", self.date_field, *self.amount_fields, *self.companions()]
+        if self.currency is None:
+            names.append(self.currency_field)
+        return names
+
+    def currency_codes(self, records: list[dict]) -> tuple[list[str], np.ndarray]:
+        """(currencies, index into them per record)."""
+        if self.currency is not None:
+            return [self.currency], np.zeros(len(records), dtype=np.int64)
+        values, codes = _factorise([r.get(self.currency_field) for r in records])
+        mapping = self.currency_map or {}
+        currencies = [mapping.get(v, self.default_currency) for v in values]
+        return currencies, codes
+
+
+MONEY_TABLES = {
+    # Deposits are recorded in GBP whatever the platform
+    "deposits": MoneyTable("deposits", "month", ("amount",), currency="GBP",
+                           targets=("USD",)),
+    "transactions": MoneyTable("transactions", "date", ("price", "amount"),
+                               currency_map=PLATFORM_CURRENCY),
+    "dividends": MoneyTable("dividends", "date", ("amount",),
+                            currency_map=PLATFORM_CURRENCY),
+    "options": MoneyTable("options", "opened", ("premium", "close_premium"),
+                          currency_map=PLATFORM_CURRENCY),
+    "monthly_snapshots": MoneyTable(
+        "monthly_snapshots",
+        "month",
+        (
+            "total_invested",
+            "portfolio_value",
+            "gain_loss",
+            "dividend_income",
+            "options_premium",
+            "options_capital_gains",
+            "total_deposits",
+        ),
+        currency="USD",
+        targets=("GBP",),
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# Rates
+# ---------------------------------------------------------------------------
+
+
+class FXRates:
+    """Daily <currency>/USD rates for several currencies, one FXStore each."""
+
+    def __init__(self, fetch: Fetcher | None = None):
+        self.fetch = fetch
+        self.stores: dict[str, FXStore] = {}
+
+    def store(self, currency: str) -> FXStore:
+        currency = currency.upper()
+        if currency not in self.stores:
+            pair = f"{currency}{BASE_CURRENCY}".lower()
+            self.stores[currency] = FXStore(pair, fetch=self.fetch)
+        return self.stores[currency]
+
+    def ensure(self, currencies: Iterable[str], start, end=None) -> int:
+        """Top up every non-USD currency's store. Returns fetch calls made."""
+        return sum(
+            self.store(c).ensure(start, end)
+            for c in sorted(set(currencies))
+            if c.upper() != BASE_CURRENCY
+        )
+
+    def to_usd(self, days: np.ndarray, codes: np.ndarray, currencies: list[str]) -> np.ndarray:
+        """USD per unit of each row's currency on each row's day (NaN if unknown).
+
+        ``codes`` indexes ``currencies`` (see ``MoneyTable.currency_codes``).
+        """
+        out = np.full(len(days), np.nan)
+        for code, currency in enumerate(currencies):
+            rows = codes == code
+            if currency.upper() == BASE_CURRENCY:
+                out[rows] = 1.0
+            else:
+                out[rows] = self.store(currency).rates(days[rows])
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+
+def _floats(values: list) -> np.ndarray:
+    """Float array with NaN for missing or non-numeric values."""
+    try:
+        return np.array(values, dtype=np.float64)  # None -> NaN
+    except (TypeError, ValueError):
+        return np.array([safe_float(v, np.nan) for v in values], dtype=np.float64)
+
+
+def _factorise(values: list) -> tuple[list, np.ndarray]:
+    """(distinct values, int code per value), without sorting the values."""
+    index = {v: i for i, v in enumerate(dict.fromkeys(values))}
+    codes = np.fromiter(
+        map(index.__getitem__, values), dtype=np.int64, count=len(values)
+    )
+    return list(index), codes
+
+
+def _days(values: list) -> tuple[np.ndarray, np.ndarray]:
+    """(day ordinals, present mask) for ISO dates, parsing each distinct date once."""
+    distinct, codes = _factorise(values)
+    ordinals = np.zeros(len(distinct), dtype=np.int64)
+    present = np.array([bool(v) for v in distinct], dtype=bool)
+    if present.any():
+        ordinals[present] = day_ordinals([str(v) for v in distinct if v])
+    return ordinals[codes], present[codes]
+
+
+def convert_table(
+    spec: MoneyTable,
+    records: list[dict],
+    rates: FXRates,
+    tolerance: float = TOLERANCE,
+    log: Callable[[str], None] | None = None,
+) -> list[dict]:
+    """Companion updates (``{"Id", "<field>_<target>", ...}``) for changed rows.
+
+    Each update carries only the companions that changed; rows without a
+    rate are skipped and reported through ``log``.
+    """
+    if not records:
+        return []
+    days, dated = _days([r.get(spec.date_field) for r in records])
+    currencies, codes = spec.currency_codes(records)
+    usd_rate = rates.to_usd(days, codes, currencies)
+    usd_rate[~dated] = np.nan
+    row_currency = np.array(currencies)[codes]
+    target_rate = {
+        t: np.ones(len(records)) if t == BASE_CURRENCY
+        else rates.store(t).rates(days)
+        for t in spec.targets
+    }
+
+    ids = [r["Id"] for r in records]
+    changed: dict[int, dict] = {}
+    missing = 0
+    for f in spec.amount_fields:
+        amounts = _floats([r.get(f) for r in records])
+        usd = amounts * usd_rate
+        for t in spec.targets:
+            name = f"{f}_{t.lower()}"
+            # Amounts already in the target currency need no rate
+            new = np.round(
+                np.where(row_currency == t, amounts, usd / target_rate[t]), 2
+            )
+            old = _floats([r.get(name) for r in records])
+            valid = ~np.isnan(new)
+            missing += int((~np.isnan(amounts) & ~valid).sum())
+            stale = valid & (np.isnan(old) | (np.abs(new - old) >= tolerance))
+            for i in np.flatnonzero(stale).tolist():
+                changed.setdefault(ids[i], {"Id": ids[i]})[name] = float(new[i])
+    if missing and log:
+        log(f"  {spec.name}: {missing} value(s) without a rate left unconverted")
+    return list(changed.values())
+
+
+def date_range(spec: MoneyTable, records: list[dict]) -> tuple[str, str] | None:
+    """Earliest and latest date in the table (ISO), or None if undated."""
+    dates = [str(r[spec.date_field])[:10] for r in records if r.get(spec.date_field)]
+    return (min(dates), max(dates)) if dates else None
@@ -0,0 +1,208 @@
+"""Persistent daily FX rates with O(1) date lookup.
+
+Daily closes per currency pair are kept in ``fx/<pair>.json`` in the state
+directory, together with the date range already fetched. ``FXStore.ensure``
+only downloads what that range lacks: the tail since the last observed
+day (re-fetched, since its close may have been intraday) and any head
+before the stored start. A re-run on the same day makes no network calls.
+
+For lookups the observations are expanded into a dense float64 array
+indexed by day ordinal (days since 1970-01-01) and forward-filled across
+weekends and holidays, up to ``max_gap`` days like the old walk-back
+lookup. Any date then resolves with one array index, and ``rates()``
+resolves a whole array of dates in one vectorised gather.
+"""
+
+import json
+import urllib.error
+import urllib.request
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable
+
+import numpy as np
+
+from .rate_limit import limiter_for
+from .state import STATE_DIR, load_json, save_json
+
+FX_DIR = "fx"
+MAX_GAP_DAYS = 5  # weekend + holiday fallback, as before
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+TIINGO_ATTEMPTS = 5
+TIINGO_BACKOFF = 15.0  # seconds; Tiingo limits are per hour, not per second
+
+Fetcher = Callable[[str, date, date], dict[str, float]]
+
+
+def day_ordinal(day: str | date) -> int:
+    """Days since 1970-01-01 for an ISO date string (time part ignored) or date."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    return day.toordinal() - EPOCH_ORDINAL
+
+
+def day_ordinals(days: Iterable[str]) -> np.ndarray:
+    """Vectorised ``day_ordinal`` for ISO date strings."""
+    return np.array([d[:10] for d in days], dtype="datetime64[D]").astype(np.int64)
+
+
+def fetch_tiingo_fx(pair: str, start: date, end: date, token: str) -> dict[str, float]:
+    """Fetch daily closes for ``pair`` from Tiingo in a single API call.
+
+    Returns a dict mapping date string (YYYY-MM-DD) to close rate. The
+    request is paced by the api.tiingo.com rate limiter; 429 responses are
+    retried after ``Retry-After`` or a jittered backoff.
+    """
+    url = (
+        f"https://api.tiingo.com/tiingo/fx/{pair}/prices"
+        f"?startDate={start.isoformat()}&endDate={end.isoformat()}&resampleFreq=1day"
+    )
+    limiter = limiter_for(url)
+
+    for attempt in range(1, TIINGO_ATTEMPTS + 1):
+        req = urllib.request.Request(url, headers={"Authorization": f"Token {token}"})
+        limiter.acquire()
+        try:
+            with urllib.request.urlopen(req) as resp:
+                limiter.observe(resp.status, resp.headers)
+                data = json.loads(resp.read())
+            break
+        except urllib.error.HTTPError as e:
+            limiter.observe(e.code, e.headers)
+            if e.code == 429 and attempt < TIINGO_ATTEMPTS:
+                print(f"  Rate limited, backing off (attempt {attempt}/{TIINGO_ATTEMPTS})...")
+                limiter.backoff(attempt, e.headers, base=TIINGO_BACKOFF, cap=300)
+            else:
+                raise
+
+    return {entry["date"][:10]: entry["close"] for entry in data}
+
+
+def tiingo_fetcher(token: str) -> Fetcher:
+    """A ``FXStore`` fetcher backed by Tiingo."""
+    return lambda pair, start, end: fetch_tiingo_fx(pair, start, end, token)
+
+
+class FXStore:
+    """Daily closes for one currency pair, stored locally and densely indexed."""
+
+    def __init__(
+        self,
+        pair: str,
+        fetch: Fetcher | None = None,
+        max_gap: int = MAX_GAP_DAYS,
+    ):
+        self.pair = pair.lower()
+        self.fetch = fetch
+        self.max_gap = max_gap
+        self.name = f"{FX_DIR}/{self.pair}.json"
+        (STATE_DIR / FX_DIR).mkdir(parents=True, exist_ok=True)
+        state = load_json(self.name, {})
+        self.observed: dict[str, float] = state.get("rates", {})
+        self.fetched_from: str | None = state.get("fetched_from")
+        self.fetched_through: str | None = state.get("fetched_through")
+        self.fetch_calls = 0
+        self._build()
+
+    # -----------------------------------------------------------------------
+    # Dense index
+    # -----------------------------------------------------------------------
+
+    def _build(self) -> None:
+        """Forward-fill the observations into ``self.dense``."""
+        if not self.observed:
+            self.first = 0
+            self.dense = np.empty(0)
+            return
+        days = day_ordinals(self.observed)
+        values = np.fromiter(self.observed.values(), dtype=np.float64, count=len(days))
+        self.first = int(days.min())
+        # Run max_gap days past the last day, like the walk-back would
+        end = max(int(days.max()), day_ordinal(self.fetched_through or date.min))
+        end += self.max_gap
+        sparse = np.full(end - self.first + 1, np.nan)
+        sparse[days - self.first] = values
+        # Index of the latest observation at or before each day
+        positions = np.arange(len(sparse))
+        last = np.maximum.accumulate(np.where(np.isnan(sparse), -1, positions))
+        self.dense = np.where(
+            (last >= 0) & (positions - last <= self.max_gap),
+            sparse[np.maximum(last, 0)],
+            np.nan,
+        )
+
+    def rate(self, day: str | date) -> float | None:
+        """Rate for a day (latest close within ``max_gap`` days), or None."""
+        i = day_ordinal(day) - self.first
+        if 0 <= i < len(self.dense):
+            value = self.dense[i]
+            if value == value:  # not NaN
+                return float(value)
+        return None
+
+    def rates(self, days: np.ndarray | Iterable[str]) -> np.ndarray:
+        """Rates for an array of day ordinals (or ISO strings); NaN if unknown."""
+        if not isinstance(days, np.ndarray) or days.dtype.kind not in "iu":
+            days = day_ordinals(days)
+        index = days - self.first
+        valid = (index >= 0) & (index < len(self.dense))
+        out = np.full(len(index), np.nan)
+        out[valid] = self.dense[index[valid]]
+        return out
+
+    # -----------------------------------------------------------------------
+    # Top-up
+    # -----------------------------------------------------------------------
+
+    def missing_ranges(self, start: date, end: date) -> list[tuple[date, date]]:
+        """Date ranges that must be fetched to cover ``start``..``end``."""
+        if self.fetched_from is None or self.fetched_through is None:
+            return [(start, end)]
+        ranges = []
+        stored_from = date.fromisoformat(self.fetched_from)
+        stored_through = date.fromisoformat(self.fetched_through)
+        if start < stored_from:
+            ranges.append((start, stored_from - timedelta(days=1)))
+        if end > stored_through:
+            # Re-fetch the last observed day: its close may have been intraday
+            last_seen = max(self.observed, default=self.fetched_through)
+            ranges.append((min(date.fromisoformat(last_seen), stored_through), end))
+        return ranges
+
+    def ensure(self, start: str | date, end: str | date | None = None) -> int:
+        """Make sure rates cover ``start``..``end`` (default today).
+
+        Fetches only the missing head/tail. Returns the number of fetch
+        calls made (0 when the store already covers the range).
+        """
+        start = date.fromisoformat(start[:10]) if isinstance(start, str) else start
+        if end is None:
+            end = datetime.now().date()
+        elif isinstance(end, str):
+            end = date.fromisoformat(end[:10])
+        ranges = self.missing_ranges(start, end)
+        if not ranges:
+            return 0
+        if self.fetch is None:
+            raise RuntimeError(
+                f"FX store for {self.pair} lacks {ranges[0][0]}..{ranges[-1][1]} "
+                "and has no fetcher"
+            )
+        for lo, hi in ranges:
+            fetched = self.fetch(self.pair, lo, hi)
+            self.fetch_calls += 1
+            self.observed.update(fetched)
+            print(f"  {self.pair.upper()}: fetched {len(fetched)} daily rates ({lo} to {hi})")
+        self.fetched_from = min(start.isoformat(), self.fetched_from or start.isoformat())
+        self.fetched_through = max(end.isoformat(), self.fetched_through or end.isoformat())
+        self.observed = dict(sorted(self.observed.items()))
+        save_json(
+            self.name,
+            {
+                "pair": self.pair,
+                "fetched_from": self.fetched_from,
+                "fetched_through": self.fetched_through,
+                "rates": self.observed,
+            },
+        )
+        self._build()
+        return len(ranges)
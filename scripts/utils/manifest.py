@@ -0,0 +1,319 @@
+"""Row-fingerprint manifests for incremental workbook sync.
+
+A full import rewrites every table even though the workbook only gains a
+few rows a week. With a manifest, ``manifests/<table>.json`` in the state
+directory remembers, for every record the last sync wrote, its natural
+key (see ``utils.diff_sync``), a hash of its fields and the NocoDB ``Id``
+it lives at. The next sync hashes the freshly extracted records and
+compares them with the manifest alone:
+
+  - same key, same hash    -> nothing to send
+  - same key, new hash     -> PATCH that Id
+  - key not in manifest    -> insert
+  - manifest entry unused  -> delete that Id
+
+so an unchanged table costs no HTTP calls at all. Ids of inserted rows
+are read back with one ``Id > watermark`` scan.
+
+Without a usable manifest (first run, table recreated or swapped, key
+fields changed, or an earlier sync failed part-way) the table is read
+once and diffed with ``plan_sync``, which also seeds the manifest. The
+manifest is removed before any write and saved only after the sync
+succeeded, so it never claims rows that may not exist.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from .diff_sync import (
+    SyncPlan,
+    apply_sync,
+    natural_key,
+    normalise_value,
+    plan_sync,
+    values_equal,
+)
+from .nocodb_client import NocoDBClient
+from .state import STATE_DIR, load_json, save_json
+
+MANIFEST_DIR = "manifests"
+MANIFEST_VERSION = 1
+
+
+def row_hash(record: dict) -> str:
+    """Stable hash of a record's fields (insensitive to int/float and key order)."""
+    canonical = json.dumps(
+        [[name, normalise_value(record[name])] for name in sorted(record)],
+        default=str,
+    )
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def key_string(record: dict, key_fields: tuple[str, ...]) -> str:
+    return json.dumps(natural_key(record, key_fields), default=str)
+
+
+class RowManifest:
+    """Natural key -> [(row hash, Id), ...] for one table."""
+
+    def __init__(self, table: str, table_id: str, key_fields: tuple[str, ...]):
+        self.table = table
+        self.table_id = table_id
+        self.key_fields = key_fields
+        self.name = f"{MANIFEST_DIR}/{table}.json"
+        (STATE_DIR / MANIFEST_DIR).mkdir(parents=True, exist_ok=True)
+        state = load_json(self.name, {})
+        self.valid = (
+            state.get("version") == MANIFEST_VERSION
+            and state.get("table_id") == table_id
+            and tuple(state.get("key_fields", ())) == key_fields
+        )
+        self.rows: dict[str, list[list]] = state.get("rows", {}) if self.valid else {}
+
+    def plan(self, incoming: list[dict]) -> SyncPlan:
+        """Writes needed to move the table from the manifest to ``incoming``."""
+        entries = {key: list(rows) for key, rows in self.rows.items()}
+        plan = SyncPlan()
+        changed = []
+        for record in incoming:
+            candidates = entries.get(key_string(record, self.key_fields))
+            if not candidates:
+                plan.inserts.append(record)
+                continue
+            digest = row_hash(record)
+            for i, (h, row_id) in enumerate(candidates):
+                if h == digest:
+                    del candidates[i]
+                    plan.matched.append((row_id, record))
+                    plan.unchanged += 1
+                    break
+            else:
+                changed.append(record)
+        # Changed rows take the entries no identical row claimed
+        for record in changed:
+            candidates = entries.get(key_string(record, self.key_fields))
+            if not candidates:
+                plan.inserts.append(record)
+                continue
+            _, row_id = candidates.pop(0)
+            plan.matched.append((row_id, record))
+            plan.updates.append({"Id": row_id, **record})
+        for leftovers in entries.values():
+            plan.deletes.extend(row_id for _, row_id in leftovers)
+        return plan
+
+    def invalidate(self) -> None:
+        """Forget the manifest until the next successful sync."""
+        path = STATE_DIR / self.name
+        if path.exists():
+            os.remove(path)
+
+    def save(self, rows: list[tuple[int, dict]]) -> None:
+        """Persist (Id, record) pairs as the table's current contents."""
+        self.rows = {}
+        for row_id, record in rows:
+            self.rows.setdefault(key_string(record, self.key_fields), []).append(
+                [row_hash(record), row_id]
+            )
+        save_json(
+            self.name,
+            {
+                "version": MANIFEST_VERSION,
+                "table_id": self.table_id,
+                "key_fields": list(self.key_fields),
+                "rows": self.rows,
+            },
+        )
+
+    @staticmethod
+    def reset(table: str) -> None:
+        """Forget one table's manifest (used after the table is truncated)."""
+        path = STATE_DIR / MANIFEST_DIR / f"{table}.json"
+        if path.exists():
+            os.remove(path)
+
+
+def _max_id(client: NocoDBClient, table_id: str) -> int:
+    page = client.get_records(table_id, {"fields": "Id", "sort": "-Id", "limit": 1})
+    rows = page.get("list", [])
+    return rows[0]["Id"] if rows else 0
+
+
+def _inserted_ids(
+    client: NocoDBClient,
+    table_id: str,
+    inserts: list[dict],
+    key_fields: tuple[str, ...],
+    watermark: int,
+) -> list[tuple[int, dict]]:
+    """Pair inserted records with the Ids NocoDB gave them.
+
+    Rows above ``watermark`` are matched on natural key, preferring a row
+    whose fields all equal the record's when several share the key.
+    """
+    fields = sorted({name for record in inserts for name in record} | {"Id"})
+    by_key: dict[str, list[dict]] = {}
+    for row in client.iter_records(table_id, fields=fields, where=f"(Id,gt,{watermark})"):
+        by_key.setdefault(key_string(row, key_fields), []).append(row)
+    pairs = []
+    for record in inserts:
+        candidates = by_key.get(key_string(record, key_fields))
+        if not candidates:
+            raise RuntimeError(
+                f"Inserted record not found when reading back Ids: {record}"
+            )
+        best = next(
+            (
+                i for i, row in enumerate(candidates)
+                if all(values_equal(v, row.get(k)) for k, v in record.items())
+            ),
+            0,
+        )
+        pairs.append((candidates.pop(best)["Id"], record))
+    return pairs
+
+
+def sync_table(
+    client: NocoDBClient,
+    name: str,
+    table_id: str,
+    records: list[dict],
+    key_fields: tuple[str, ...],
+    preserve: bool = False,
+) -> SyncPlan:
+    """Make ``table_id`` hold ``records``, sending only the changed rows.
+
+    With ``preserve`` the first (manifest-less) sync only inserts missing
+    keys and leaves existing rows alone, for tables users edit.
+    """
+    manifest = RowManifest(name, table_id, key_fields)
+    if manifest.valid:
+        plan = manifest.plan(records)
+    else:
+        print(f"  No manifest for '{name}', diffing against the table")
+        fields = sorted({f for record in records for f in record} | {"Id"})
+        plan = plan_sync(
+            client.iter_records(table_id, fields=fields), records, key_fields
+        )
+        if preserve:
+            plan.unchanged += len(plan.updates)
+            plan.updates = []
+            plan.deletes = []
+
+    watermark = _max_id(client, table_id) if plan.inserts else 0
+    if plan.total_writes:
+        manifest.invalidate()
+    apply_sync(client, table_id, plan)
+    inserted = (
+        _inserted_ids(client, table_id, plan.inserts, key_fields, watermark)
+        if plan.inserts else []
+    )
+    if plan.total_writes or not manifest.valid:
+        manifest.save(plan.matched + inserted)
+    print(
+        f"  Synced '{name}': {len(plan.inserts)} inserted, "
+        f"{len(plan.updates)} updated, {len(plan.deletes)} deleted, "
+        f"{plan.unchanged} unchanged"
+    )
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# Step runner integration (same interface as utils.pipeline)
+# ---------------------------------------------------------------------------
+
+
+class SyncSink:
+    """Collects one table's records and syncs them when closed."""
+
+    def __init__(self, sync: "IncrementalSync", name: str, table_id: str):
+        self.name = name
+        self.table_id = table_id
+        self.queued = 0
+        self.uploaded = 0
+        self.elapsed = 0.0
+        self.plan: SyncPlan | None = None
+        self._sync = sync
+        self._records: list[dict] = []
+        self._closed = False
+
+    def put(self, record: dict) -> None:
+        self._records.append(record)
+        self.queued += 1
+
+    def extend(self, records) -> None:
+        for record in records:
+            self.put(record)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        start = time.perf_counter()
+        self.plan = sync_table(
+            self._sync.client,
+            self.name,
+            self.table_id,
+            self._records,
+            self._sync.key_fields[self.name],
+            preserve=self.name in self._sync.preserve,
+        )
+        self.uploaded = self.queued
+        self.elapsed = time.perf_counter() - start
+        self._records = []
+
+    def abort(self) -> None:
+        # Nothing has been written yet: just drop the records
+        self._closed = True
+        self._records = []
+
+    def __enter__(self) -> "SyncSink":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class IncrementalSync:
+    """Drop-in for ``UploadPipeline`` that syncs tables via manifests."""
+
+    def __init__(
+        self,
+        client: NocoDBClient,
+        key_fields: dict[str, tuple[str, ...]],
+        preserve: set[str] | None = None,
+    ):
+        self.client = client
+        self.key_fields = key_fields
+        self.preserve = preserve or set()
+        self.sinks: dict[str, SyncSink] = {}
+
+    def sink(self, name: str, table_id: str) -> SyncSink:
+        if name in self.sinks:
+            raise ValueError(f"Table '{name}' already has a sync sink")
+        if name not in self.key_fields:
+            raise ValueError(f"No natural key defined for table '{name}'")
+        sink = SyncSink(self, name, table_id)
+        self.sinks[name] = sink
+        return sink
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {name: sink.uploaded for name, sink in self.sinks.items()}
+
+    @property
+    def writes(self) -> int:
+        """Records inserted, updated or deleted across all tables."""
+        return sum(s.plan.total_writes for s in self.sinks.values() if s.plan)
+
+    def __enter__(self) -> "IncrementalSync":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for sink in self.sinks.values():
+            sink.abort()
@@ -0,0 +1,61 @@
+"""TTL cache for NocoDB metadata (table ids, column definitions, row counts).
+
+Entries expire after ``ttl`` seconds and can be invalidated explicitly
+(the client drops a table's row count after writing to it). With
+``persist=True`` the cache is saved to ``meta_cache.json`` in the state
+directory, keyed by server URL and base id, so the next script run can
+start without any metadata round-trips.
+"""
+
+import threading
+import time
+from typing import Any
+
+from .state import load_json, save_json
+
+STATE_FILE = "meta_cache.json"
+DEFAULT_TTL = 300.0
+
+
+class MetaCache:
+    """Namespaced key -> value cache with per-entry expiry."""
+
+    def __init__(self, scope: str, ttl: float = DEFAULT_TTL, persist: bool = False):
+        self.scope = scope
+        self.ttl = ttl
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, list]] = {}
+        if persist:
+            self._entries = load_json(STATE_FILE, {}).get(scope, {})
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        """Return a cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(namespace, {}).get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries.setdefault(namespace, {})[key] = [time.time(), value]
+
+    def invalidate(self, namespace: str | None = None, key: str | None = None) -> None:
+        """Drop one entry, one namespace, or everything."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            elif key is None:
+                self._entries.pop(namespace, None)
+            else:
+                self._entries.get(namespace, {}).pop(key, None)
+
+    def save(self) -> None:
+        if not self.persist:
+            return
+        with self._lock:
+            entries = {ns: dict(items) for ns, items in self._entries.items()}
+        data = load_json(STATE_FILE, {})
+        data[self.scope] = entries
+        save_json(STATE_FILE, data)
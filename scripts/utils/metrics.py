@@ -0,0 +1,115 @@
+"""Per-request instrumentation for NocoDBClient.
+
+Every HTTP call is recorded with its endpoint, method, batch size,
+request/response bytes, latency, status code and retry attempt. Calls are
+grouped by ``METHOD endpoint`` (table and base ids replaced by ``{id}``)
+into in-memory samples that can be printed as a summary table or dumped
+as JSON, so slow imports can be traced to the server, the network or our
+own serialization.
+"""
+
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+ID_SEGMENT = re.compile(r"/(tables|bases)/[^/]+")
+
+
+def endpoint_template(path: str) -> str:
+    """``/api/v2/tables/m123/records`` -> ``/api/v2/tables/{id}/records``."""
+    return ID_SEGMENT.sub(r"/\1/{id}", path)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class RequestSample:
+    method: str
+    endpoint: str
+    status: int
+    latency: float
+    request_bytes: int
+    response_bytes: int
+    batch_size: int | None = None
+    retry: int = 0
+
+
+class RequestMetrics:
+    """Thread-safe collector of ``RequestSample``s."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: dict[str, list[RequestSample]] = defaultdict(list)
+
+    def record(self, sample: RequestSample) -> None:
+        key = f"{sample.method} {sample.endpoint}"
+        with self._lock:
+            self._samples[key].append(sample)
+
+    def summary(self) -> dict[str, dict]:
+        """Aggregate stats per ``METHOD endpoint``."""
+        with self._lock:
+            groups = {k: list(v) for k, v in self._samples.items()}
+        out = {}
+        for key, samples in sorted(groups.items()):
+            latencies = sorted(s.latency for s in samples)
+            batches = [s.batch_size for s in samples if s.batch_size]
+            out[key] = {
+                "count": len(samples),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "max_ms": round(latencies[-1] * 1000, 1),
+                "total_s": round(sum(latencies), 3),
+                "request_bytes": sum(s.request_bytes for s in samples),
+                "response_bytes": sum(s.response_bytes for s in samples),
+                "avg_batch": round(sum(batches) / len(batches), 1) if batches else None,
+                "retries": sum(1 for s in samples if s.retry),
+                "statuses": dict(Counter(str(s.status) for s in samples)),
+            }
+        return out
+
+    def print_summary(self) -> None:
+        """Print a per-endpoint latency/throughput table."""
+        summary = self.summary()
+        if not summary:
+            return
+        print("\n=== NocoDB request metrics ===")
+        print(
+            f"  {'endpoint':<44} {'calls':>6} {'p50ms':>8} {'p99ms':>8} "
+            f"{'total s':>8} {'sent KB':>8} {'recv KB':>8} {'batch':>6} {'retry':>5}"
+        )
+        for key, s in summary.items():
+            batch = f"{s['avg_batch']:.0f}" if s["avg_batch"] else "-"
+            print(
+                f"  {key:<44} {s['count']:>6} {s['p50_ms']:>8.1f} {s['p99_ms']:>8.1f} "
+                f"{s['total_s']:>8.2f} {s['request_bytes'] / 1024:>8.1f} "
+                f"{s['response_bytes'] / 1024:>8.1f} {batch:>6} {s['retries']:>5}"
+            )
+        errors = {
+            k: {code: n for code, n in s["statuses"].items() if not code.startswith("2")}
+            for k, s in summary.items()
+        }
+        for key, codes in errors.items():
+            if codes:
+                print(f"  non-2xx {key}: {codes}")
+
+    def dump_json(self, path: str | Path, samples: bool = False) -> None:
+        """Write the summary (and optionally every raw sample) as JSON."""
+        data = {"summary": self.summary()}
+        if samples:
+            with self._lock:
+                data["samples"] = {
+                    k: [asdict(s) for s in v] for k, v in self._samples.items()
+                }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
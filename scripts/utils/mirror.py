@@ -0,0 +1,194 @@
+"""Local SQLite mirror of the NocoDB tables.
+
+Keeps a copy of every table in ``TABLE_SCHEMAS`` in
+``scripts/.state/mirror.sqlite`` so dry runs and offline analysis read
+locally instead of re-downloading whole tables over HTTP.
+
+Each record is stored whole as JSON (``rec_<table>``), so columns added
+after the original schema (e.g. ``deposits.amount_usd``) are kept too; a
+``<table>`` view exposes the schema columns for ad-hoc SQL.
+
+Refresh is incremental for tables with an ``UpdatedAt`` system field:
+only rows updated since the last refresh are re-fetched (day granularity,
+so a refresh re-reads at most one day of changes), and if the server row
+count then differs from the local one, rows were deleted remotely and a
+cheap Id-only sweep prunes them locally.
+
+Tables without ``UpdatedAt`` are re-read in full on every refresh: an
+``Id`` high-water mark would only see new rows, never edits to existing
+ones (e.g. ``amount_usd`` written by a backfill), so the mirror would
+serve stale values. A table that gains ``UpdatedAt`` (e.g. it was empty
+when first mirrored) switches to incremental refreshes from then on.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+from .nocodb_client import NocoDBClient
+from .schemas import TABLE_SCHEMAS, column_names
+from .state import state_path
+
+MIRROR_FILE = "mirror.sqlite"
+
+
+class Mirror:
+    """SQLite mirror of NocoDB tables keyed by table name."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else state_path(MIRROR_FILE)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_meta ("
+            " name TEXT PRIMARY KEY, table_id TEXT, max_id INTEGER,"
+            " updated_since TEXT, has_updated_at INTEGER, refreshed_at TEXT)"
+        )
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "Mirror":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------------------------------------------------------
+    # Storage
+    # -----------------------------------------------------------------------
+
+    def _ensure_table(self, name: str) -> None:
+        self.db.execute(
+            f'CREATE TABLE IF NOT EXISTS "rec_{name}" ('
+            " Id INTEGER PRIMARY KEY, updated_at TEXT, data TEXT NOT NULL)"
+        )
+        if name in TABLE_SCHEMAS:
+            cols = ", ".join(
+                f"json_extract(data, '$.{c}') AS \"{c}\""
+                for c in column_names(name)
+                if c != "Id"
+            )
+            self.db.execute(
+                f'CREATE VIEW IF NOT EXISTS "{name}" AS '
+                f'SELECT Id, {cols} FROM "rec_{name}"'
+            )
+
+    def _meta(self, name: str) -> dict | None:
+        row = self.db.execute(
+            "SELECT table_id, max_id, updated_since, has_updated_at"
+            " FROM mirror_meta WHERE name = ?",
+            (name,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "table_id": row[0],
+            "max_id": row[1],
+            "updated_since": row[2],
+            "has_updated_at": bool(row[3]),
+        }
+
+    def _upsert(self, name: str, records: list[dict]) -> None:
+        self.db.executemany(
+            f'INSERT OR REPLACE INTO "rec_{name}" (Id, updated_at, data)'
+            " VALUES (?, ?, ?)",
+            [(r["Id"], r.get("UpdatedAt"), json.dumps(r)) for r in records],
+        )
+
+    # -----------------------------------------------------------------------
+    # Refresh
+    # -----------------------------------------------------------------------
+
+    def refresh(self, client: NocoDBClient, name: str, table_id: str) -> int:
+        """Bring one table up to date. Returns the number of rows fetched."""
+        self._ensure_table(name)
+        meta = self._meta(name)
+        if meta is None or meta["table_id"] != table_id:
+            # New table or table recreated: start from scratch
+            self.db.execute(f'DELETE FROM "rec_{name}"')
+            probe = client.get_records(table_id, {"limit": 1}).get("list", [])
+            meta = {
+                "table_id": table_id,
+                "max_id": 0,
+                "updated_since": None,
+                "has_updated_at": bool(probe and "UpdatedAt" in probe[0]),
+            }
+
+        full = not (meta["has_updated_at"] and meta["updated_since"])
+        where = None if full else f"(UpdatedAt,gte,exactDate,{meta['updated_since']})"
+
+        fetched = 0
+        newest = meta["updated_since"]
+        seen: set[int] = set()
+        for page in client.iter_pages(table_id, where=where, page_size=500):
+            self._upsert(name, page)
+            fetched += len(page)
+            meta["max_id"] = max(meta["max_id"], page[-1]["Id"])
+            if full:
+                seen.update(r["Id"] for r in page)
+                meta["has_updated_at"] |= "UpdatedAt" in page[0]
+            stamps = [r["UpdatedAt"][:10] for r in page if r.get("UpdatedAt")]
+            if stamps:
+                newest = max([newest or "", *stamps])
+
+        if full:
+            # Every remote row was just read: anything else was deleted
+            self._drop_missing(name, seen)
+        elif client.row_count(table_id, refresh=True) != self.count(name):
+            self._prune(client, name, table_id)
+
+        self.db.execute(
+            "INSERT OR REPLACE INTO mirror_meta VALUES"
+            " (?, ?, ?, ?, ?, datetime('now'))",
+            (name, table_id, meta["max_id"], newest, int(meta["has_updated_at"])),
+        )
+        self.db.commit()
+        return fetched
+
+    def _prune(self, client: NocoDBClient, name: str, table_id: str) -> None:
+        """Drop local rows whose Id no longer exists remotely."""
+        remote_ids = {
+            r["Id"] for r in client.iter_records(table_id, "Id", page_size=1000)
+        }
+        self._drop_missing(name, remote_ids)
+
+    def _drop_missing(self, name: str, remote_ids: set[int]) -> None:
+        local_ids = {
+            row[0] for row in self.db.execute(f'SELECT Id FROM "rec_{name}"')
+        }
+        gone = local_ids - remote_ids
+        self.db.executemany(
+            f'DELETE FROM "rec_{name}" WHERE Id = ?', [(i,) for i in gone]
+        )
+
+    def refresh_all(
+        self, client: NocoDBClient, table_ids: dict[str, str]
+    ) -> dict[str, int]:
+        """Refresh several tables. Returns name -> rows fetched."""
+        return {
+            name: self.refresh(client, name, tid)
+            for name, tid in table_ids.items()
+        }
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    def has(self, name: str) -> bool:
+        """True if the table has been mirrored at least once."""
+        return self._meta(name) is not None
+
+    def count(self, name: str) -> int:
+        self._ensure_table(name)
+        return self.db.execute(f'SELECT COUNT(*) FROM "rec_{name}"').fetchone()[0]
+
+    def iter_records(self, name: str) -> Iterator[dict]:
+        """Yield mirrored records in Id order."""
+        self._ensure_table(name)
+        cursor = self.db.execute(f'SELECT data FROM "rec_{name}" ORDER BY Id')
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def records(self, name: str) -> list[dict]:
+        return list(self.iter_records(name))
@@ -2,44 +2,336 @@
 
 Provides table creation (idempotent), bulk record insertion in batches,
 record fetching with pagination, and record deletion for re-runs.
+
+All requests go through a single pooled ``requests.Session`` so batches
+reuse keep-alive connections instead of opening a new TCP/TLS connection
+per call.
 """
 
-import math
+import gzip
+import json
+import os
+import time
 import requests
-from typing import Any
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from typing import Any, Iterable, Iterator
+
+from .batching import BatchSizer, is_retryable
+from .checkpoint import ImportJournal
+from .meta_cache import DEFAULT_TTL, MetaCache
+from .metrics import RequestMetrics, RequestSample, endpoint_template
+from .rate_limit import RateLimiter, limiter_for
+
+DEFAULT_POOL_SIZE = 10
+MAX_RETRIES = 4
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch write, reported in batch order."""
+
+    index: int
+    size: int
+    ok: bool
+    elapsed: float
+    error: Exception | None = None
+    retries: int = 0
+    offset: int = 0  # position of the batch's first record in the input
+    # [start, end) ranges, relative to ``offset``, written before a split
+    # batch failed (only set when ``ok`` is False)
+    written: list[tuple[int, int]] = field(default_factory=list)
+
+
+class BulkInsertError(RuntimeError):
+    """Raised when one or more batches of a concurrent insert failed.
+
+    ``results`` holds the full ordered report, so callers can see exactly
+    which batches were acknowledged and which need to be retried.
+    """
+
+    def __init__(self, results: list[BatchResult]):
+        self.results = results
+        failed = [r for r in results if not r.ok]
+        first = failed[0]
+        super().__init__(
+            f"{len(failed)}/{len(results)} batches failed "
+            f"(first: batch {first.index + 1}: {first.error})"
+        )
+
+
+def transport_options() -> dict[str, Any]:
+    """Read pooled-transport settings from the environment.
+
+    NOCODB_POOL_SIZE sets the keep-alive pool size, NOCODB_GZIP=1
+    enables gzip request bodies, NOCODB_CONCURRENCY sets how many write
+    batches are kept in flight and NOCODB_META_TTL sets how long cached
+    metadata stays valid (0 disables the on-disk metadata cache). Shared
+    by every script that builds a client so they all tune the transport
+    the same way.
+    """
+    meta_ttl = float(os.environ.get("NOCODB_META_TTL", DEFAULT_TTL))
+    return {
+        "pool_size": int(os.environ.get("NOCODB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        "compress": os.environ.get("NOCODB_GZIP", "") in ("1", "true", "yes"),
+        "concurrency": int(os.environ.get("NOCODB_CONCURRENCY", 1)),
+        "meta_ttl": meta_ttl,
+        "persist_meta": meta_ttl > 0,
+    }
 
 
 class NocoDBClient:
-    """Wrapper around NocoDB v2 REST API."""
+    """Wrapper around NocoDB v2 REST API.
+
+    Args:
+        base_url: NocoDB server URL.
+        api_token: API token sent as ``xc-token``.
+        base_id: Base (project) id used for meta endpoints.
+        pool_size: Maximum number of keep-alive connections kept open to
+            the NocoDB host. Should be >= the number of concurrent workers.
+        compress: Gzip-encode JSON request bodies. Responses are always
+            requested with ``Accept-Encoding: gzip``. Only enable this when
+            the server (or a proxy in front of it) accepts gzip bodies.
+        timeout: Per-request timeout in seconds.
+        concurrency: Default number of in-flight batches for bulk writes.
+            1 keeps the original strictly sequential behaviour.
+        batch_sizer: Adaptive batch-size controller shared by all write
+            paths. Defaults to one persisted in the state directory.
+        meta_ttl: Seconds cached metadata (tables, columns, row counts)
+            stays valid.
+        persist_meta: Save the metadata cache to the state directory so
+            later runs can skip the lookups while it is fresh.
+        limiter: Rate limiter every request waits on. Defaults to the
+            shared per-host one (see ``utils.rate_limit``).
+    """
 
-    def __init__(self, base_url: str, api_token: str, base_id: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_token: str,
+        base_id: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        compress: bool = False,
+        timeout: float = 60.0,
+        concurrency: int = 1,
+        batch_sizer: BatchSizer | None = None,
+        meta_ttl: float = DEFAULT_TTL,
+        persist_meta: bool = False,
+        limiter: RateLimiter | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.api_token = api_token
         self.base_id = base_id
+        self.pool_size = pool_size
+        self.compress = compress
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.batch_sizer = batch_sizer or BatchSizer()
+        self.metrics = RequestMetrics()
+        self.limiter = limiter or limiter_for(self.base_url)
+        self.meta = MetaCache(self.target, ttl=meta_ttl, persist=persist_meta)
         self.headers = {
             "xc-token": api_token,
             "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
         }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def list_tables(self) -> list[dict]:
-        """List all tables in the base."""
-        resp = requests.get(
-            f"{self.base_url}/api/v2/meta/bases/{self.base_id}/tables",
-            headers=self.headers,
-        )
-        resp.raise_for_status()
-        return resp.json().get("list", [])
+    @property
+    def target(self) -> str:
+        """``base_url|base_id``: identifies the base this client writes to."""
+        return f"{self.base_url}|{self.base_id}"
+
+    def close(self) -> None:
+        """Close all pooled connections and save the metadata cache."""
+        self.meta.save()
+        self.session.close()
+
+    def report_metrics(self) -> None:
+        """Print the per-endpoint request summary.
+
+        If NOCODB_METRICS_JSON is set, the summary and raw samples are also
+        written to that path.
+        """
+        self.metrics.print_summary()
+        json_path = os.environ.get("NOCODB_METRICS_JSON")
+        if json_path:
+            self.metrics.dump_json(json_path, samples=True)
+            print(f"  Metrics written to {json_path}")
+
+    def __enter__(self) -> "NocoDBClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------------------------------------------------------
+    # Transport
+    # -----------------------------------------------------------------------
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        json_body: Any = None,
+        body: bytes | None = None,
+        batch_size: int | None = None,
+        retry: int = 0,
+    ) -> requests.Response:
+        """Send a request over the pooled session and raise on HTTP errors.
+
+        ``body`` is an already JSON-encoded payload; ``json_body`` is
+        encoded here. Every request first waits on the host's rate limiter,
+        which then sees the response's status and rate-limit headers; a
+        429 is retried (up to ``MAX_RETRIES`` times) after the server's
+        ``Retry-After`` or a jittered backoff. Every attempt, successful
+        or not, is recorded in ``self.metrics`` with its batch size and
+        retry number.
+        """
+        headers = {}
+        data = body
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+        if data is not None:
+            if self.compress:
+                data = gzip.compress(data)
+                headers["Content-Encoding"] = "gzip"
+        attempt = retry
+        while True:
+            self.limiter.acquire()
+            status = 0
+            response_bytes = 0
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+                status = resp.status_code
+                response_bytes = len(resp.content)
+                self.limiter.observe(status, resp.headers)
+                if status != 429 or attempt - retry >= MAX_RETRIES:
+                    resp.raise_for_status()
+                    return resp
+            finally:
+                self.metrics.record(
+                    RequestSample(
+                        method=method,
+                        endpoint=endpoint_template(path),
+                        status=status,
+                        latency=time.perf_counter() - start,
+                        request_bytes=len(data) if data else 0,
+                        response_bytes=response_bytes,
+                        batch_size=batch_size,
+                        retry=attempt,
+                    )
+                )
+            attempt += 1
+            self.limiter.backoff(attempt - retry, resp.headers)
+
+    def _records_path(self, table_id: str) -> str:
+        return f"/api/v2/tables/{table_id}/records"
+
+    # -----------------------------------------------------------------------
+    # Meta
+    # -----------------------------------------------------------------------
+
+    def list_tables(self, refresh: bool = False) -> list[dict]:
+        """List all tables in the base (cached, see ``MetaCache``)."""
+        tables = None if refresh else self.meta.get("tables", self.base_id)
+        if tables is None:
+            resp = self._request(
+                "GET", f"/api/v2/meta/bases/{self.base_id}/tables"
+            )
+            tables = resp.json().get("list", [])
+            self.meta.put("tables", self.base_id, tables)
+        return tables
 
     def create_table(self, table_def: dict) -> dict:
         """Create a table with columns."""
-        resp = requests.post(
-            f"{self.base_url}/api/v2/meta/bases/{self.base_id}/tables",
-            headers=self.headers,
-            json=table_def,
+        resp = self._request(
+            "POST",
+            f"/api/v2/meta/bases/{self.base_id}/tables",
+            json_body=table_def,
         )
-        resp.raise_for_status()
+        self.meta.invalidate("tables", self.base_id)
         return resp.json()
 
+    def rename_table(self, table_id: str, title: str) -> None:
+        """Change a table's title. Its id, and so its records URL, is kept."""
+        self._request(
+            "PATCH", f"/api/v2/meta/tables/{table_id}", json_body={"title": title}
+        )
+        self.meta.invalidate("tables", self.base_id)
+
+    def drop_table(self, table_id: str) -> None:
+        """Delete a table and all of its records."""
+        self._request("DELETE", f"/api/v2/meta/tables/{table_id}")
+        self.meta.invalidate("tables", self.base_id)
+        self.meta.invalidate("columns", table_id)
+        self.meta.invalidate("counts", table_id)
+
+    def table_columns(self, table_id: str, refresh: bool = False) -> list[dict]:
+        """Column definitions of a table (cached)."""
+        columns = None if refresh else self.meta.get("columns", table_id)
+        if columns is None:
+            resp = self._request("GET", f"/api/v2/meta/tables/{table_id}")
+            columns = resp.json().get("columns", [])
+            self.meta.put("columns", table_id, columns)
+        return columns
+
+    def add_column(self, table_id: str, column_def: dict) -> None:
+        """Add a column to an existing table."""
+        self._request(
+            "POST", f"/api/v2/meta/tables/{table_id}/columns", json_body=column_def
+        )
+        self.meta.invalidate("columns", table_id)
+
+    def ensure_columns(self, table_id: str, column_defs: list[dict]) -> list[str]:
+        """Add the columns a table lacks. Returns the names added."""
+        existing = {c.get("column_name") for c in self.table_columns(table_id)}
+        existing |= {c.get("title") for c in self.table_columns(table_id)}
+        added = []
+        for column_def in column_defs:
+            if column_def["column_name"] not in existing:
+                self.add_column(
+                    table_id, {"title": column_def["column_name"], **column_def}
+                )
+                added.append(column_def["column_name"])
+        return added
+
+    def row_count(self, table_id: str, refresh: bool = False) -> int:
+        """Number of records in a table (cached until the next write)."""
+        count = None if refresh else self.meta.get("counts", table_id)
+        if count is None:
+            resp = self._request("GET", f"{self._records_path(table_id)}/count")
+            count = resp.json().get("count", 0)
+            self.meta.put("counts", table_id, count)
+        return count
+
+    def row_counts(
+        self, table_ids: dict[str, str], refresh: bool = False
+    ) -> dict[str, int]:
+        """Row counts for several tables, fetching uncached ones in parallel."""
+        with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+            futures = {
+                name: pool.submit(self.row_count, tid, refresh)
+                for name, tid in table_ids.items()
+            }
+            return {name: fut.result() for name, fut in futures.items()}
+
     def ensure_tables(self, schemas: dict[str, dict]) -> dict[str, str]:
         """Create tables if they don't exist. Return name -> table_id mapping.
 
@@ -51,81 +343,459 @@ class NocoDBClient:
         for name, schema in schemas.items():
             if name in existing:
                 table_ids[name] = existing[name]
-                print(f"  Table '{name}' already exists (id: {existing[name]})")
             else:
                 result = self.create_table(schema)
                 table_ids[name] = result["id"]
                 print(f"  Created table '{name}' (id: {result['id']})")
+        reused = len(schemas) - sum(1 for n in schemas if n not in existing)
+        if reused:
+            print(f"  {reused} table(s) already exist")
         return table_ids
 
-    def bulk_insert(
-        self, table_id: str, records: list[dict], batch_size: int = 100
+    # -----------------------------------------------------------------------
+    # Records
+    # -----------------------------------------------------------------------
+
+    def _send_batch(
+        self,
+        method: str,
+        table_id: str,
+        batch: list[dict],
+        adaptive: bool,
+        written: list[tuple[int, int]] | None = None,
+        offset: int = 0,
     ) -> int:
-        """Insert records in batches. Returns total inserted count."""
-        if not records:
-            return 0
-        total = 0
-        total_batches = math.ceil(len(records) / batch_size)
-        for i in range(0, len(records), batch_size):
-            batch = records[i : i + batch_size]
-            batch_num = (i // batch_size) + 1
-            resp = requests.post(
-                f"{self.base_url}/api/v2/tables/{table_id}/records",
-                headers=self.headers,
-                json=batch,
-            )
-            resp.raise_for_status()
-            total += len(batch)
-            print(
-                f"  Inserted {batch_num}/{total_batches} ({total} records)"
+        """Send one write batch, retrying transient failures.
+
+        A 413 splits the batch in half and sends both halves; each half
+        that succeeds is appended to ``written`` as a ``[start, end)`` range
+        (``offset`` is the batch's position in the caller's batch), so a
+        failure in the second half still leaves the first acknowledged.
+        5xx responses to PATCH and DELETE are retried with jittered
+        exponential backoff; POSTs are not, since the server may have
+        committed the insert before failing and a retry would duplicate it
+        (429s are retried by ``_request``, they were never processed).
+        Every attempt is fed to the batch sizer when ``adaptive``. Returns
+        the retry count.
+        """
+        path = self._records_path(table_id)
+        retries = 0
+        while True:
+            body = json.dumps(batch).encode()
+            start = time.perf_counter()
+            try:
+                self._request(
+                    method, path, body=body, batch_size=len(batch), retry=retries
+                )
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if adaptive:
+                    self.batch_sizer.record(
+                        table_id, len(batch), time.perf_counter() - start,
+                        len(body), status,
+                    )
+                if status == 413 and len(batch) > 1:
+                    half = len(batch) // 2
+                    return (
+                        retries
+                        + 1
+                        + self._send_batch(
+                            method, table_id, batch[:half], adaptive, written, offset
+                        )
+                        + self._send_batch(
+                            method, table_id, batch[half:], adaptive, written,
+                            offset + half,
+                        )
+                    )
+                if (
+                    status == 429
+                    or method == "POST"
+                    or not is_retryable(status)
+                    or retries >= MAX_RETRIES
+                ):
+                    raise
+                retries += 1
+                self.limiter.backoff(retries, e.response.headers)
+            else:
+                if adaptive:
+                    self.batch_sizer.record(
+                        table_id, len(batch), time.perf_counter() - start,
+                        len(body),
+                    )
+                if written is not None:
+                    written.append((offset, offset + len(batch)))
+                return retries
+
+    def _write_batches(
+        self,
+        method: str,
+        table_id: str,
+        records: Iterable[dict],
+        batch_size: int | None = None,
+        concurrency: int = 1,
+        verb: str | None = None,
+        journal: ImportJournal | None = None,
+    ) -> list[BatchResult]:
+        """Shared write loop for insert, update and delete.
+
+        Batches are cut from ``records`` as they are sent, so any iterable
+        works and, when ``batch_size`` is None, each batch uses the size the
+        ``BatchSizer`` currently recommends for the table. With
+        ``concurrency > 1`` up to that many batches are kept in flight and
+        new ones are only cut once a slot frees up. Sequential mode stops at
+        the first failed batch; concurrent mode captures errors per batch.
+        If ``records`` itself raises, the records it yielded before are
+        still sent (and journalled), then the error propagates.
+
+        With a ``journal``, record ranges it already acknowledges are
+        skipped and every successful batch is acknowledged as soon as it
+        completes, so an interrupted import can resume where it stopped.
+        Returns the per-batch report ordered by batch index.
+        """
+        adaptive = batch_size is None
+        source = iter(records)
+        expected = len(records) if hasattr(records, "__len__") else None
+        results: list[BatchResult] = []
+        done_records = journal.acked_records if journal else 0
+        position = 0
+
+        source_error: BaseException | None = None
+
+        def take() -> tuple[int, list[dict]]:
+            nonlocal position, source_error
+            if source_error is not None:
+                raise source_error
+            size = batch_size or self.batch_sizer.size(table_id)
+            if journal:
+                resume_at = journal.skip_to(position)
+                if resume_at > position:
+                    # Consume already-acknowledged records without sending
+                    next(islice(source, resume_at - position - 1, None), None)
+                    position = resume_at
+                limit = journal.limit_from(position)
+                if limit is not None:
+                    size = min(size, limit)
+            batch: list[dict] = []
+            try:
+                batch.extend(islice(source, size))
+            except BaseException as e:
+                # Send the records read before the source failed; the error
+                # is raised by the next take()
+                if not batch:
+                    raise
+                source_error = e
+            start = position
+            position += len(batch)
+            return start, batch
+
+        def send(index: int, offset: int, batch: list[dict]) -> BatchResult:
+            start = time.perf_counter()
+            written: list[tuple[int, int]] = []
+            try:
+                retries = self._send_batch(method, table_id, batch, adaptive, written)
+            except Exception as e:
+                return BatchResult(
+                    index, len(batch), False, time.perf_counter() - start, e,
+                    offset=offset, written=written,
+                )
+            return BatchResult(
+                index, len(batch), True, time.perf_counter() - start,
+                retries=retries, offset=offset,
             )
-        return total
+
+        def report(result: BatchResult) -> None:
+            nonlocal done_records
+            results.append(result)
+            # A failed batch that was split may still have written a part
+            spans = [(0, result.size)] if result.ok else result.written
+            for lo, hi in spans:
+                done_records += hi - lo
+                if journal:
+                    journal.ack(result.offset + lo, result.offset + hi)
+            if verb is None and result.ok:
+                return
+            progress = f"{done_records}/{expected}" if expected else done_records
+            if result.ok:
+                print(
+                    f"  {verb} batch {result.index + 1} of {result.size} "
+                    f"({progress} records, {result.elapsed:.2f}s)"
+                )
+            else:
+                print(f"  FAILED batch {result.index + 1}: {result.error}")
+
+        try:
+            if concurrency <= 1:
+                index = 0
+                while (cut := take())[1]:
+                    result = send(index, *cut)
+                    report(result)
+                    if not result.ok:
+                        break
+                    index += 1
+            else:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    pending = set()
+                    index = 0
+                    try:
+                        while (cut := take())[1]:
+                            pending.add(pool.submit(send, index, *cut))
+                            index += 1
+                            if len(pending) >= concurrency:
+                                finished, pending = wait(
+                                    pending, return_when=FIRST_COMPLETED
+                                )
+                                for fut in finished:
+                                    report(fut.result())
+                    finally:
+                        # Report in-flight batches even if the record source
+                        # raised, so journals acknowledge everything written
+                        for fut in pending:
+                            report(fut.result())
+        finally:
+            self.meta.invalidate("counts", table_id)
+            if adaptive:
+                self.batch_sizer.save()
+
+        results.sort(key=lambda r: r.index)
+        return results
+
+    def _check_results(
+        self, results: list[BatchResult], concurrency: int
+    ) -> int:
+        """Raise for failed batches; otherwise return the records written."""
+        failed = [r for r in results if not r.ok]
+        if failed:
+            if concurrency <= 1:
+                raise failed[0].error
+            raise BulkInsertError(results)
+        return sum(r.size for r in results)
+
+    def bulk_insert(
+        self,
+        table_id: str,
+        records: Iterable[dict],
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+        journal: ImportJournal | None = None,
+    ) -> int:
+        """Insert records in batches. Returns total inserted count.
+
+        ``batch_size`` defaults to the adaptive per-table size (see
+        ``utils.batching``); pass an int to pin it. ``concurrency``
+        defaults to the client's setting. With ``concurrency > 1`` up to
+        that many batches are kept in flight at once; any failed batch
+        raises ``BulkInsertError`` after the remaining batches have
+        finished.
+
+        With a ``journal`` (see ``utils.checkpoint``) the insert is
+        resumable: acknowledged batches are skipped on a re-run and the
+        journal is marked complete once every batch succeeded. The return
+        value then includes records acknowledged by earlier runs.
+        """
+        concurrency = concurrency or self.concurrency
+        if journal and journal.done:
+            print(f"  Already imported ({journal.acked_records} records), skipping")
+            return journal.acked_records
+        if journal and journal.resuming:
+            print(f"  Resuming after {journal.acked_records} acknowledged records")
+        results = self._write_batches(
+            "POST", table_id, records, batch_size, concurrency, "Inserted",
+            journal,
+        )
+        written = self._check_results(results, concurrency)
+        if journal:
+            journal.complete()
+            return journal.acked_records
+        return written
+
+    def insert_batches(
+        self,
+        table_id: str,
+        records: Iterable[dict],
+        batch_size: int | None = None,
+        max_in_flight: int = 4,
+    ) -> list[BatchResult]:
+        """Insert records with up to ``max_in_flight`` batches concurrently.
+
+        Errors are captured per batch rather than aborting the run; the
+        returned report is ordered by batch index (``offset`` and ``size``
+        locate each batch in ``records``), so callers can retry exactly the
+        batches that failed.
+        """
+        return self._write_batches(
+            "POST", table_id, records, batch_size, max_in_flight, "Inserted"
+        )
+
+    def bulk_update(
+        self,
+        table_id: str,
+        records: Iterable[dict],
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> int:
+        """PATCH records (each must carry ``Id``) in batches.
+
+        Uses the same adaptive batching and concurrency as ``bulk_insert``.
+        Returns total updated count.
+        """
+        concurrency = concurrency or self.concurrency
+        results = self._write_batches(
+            "PATCH", table_id, records, batch_size, concurrency, "Updated"
+        )
+        return self._check_results(results, concurrency)
 
     def get_records(
         self, table_id: str, params: dict[str, Any] | None = None
     ) -> dict:
         """Get a page of records with optional filtering/sorting/pagination."""
-        resp = requests.get(
-            f"{self.base_url}/api/v2/tables/{table_id}/records",
-            headers=self.headers,
-            params=params or {},
+        resp = self._request(
+            "GET", self._records_path(table_id), params=params or {}
         )
-        resp.raise_for_status()
         return resp.json()
 
-    def delete_all_records(self, table_id: str) -> int:
-        """Delete all records from a table. Used for re-running migration.
+    def iter_pages(
+        self,
+        table_id: str,
+        fields: str | list[str] | None = None,
+        where: str | None = None,
+        page_size: int = 200,
+        sort: str | None = None,
+        keyset: bool = True,
+    ) -> Iterator[list[dict]]:
+        """Yield successive pages of matching records.
+
+        By default pages are walked with keyset pagination: records are
+        sorted by ``Id`` and each page asks for ``Id > last_seen``. Unlike
+        offset paging this stays cheap on deep pages and never skips or
+        repeats rows while the table is being modified. Pass
+        ``keyset=False`` to page by offset (required for a custom ``sort``).
 
-        Fetches all record IDs with pagination, then deletes in batches.
-        Returns total deleted count.
+        The next page is fetched on a background thread while the caller
+        works through the current one.
         """
-        total_deleted = 0
-        page_size = 200
+        if keyset and sort:
+            raise ValueError("keyset pagination always sorts by Id; pass keyset=False")
 
-        while True:
-            # Fetch a page of records to get their IDs
-            resp = requests.get(
-                f"{self.base_url}/api/v2/tables/{table_id}/records",
-                headers=self.headers,
-                params={"limit": page_size, "fields": "Id"},
+        params: dict[str, Any] = {"limit": page_size}
+        if fields:
+            names = fields.split(",") if isinstance(fields, str) else list(fields)
+            if keyset and "Id" not in names:
+                names.append("Id")
+            params["fields"] = ",".join(names)
+        if sort:
+            params["sort"] = sort
+        if keyset:
+            params["sort"] = "Id"
+
+        def page_params(cursor) -> dict[str, Any]:
+            if keyset:
+                clauses = []
+                if cursor is not None:
+                    clauses.append(f"(Id,gt,{cursor})")
+                if where:
+                    # Group OR filters so the cursor applies to all of them
+                    clauses.append(f"({where})" if "~or" in where else where)
+                if clauses:
+                    return {**params, "where": "~and".join(clauses)}
+                return params
+            page = {**params, "offset": cursor or 0}
+            if where:
+                page["where"] = where
+            return page
+
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            cursor = None
+            next_page = prefetch.submit(
+                self.get_records, table_id, page_params(cursor)
             )
-            resp.raise_for_status()
-            data = resp.json()
-            records = data.get("list", [])
-
-            if not records:
-                break
-
-            # Delete in batches of 100
-            ids_to_delete = [{"Id": r["Id"]} for r in records]
-            for i in range(0, len(ids_to_delete), 100):
-                batch = ids_to_delete[i : i + 100]
-                del_resp = requests.delete(
-                    f"{self.base_url}/api/v2/tables/{table_id}/records",
-                    headers=self.headers,
-                    json=batch,
-                )
-                del_resp.raise_for_status()
-                total_deleted += len(batch)
+            while next_page is not None:
+                data = next_page.result()
+                records = data.get("list", [])
+                next_page = None
+                if not records:
+                    return
+                # A short page ends a keyset scan unless pageInfo says the
+                # server capped the limit below page_size.
+                more = not data.get("pageInfo", {}).get("isLastPage", True)
+                if keyset:
+                    more = more or len(records) >= page_size
+                    cursor = records[-1]["Id"]
+                else:
+                    cursor = (cursor or 0) + len(records)
+                if more:
+                    next_page = prefetch.submit(
+                        self.get_records, table_id, page_params(cursor)
+                    )
+                yield records
+
+    def iter_records(
+        self,
+        table_id: str,
+        fields: str | list[str] | None = None,
+        where: str | None = None,
+        page_size: int = 200,
+        sort: str | None = None,
+        keyset: bool = True,
+    ) -> Iterator[dict]:
+        """Yield every matching record, one page in memory at a time.
+
+        Full-table scans use keyset (Id cursor) pagination by default and
+        prefetch the next page in the background; see ``iter_pages``.
+        """
+        for page in self.iter_pages(
+            table_id, fields, where, page_size, sort, keyset
+        ):
+            yield from page
+
+    def delete_all_records(
+        self,
+        table_id: str,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+        page_size: int = 200,
+    ) -> int:
+        """Delete all records from a table. Used for re-running migration.
 
-        return total_deleted
+        Streams record IDs page by page (keyset pagination, so rows deleted
+        behind the cursor never shift later pages) into the shared write
+        loop, so ``concurrency`` workers delete batches while the next ID
+        page is prefetched. Returns total deleted count.
+        """
+        concurrency = concurrency or self.concurrency
+        ids = (
+            {"Id": r["Id"]}
+            for r in self.iter_records(table_id, "Id", page_size=page_size)
+        )
+        results = self._write_batches(
+            "DELETE", table_id, ids, batch_size, concurrency
+        )
+        return self._check_results(results, concurrency)
+
+    def delete_records(
+        self,
+        table_id: str,
+        ids: Iterable[int],
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> int:
+        """Delete specific records by Id. Returns total deleted count."""
+        concurrency = concurrency or self.concurrency
+        results = self._write_batches(
+            "DELETE", table_id, ({"Id": i} for i in ids), batch_size, concurrency
+        )
+        return self._check_results(results, concurrency)
+
+    def truncate_tables(
+        self, table_ids: dict[str, str], parallel: int | None = None
+    ) -> dict[str, int]:
+        """Delete all records from several tables in parallel.
+
+        Returns a name -> deleted count mapping in the input order.
+        """
+        parallel = parallel or len(table_ids) or 1
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = {
+                name: pool.submit(self.delete_all_records, tid)
+                for name, tid in table_ids.items()
+            }
+            return {name: fut.result() for name, fut in futures.items()}
@@ -0,0 +1,35 @@
+"""Options sheet column mapping shared by migrate.py and reimport_options.py.
+
+Both scripts read the same two tables; ``OPTION_FIELDS`` maps the columns
+they convert identically, and each script appends the fields it derives
+differently (see utils/projection.py).
+"""
+
+from .projection import column, upper_or_none
+
+OPTIONS_SHEET = "Options"
+WHEEL_TABLE = "Options Wheel Strategy"
+LEAPS_TABLE = "Options LEAPS"
+
+OPTION_FIELDS = (
+    column("ticker", "ticker", clean=upper_or_none),
+    column("opened", "opened", kind="date"),
+    column("expiration", "expiration", kind="date"),
+    column("strike", "strike", kind="float"),
+    column("delta", "greeks (delta)", kind="float"),
+    column("iv_pct", "greeks (iv%)", kind="float"),
+    column("qty", "qty", kind="int"),
+    column("premium", "premium", kind="float"),
+    column("close_date", "date closed", kind="date"),
+    column("close_premium", "closing cost", kind="float"),
+)
+
+# Natural key used to match spreadsheet rows to existing option records
+OPTION_KEY_FIELDS = (
+    "ticker",
+    "opened",
+    "strike",
+    "expiration",
+    "call_put",
+    "buy_sell",
+)
@@ -0,0 +1,198 @@
+"""Producer/consumer upload pipeline.
+
+Extraction code pushes records into a per-table ``TableSink``. The sink
+groups them into chunks on a bounded queue, and an upload worker thread
+drains that queue straight into ``NocoDBClient.bulk_insert``. Parsing on
+the main thread (CPU) and uploads on the workers (I/O) overlap, and at
+most ``max_chunks * chunk_size`` records per table are held in memory
+between the two:
+
+    with UploadPipeline(client) as pipeline:
+        with pipeline.sink("transactions", table_id) as sink:
+            for record in extract_transactions(...):
+                sink.put(record)
+    counts = pipeline.counts
+
+If an upload fails, its worker keeps draining (and discarding) the queue
+so producers never block, and leaving the pipeline raises the error. If
+the producer fails, the sinks are aborted rather than closed: chunks
+already queued are uploaded and journalled, but the tables are not marked
+complete, so a re-run resumes them.
+"""
+
+import queue
+import threading
+import time
+from typing import Iterable, Iterator
+
+from .checkpoint import ImportJournal
+from .nocodb_client import NocoDBClient
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CHUNKS = 4
+
+_DONE = object()
+_ABORT = object()
+
+
+class PipelineAborted(RuntimeError):
+    """Raised inside an upload worker when its producer failed."""
+
+
+class TableSink:
+    """Write end of one table's upload queue."""
+
+    def __init__(
+        self,
+        client: NocoDBClient,
+        name: str,
+        table_id: str,
+        chunk_size: int,
+        max_chunks: int,
+        journal: ImportJournal | None,
+    ):
+        self.name = name
+        self.table_id = table_id
+        self.chunk_size = chunk_size
+        self.queued = 0
+        self.uploaded = 0
+        self.elapsed = 0.0  # seconds from sink creation to upload end
+        self.error: BaseException | None = None
+        self._chunk: list[dict] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._closed = False
+        self._drained = False
+        self._thread = threading.Thread(
+            target=self._upload,
+            args=(client, journal),
+            name=f"upload-{name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def put(self, record: dict) -> None:
+        self._chunk.append(record)
+        self.queued += 1
+        if len(self._chunk) >= self.chunk_size:
+            self._queue.put(self._chunk)
+            self._chunk = []
+
+    def extend(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.put(record)
+
+    def close(self) -> None:
+        """Flush the last partial chunk and signal the end of the stream."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._chunk:
+            self._queue.put(self._chunk)
+            self._chunk = []
+        self._queue.put(_DONE)
+
+    def abort(self) -> None:
+        """End the stream as failed: the upload stops without completing."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._chunk:
+            self._queue.put(self._chunk)
+            self._chunk = []
+        self._queue.put(_ABORT)
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def __enter__(self) -> "TableSink":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _records(self) -> Iterator[dict]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _DONE or chunk is _ABORT:
+                self._drained = True
+                if chunk is _ABORT:
+                    raise PipelineAborted(f"Producer for '{self.name}' failed")
+                return
+            yield from chunk
+
+    def _upload(self, client: NocoDBClient, journal: ImportJournal | None) -> None:
+        start = time.perf_counter()
+        try:
+            self.uploaded = client.bulk_insert(
+                self.table_id, self._records(), journal=journal
+            )
+            print(f"  Uploaded {self.uploaded} records to '{self.name}'")
+        except BaseException as e:
+            self.error = e
+            print(f"  FAILED upload to '{self.name}': {e}")
+        finally:
+            self.elapsed = time.perf_counter() - start
+            # Unblock the producer if the upload stopped early
+            while not self._drained:
+                item = self._queue.get()
+                self._drained = item is _DONE or item is _ABORT
+
+
+class UploadPipeline:
+    """One upload worker per table, fed through bounded queues."""
+
+    def __init__(
+        self,
+        client: NocoDBClient,
+        journals: dict[str, ImportJournal] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+    ):
+        self.client = client
+        self.journals = journals or {}
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.sinks: dict[str, TableSink] = {}
+
+    def sink(self, name: str, table_id: str) -> TableSink:
+        """Start the upload worker for a table and return its sink."""
+        if name in self.sinks:
+            raise ValueError(f"Table '{name}' already has an upload sink")
+        sink = TableSink(
+            self.client, name, table_id, self.chunk_size, self.max_chunks,
+            self.journals.get(name),
+        )
+        self.sinks[name] = sink
+        return sink
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """Records uploaded per table (including journal-resumed ones)."""
+        return {name: sink.uploaded for name, sink in self.sinks.items()}
+
+    def join(self) -> dict[str, int]:
+        """Close every sink, wait for the uploads and raise the first error."""
+        for sink in self.sinks.values():
+            sink.close()
+        for sink in self.sinks.values():
+            sink.join()
+        for sink in self.sinks.values():
+            if sink.error is not None:
+                raise sink.error
+        return self.counts
+
+    def __enter__(self) -> "UploadPipeline":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.join()
+            return
+        # Producer failed: upload what was queued, but leave tables incomplete
+        for sink in self.sinks.values():
+            sink.abort()
+        for sink in self.sinks.values():
+            sink.join()
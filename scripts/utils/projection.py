@@ -0,0 +1,214 @@
+"""Schema-driven row projection for spreadsheet tables.
+
+A table's mapping is a tuple of ``Field``s: where each record field comes
+from (header-name candidates or a fixed column index), how it is converted
+and what it defaults to. ``Projector`` resolves the header candidates
+against a table's header row once, converts every sourced column in one
+batch (``utils.converters``) and then builds each record in a single pass:
+
+    WHEEL = (
+        column("ticker", "ticker", clean=upper_or_none),
+        column("strike", "strike", kind="float"),
+        constant("strategy_type", "Wheel"),
+        derived("label", lambda t, s: f"{t} {s}", "ticker", "strike"),
+    )
+    records = project_table(doc.sheets["Options"].tables["..."], WHEEL)
+
+``iter_projected`` streams the same records chunk by chunk for tables too
+large to hold in memory.
+
+Header matching is case- and whitespace-insensitive. When several
+candidates are present the first wins; a missing column yields ``default``
+for every row (passed through ``clean``, if any).
+"""
+
+from dataclasses import dataclass
+from itertools import islice, repeat
+from typing import Any, Callable, Iterator, Sequence
+
+from .converters import convert_column, text_date_format
+from .workbook_cache import ROW_CHUNK_SIZE
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    headers: tuple[str | int, ...] = ()  # header candidates or column indices
+    kind: str | None = None  # converter kind: "float", "int", "date", "days"
+    clean: Callable[[Any], Any] | None = None  # per-value function otherwise
+    default: Any = None
+    value: Any = None  # constant fields
+    derive: Callable[..., Any] | None = None
+    sources: tuple[str, ...] = ()  # fields passed to ``derive``
+    hidden: bool = False  # only used as a ``derive`` source
+
+
+def column(
+    name: str,
+    *headers: str | int,
+    kind: str | None = None,
+    clean: Callable[[Any], Any] | None = None,
+    default: Any = None,
+    hidden: bool = False,
+) -> Field:
+    """A field read from the first present header (or fixed index)."""
+    return Field(name, headers, kind, clean, default, hidden=hidden)
+
+
+def constant(name: str, value: Any) -> Field:
+    return Field(name, value=value)
+
+
+def derived(name: str, fn: Callable[..., Any], *sources: str) -> Field:
+    """A field computed from other fields of the same record."""
+    return Field(name, derive=fn, sources=sources)
+
+
+def text_or_none(value) -> str | None:
+    """Stripped text, or None if blank."""
+    return str(value).strip() or None
+
+
+def upper_or_none(value) -> str | None:
+    """Upper-cased symbol, or None for empty cells."""
+    if value is None:
+        return None
+    return str(value).strip().upper() or None
+
+
+def build_header_map(header_row: list) -> dict[str, int]:
+    """Build a mapping of normalised header names to column indices.
+
+    Strips whitespace and lowercases header names for resilient matching.
+    """
+    mapping = {}
+    for i, h in enumerate(header_row):
+        if h is not None:
+            normalised = str(h).strip().lower()
+            mapping[normalised] = i
+    return mapping
+
+
+class Projector:
+    """A mapping compiled against one table's header row."""
+
+    def __init__(self, fields: Sequence[Field], header_row: list):
+        header_map = build_header_map(header_row)
+        width = len(header_row)
+        self.sourced: list[tuple[Field, int | None]] = []
+        self.constants: list[Field] = []
+        self.derived: list[Field] = []
+        for f in fields:
+            if f.derive is not None:
+                self.derived.append(f)
+            elif f.headers:
+                self.sourced.append((f, self._resolve(f.headers, header_map, width)))
+            else:
+                self.constants.append(f)
+        self.hidden = [f.name for f in fields if f.hidden]
+        # Text date format per field, fixed by the first chunk that has one
+        # so ambiguous dd/mm vs mm/dd strings read the same in every chunk
+        self.date_formats: dict[str, str] = {}
+
+    @staticmethod
+    def _resolve(headers: tuple, header_map: dict, width: int) -> int | None:
+        for h in headers:
+            idx = h if isinstance(h, int) else header_map.get(h.lower())
+            if idx is not None and idx < width:
+                return idx
+        return None
+
+    @property
+    def missing(self) -> list[str]:
+        """Fields whose column is absent from this table."""
+        return [f.name for f, idx in self.sourced if idx is None]
+
+    def _column(self, f: Field, idx: int | None, rows: list, raw_column) -> list:
+        if idx is None:
+            value = f.clean(f.default) if f.clean else f.default
+            return [value] * len(rows)
+        if f.kind:
+            source = raw_column(idx) if raw_column else [
+                row[idx] if idx < len(row) else None for row in rows
+            ]
+            if f.kind == "date" and f.name not in self.date_formats:
+                detected = text_date_format(source)
+                if detected:
+                    self.date_formats[f.name] = detected
+            return convert_column(
+                f.kind, source, f.default, self.date_formats.get(f.name)
+            )
+        values = [row[idx] if idx < len(row) else f.default for row in rows]
+        return [f.clean(v) for v in values] if f.clean else values
+
+    def project(
+        self, rows: list, raw_column: Callable[[int], Any] | None = None
+    ) -> list[dict]:
+        """Records for ``rows`` (data rows, without the header).
+
+        ``raw_column(index)`` may supply cached column arrays for the typed
+        fields (see ``CachedTable.raw_column``).
+        """
+        names = [f.name for f, _ in self.sourced] + [f.name for f in self.constants]
+        columns = [self._column(f, idx, rows, raw_column) for f, idx in self.sourced]
+        columns += [repeat(f.value, len(rows)) for f in self.constants]
+        if columns:
+            records = [dict(zip(names, values)) for values in zip(*columns)]
+        else:
+            records = [{} for _ in rows]
+        for f in self.derived:
+            fn, sources = f.derive, f.sources
+            for record in records:
+                record[f.name] = fn(*[record[s] for s in sources])
+        for name in self.hidden:
+            for record in records:
+                del record[name]
+        return records
+
+
+def iter_row_chunks(
+    table, chunk_size: int = ROW_CHUNK_SIZE
+) -> Iterator[tuple[int, list]]:
+    """Yield (first row index, rows) in fixed-size chunks, header included.
+
+    Cached tables decode one chunk at a time; other tables are read through
+    ``iter_rows``, so no full row list is built either way.
+    """
+    if hasattr(table, "iter_chunks"):
+        offset = 0
+        for chunk in table.iter_chunks(chunk_size):
+            yield offset, chunk
+            offset += len(chunk)
+        return
+    rows = iter(table.iter_rows(values_only=True))
+    offset = 0
+    while chunk := [list(row) for row in islice(rows, chunk_size)]:
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def iter_projected(
+    table, fields: Sequence[Field], chunk_size: int = ROW_CHUNK_SIZE
+) -> Iterator[dict]:
+    """Stream the records of a workbook table (header in row 0).
+
+    The mapping is compiled once against the header, then each chunk of
+    rows is converted column-wise and its records yielded before the next
+    chunk is read, so memory stays proportional to ``chunk_size``.
+    """
+    projector = None
+    raw = getattr(table, "raw_column", None)
+    for offset, rows in iter_row_chunks(table, chunk_size):
+        if projector is None:
+            projector = Projector(fields, rows[0])
+            offset, rows = offset + 1, rows[1:]
+        raw_column = None
+        if raw is not None:
+            start, stop = offset, offset + len(rows)
+            raw_column = lambda index: raw(index, start, stop)  # noqa: E731
+        yield from projector.project(rows, raw_column)
+
+
+def project_table(table, fields: Sequence[Field]) -> list[dict]:
+    """Project every data row of a workbook table (header in row 0)."""
+    return list(iter_projected(table, fields))
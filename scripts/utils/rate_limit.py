@@ -0,0 +1,288 @@
+"""Per-host request rate limiting shared by every HTTP caller.
+
+Each host gets one ``RateLimiter`` (``limiter_for``): a token bucket that
+callers ``acquire()`` before sending and ``observe()`` the response with.
+It paces requests to what the server actually allows instead of a fixed
+guess:
+
+  - ``Retry-After`` (seconds or HTTP date) pauses every caller of the
+    host until then;
+  - ``X-RateLimit-Remaining: 0`` pauses until ``X-RateLimit-Reset``
+    (seconds, or an epoch timestamp); a non-zero remaining caps the
+    bucket so a fresh bucket never bursts past the server's budget;
+  - a 429 halves the rate (starting from the observed request rate when
+    no limit was configured) and successes grow it back 2% at a time, up
+    to the configured ceiling.
+
+``backoff()`` sleeps before a retry: ``Retry-After`` when the response
+had one, otherwise full-jitter exponential backoff.
+
+Limits are configured with FOLIO_RATE_LIMITS, e.g.
+``api.tiingo.com=0.5:5,nocodb.example.com=20`` (requests per second, and
+optionally the burst size); hosts not listed start unlimited. With
+FOLIO_RATE_LIMIT_SHARED=1 the bucket lives in ``ratelimits/<host>.json``
+in the state directory and is updated under an exclusive file lock, so
+concurrent scripts share one budget per host.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Mapping
+from urllib.parse import urlsplit
+
+from .state import STATE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process coordination
+    fcntl = None
+
+LIMITS_DIR = "ratelimits"
+MIN_RATE = 0.1  # requests per second a 429 can push the rate down to
+GROWTH = 1.02  # rate increase per successful response
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 30.0
+EPOCH_THRESHOLD = 1e9  # X-RateLimit-Reset above this is a timestamp
+TOKEN_EPSILON = 1e-9  # fraction of a token treated as a whole one
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` value (delta or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _header(headers: Mapping | None, name: str) -> str | None:
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+def _float(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(
+    attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP
+) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class RateLimiter:
+    """Token bucket for one host, optionally shared across processes.
+
+    ``clock`` and ``sleep`` default to ``time.time`` / ``time.sleep``;
+    tests pass a fake pair to drive the bucket without waiting.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: float | None = None,
+        burst: float | None = None,
+        shared: bool = False,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.host = host
+        self._clock = clock
+        self._sleep = sleep
+        self.ceiling = rate  # configured limit; None = none known
+        self.burst = burst or max(1.0, rate or 1.0)
+        self.shared = shared and fcntl is not None
+        self.path = STATE_DIR / LIMITS_DIR / f"{host.replace(':', '_')}.json"
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque(maxlen=50)  # acquire times
+        self._state = {
+            "rate": rate,
+            "tokens": self.burst,
+            "updated": clock(),
+            "paused_until": 0.0,
+        }
+        if self.shared:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    # -----------------------------------------------------------------------
+    # State (process-local, or read/written under the lock file)
+    # -----------------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict]:
+        with self._lock:
+            if not self.shared:
+                yield self._state
+                return
+            with open(self.path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = {**self._state, **json.loads(f.read() or "{}")}
+                    except json.JSONDecodeError:
+                        state = dict(self._state)
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                    self._state = state
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def rate(self) -> float | None:
+        """Current requests per second (None = unlimited)."""
+        return self._state["rate"]
+
+    # -----------------------------------------------------------------------
+    # Pacing
+    # -----------------------------------------------------------------------
+
+    def _take(self) -> float:
+        """Take a token. Returns 0, or the seconds to wait before trying again."""
+        with self._locked() as state:
+            now = self._clock()
+            if now < state["paused_until"]:
+                return state["paused_until"] - now
+            rate = state["rate"]
+            if rate is None:
+                self._recent.append(now)
+                return 0.0
+            elapsed = max(0.0, now - state["updated"])
+            state["tokens"] = min(self.burst, state["tokens"] + elapsed * rate)
+            state["updated"] = now
+            # Refill arithmetic can land a hair under a whole token; waiting
+            # for that remainder could be shorter than the clock resolution
+            if state["tokens"] >= 1 - TOKEN_EPSILON:
+                state["tokens"] = max(0.0, state["tokens"] - 1)
+                self._recent.append(now)
+                return 0.0
+            return (1 - state["tokens"]) / rate
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds waited."""
+        waited = 0.0
+        while (wait := self._take()) > 0:
+            self._sleep(wait)
+            waited += wait
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller of this host for ``seconds``."""
+        with self._locked() as state:
+            state["paused_until"] = max(state["paused_until"], self._clock() + seconds)
+
+    def _observed_rate(self) -> float | None:
+        if len(self._recent) < 2:
+            return None
+        span = self._recent[-1] - self._recent[0]
+        return (len(self._recent) - 1) / span if span > 0 else None
+
+    def observe(self, status: int | None, headers: Mapping | None = None) -> None:
+        """Adjust pacing from a response's status and rate-limit headers."""
+        retry_after = parse_retry_after(_header(headers, "Retry-After"))
+        remaining = _float(_header(headers, "X-RateLimit-Remaining"))
+        reset = _float(_header(headers, "X-RateLimit-Reset"))
+        observed = self._observed_rate() if status == 429 else None
+        with self._locked() as state:
+            now = self._clock()
+            if retry_after is not None:
+                state["paused_until"] = max(state["paused_until"], now + retry_after)
+            if remaining is not None:
+                if remaining < 1 and reset is not None:
+                    until = reset if reset > EPOCH_THRESHOLD else now + reset
+                    state["paused_until"] = max(state["paused_until"], until)
+                state["tokens"] = min(state["tokens"], remaining)
+            rate = state["rate"]
+            if status == 429:
+                current = rate if rate is not None else observed
+                state["rate"] = max(MIN_RATE, (current or 2.0) / 2)
+                state["tokens"] = 0.0
+                state["updated"] = now
+            elif status is not None and status < 400 and rate is not None:
+                grown = rate * GROWTH
+                state["rate"] = min(grown, self.ceiling) if self.ceiling else grown
+
+    def backoff(
+        self,
+        attempt: int,
+        headers: Mapping | None = None,
+        base: float = BACKOFF_BASE,
+        cap: float = BACKOFF_CAP,
+    ) -> float:
+        """Sleep before retry ``attempt``. Returns the seconds slept.
+
+        Honours ``Retry-After`` when present, else jittered exponential
+        backoff; either way also waits out any pause set on the host.
+        """
+        delay = parse_retry_after(_header(headers, "Retry-After"))
+        if delay is None:
+            delay = backoff_delay(attempt, base, cap)
+        self._sleep(delay)
+        return delay + self.acquire_pause()
+
+    def acquire_pause(self) -> float:
+        """Wait out a host-wide pause (without taking a token)."""
+        with self._locked() as state:
+            wait = state["paused_until"] - self._clock()
+        if wait > 0:
+            self._sleep(wait)
+            return wait
+        return 0.0
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+_limiters: dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def configured_limits() -> dict[str, tuple[float, float | None]]:
+    """host -> (rate, burst) from FOLIO_RATE_LIMITS."""
+    limits = {}
+    for entry in os.environ.get("FOLIO_RATE_LIMITS", "").split(","):
+        host, _, spec = entry.strip().partition("=")
+        if not host or not spec:
+            continue
+        rate, _, burst = spec.partition(":")
+        limits[host.lower()] = (float(rate), float(burst) if burst else None)
+    return limits
+
+
+def host_of(url: str) -> str:
+    """``host[:port]`` of a URL (or the value itself if it has no scheme)."""
+    return (urlsplit(url).netloc or url).lower()
+
+
+def limiter_for(url: str) -> RateLimiter:
+    """The process-wide limiter for ``url``'s host."""
+    host = host_of(url)
+    with _registry_lock:
+        if host not in _limiters:
+            rate, burst = configured_limits().get(host, (None, None))
+            shared = os.environ.get("FOLIO_RATE_LIMIT_SHARED", "") in ("1", "true", "yes")
+            _limiters[host] = RateLimiter(host, rate, burst, shared)
+        return _limiters[host]
@@ -0,0 +1,185 @@
+"""NocoDB table schemas (DATA-02) shared by the migration and sync scripts.
+
+Each entry is the table definition passed to the NocoDB meta API when the
+table is created; ``column_name`` values are the record field names.
+"""
+
+ID_COLUMN = {"column_name": "Id", "title": "Id", "uidt": "ID", "dt": "int4", "pk": True, "ai": True, "rqd": True}
+
+TABLE_SCHEMAS = {
+    "symbols": {
+        "table_name": "symbols",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "symbol", "uidt": "SingleLineText"},
+            {"column_name": "name", "uidt": "SingleLineText"},
+            {
+                "column_name": "sector",
+                "uidt": "SingleSelect",
+                "dtxp": "'Tech','Financial','Retail','Communication','Healthcare','Energy','Industrial','Real Estate','ETF','Crypto','Consumer','Technology'",
+            },
+            {
+                "column_name": "strategy",
+                "uidt": "SingleSelect",
+                "dtxp": "'Growth','Value','Risky'",
+            },
+            {"column_name": "current_price", "uidt": "Decimal"},
+            {"column_name": "previous_close", "uidt": "Decimal"},
+            {"column_name": "change_pct", "uidt": "Decimal"},
+            {"column_name": "day_high", "uidt": "Decimal"},
+            {"column_name": "day_low", "uidt": "Decimal"},
+            {"column_name": "year_high", "uidt": "Decimal"},
+            {"column_name": "year_low", "uidt": "Decimal"},
+            {"column_name": "market_cap", "uidt": "Number"},
+            {"column_name": "pe_ratio", "uidt": "Decimal"},
+            {"column_name": "eps", "uidt": "Decimal"},
+            {"column_name": "dividend_yield", "uidt": "Decimal"},
+            {"column_name": "avg_volume", "uidt": "Number"},
+            {"column_name": "last_price_update", "uidt": "DateTime"},
+        ],
+    },
+    "transactions": {
+        "table_name": "transactions",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "symbol", "uidt": "SingleLineText"},
+            {"column_name": "name", "uidt": "SingleLineText"},
+            {
+                "column_name": "type",
+                "uidt": "SingleSelect",
+                "dtxp": "'Buy','Sell'",
+            },
+            {"column_name": "price", "uidt": "Decimal"},
+            {"column_name": "shares", "uidt": "Decimal"},
+            {"column_name": "amount", "uidt": "Decimal"},
+            {"column_name": "eps", "uidt": "Decimal"},
+            {"column_name": "date", "uidt": "Date"},
+            {
+                "column_name": "platform",
+                "uidt": "SingleSelect",
+                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
+            },
+        ],
+    },
+    "options": {
+        "table_name": "options",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "ticker", "uidt": "SingleLineText"},
+            {"column_name": "opened", "uidt": "Date"},
+            {
+                "column_name": "strategy_type",
+                "uidt": "SingleSelect",
+                "dtxp": "'Wheel','LEAPS','Spread','Collar','VPCS','PMCC','BET','Hedge'",
+            },
+            {
+                "column_name": "call_put",
+                "uidt": "SingleSelect",
+                "dtxp": "'Call','Put'",
+            },
+            {
+                "column_name": "buy_sell",
+                "uidt": "SingleSelect",
+                "dtxp": "'Buy','Sell'",
+            },
+            {"column_name": "expiration", "uidt": "Date"},
+            {"column_name": "strike", "uidt": "Decimal"},
+            {"column_name": "delta", "uidt": "Decimal"},
+            {"column_name": "iv_pct", "uidt": "Decimal"},
+            {
+                "column_name": "moneyness",
+                "uidt": "SingleSelect",
+                "dtxp": "'OTM','ATM','ITM'",
+            },
+            {"column_name": "qty", "uidt": "Number"},
+            {"column_name": "premium", "uidt": "Decimal"},
+            {"column_name": "collateral", "uidt": "Decimal"},
+            {
+                "column_name": "status",
+                "uidt": "SingleSelect",
+                "dtxp": "'Open','Closed','Expired','Rolled','Assigned'",
+            },
+            {"column_name": "close_date", "uidt": "Date"},
+            {"column_name": "close_premium", "uidt": "Decimal"},
+            {"column_name": "profit", "uidt": "Decimal"},
+            {"column_name": "days_held", "uidt": "Number"},
+            {"column_name": "return_pct", "uidt": "Decimal"},
+            {"column_name": "annualised_return_pct", "uidt": "Decimal"},
+            {"column_name": "outer_strike", "uidt": "Decimal"},
+            {"column_name": "commission", "uidt": "Decimal"},
+            {
+                "column_name": "platform",
+                "uidt": "SingleSelect",
+                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
+            },
+            {"column_name": "notes", "uidt": "LongText"},
+        ],
+    },
+    "deposits": {
+        "table_name": "deposits",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "month", "uidt": "Date"},
+            {"column_name": "amount", "uidt": "Decimal"},
+            {"column_name": "amount_usd", "uidt": "Decimal"},
+            {
+                "column_name": "platform",
+                "uidt": "SingleSelect",
+                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
+            },
+        ],
+    },
+    "dividends": {
+        "table_name": "dividends",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "symbol", "uidt": "SingleLineText"},
+            {"column_name": "amount", "uidt": "Decimal"},
+            {"column_name": "date", "uidt": "Date"},
+            {
+                "column_name": "platform",
+                "uidt": "SingleSelect",
+                "dtxp": "'IBKR','Trading 212','Freetrade','Stake','eToro','Robinhood'",
+            },
+        ],
+    },
+    "monthly_snapshots": {
+        "table_name": "monthly_snapshots",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "month", "uidt": "Date"},
+            {"column_name": "total_invested", "uidt": "Decimal"},
+            {"column_name": "portfolio_value", "uidt": "Decimal"},
+            {"column_name": "gain_loss", "uidt": "Decimal"},
+            {"column_name": "gain_loss_pct", "uidt": "Decimal"},
+            {"column_name": "dividend_income", "uidt": "Decimal"},
+            {"column_name": "options_premium", "uidt": "Decimal"},
+            {"column_name": "options_capital_gains", "uidt": "Decimal"},
+            {"column_name": "total_deposits", "uidt": "Decimal"},
+        ],
+    },
+    "price_history": {
+        "table_name": "price_history",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "symbol", "uidt": "SingleLineText"},
+            {"column_name": "date", "uidt": "Date"},
+            {"column_name": "close_price", "uidt": "Decimal"},
+            {"column_name": "volume", "uidt": "Number"},
+        ],
+    },
+    "settings": {
+        "table_name": "settings",
+        "columns": [
+            ID_COLUMN,
+            {"column_name": "key", "uidt": "SingleLineText"},
+            {"column_name": "value", "uidt": "SingleLineText"},
+            {"column_name": "description", "uidt": "SingleLineText"},
+        ],
+    },
+}
+
+
+def column_names(name: str) -> list[str]:
+    """Field names of a table, including ``Id``."""
+    return [c["column_name"] for c in TABLE_SCHEMAS[name]["columns"]]
@@ -0,0 +1,176 @@
+"""Shadow-table loads with an atomic swap, for zero-downtime reimports.
+
+Instead of emptying a live table and refilling it (readers see it empty
+or half-loaded for the whole upload), a reload:
+
+  1. creates ``<name>__shadow_<ts>`` with the live table's columns (so
+     columns added after creation, like the currency companions, and
+     select options added in the UI survive the swap) plus any
+     ``TABLE_SCHEMAS`` column it lacks, and bulk-loads it at full
+     concurrency;
+  2. swaps it in by writing its id to the ``table_id:<name>`` row of the
+     ``settings`` table -- a single record write, so readers flip from the
+     complete old table to the complete new one;
+  3. renames the old table to ``<name>__retired_<ts>`` and the shadow to
+     ``<name>`` (renames keep table ids, so in-flight readers are
+     unaffected and ``ensure_tables`` keeps finding tables by title);
+  4. drops the retired tables after a grace period that covers the
+     dashboard's table-id cache (``TABLE_ID_TTL_MS`` in src/lib/nocodb.ts).
+
+The dashboard and the scripts resolve table ids through these pointer rows
+and fall back to the ``NOCODB_TABLE_*`` environment variables when a table
+has never been swapped. The settings table itself is never swapped: it
+holds the pointers.
+"""
+
+import os
+import time
+
+from .nocodb_client import NocoDBClient
+from .schemas import ID_COLUMN, TABLE_SCHEMAS
+
+POINTER_PREFIX = "table_id:"
+SHADOW_MARKER = "__shadow_"
+RETIRED_MARKER = "__retired_"
+DEFAULT_GRACE = 90.0  # seconds; must exceed the dashboard's 60s id cache
+
+# Columns NocoDB maintains itself: every table gets its own
+SYSTEM_UIDTS = ("ID", "CreatedTime", "LastModifiedTime", "CreatedBy", "LastModifiedBy", "Order")
+# Columns computed from other tables, which a plain column definition cannot recreate
+VIRTUAL_UIDTS = ("Links", "LinkToAnotherRecord", "Lookup", "Rollup", "Formula", "Count")
+COLUMN_KEYS = ("column_name", "title", "uidt", "dt", "dtxp", "dtxs", "rqd", "meta")
+
+
+def swap_grace() -> float:
+    """Seconds to keep retired tables readable (``NOCODB_SWAP_GRACE``)."""
+    return float(os.environ.get("NOCODB_SWAP_GRACE", DEFAULT_GRACE))
+
+
+def pointer_key(name: str) -> str:
+    return f"{POINTER_PREFIX}{name}"
+
+
+def read_pointers(client: NocoDBClient, settings_table_id: str) -> dict[str, dict]:
+    """Pointer rows in the settings table: table name -> settings record."""
+    return {
+        r["key"][len(POINTER_PREFIX):]: r
+        for r in client.iter_records(settings_table_id, fields="Id,key,value")
+        if (r.get("key") or "").startswith(POINTER_PREFIX)
+    }
+
+
+def resolve_table_ids(
+    client: NocoDBClient, settings_table_id: str, defaults: dict[str, str]
+) -> dict[str, str]:
+    """Apply swapped-in table ids from the settings table over ``defaults``."""
+    pointers = read_pointers(client, settings_table_id)
+    return {
+        name: pointers[name]["value"] if name in pointers else table_id
+        for name, table_id in defaults.items()
+    }
+
+
+def column_definition(column: dict) -> dict:
+    """Create-table definition of a column read from the meta API."""
+    definition = {k: column[k] for k in COLUMN_KEYS if column.get(k) not in (None, "")}
+    definition.setdefault("column_name", column.get("title"))
+    options = (column.get("colOptions") or {}).get("options")
+    if options:
+        definition["dtxp"] = ",".join(f"'{o['title']}'" for o in options)
+    return definition
+
+
+def shadow_columns(client: NocoDBClient, name: str, live_table_id: str) -> list[dict]:
+    """Columns for a shadow of ``name``: the live table's, then missing schema ones."""
+    columns = [ID_COLUMN]
+    seen = {"Id"}
+    for column in client.table_columns(live_table_id, refresh=True):
+        definition = column_definition(column)
+        column_name = definition["column_name"]
+        if (
+            column.get("pk")
+            or column.get("system")
+            or column.get("uidt") in SYSTEM_UIDTS
+            or column_name in seen
+        ):
+            continue
+        if column.get("uidt") in VIRTUAL_UIDTS:
+            print(f"  WARNING: virtual column '{column_name}' of '{name}' is not copied")
+            continue
+        columns.append(definition)
+        seen.add(column_name)
+    for column in TABLE_SCHEMAS[name]["columns"]:
+        if column["column_name"] not in seen:
+            columns.append(column)
+            seen.add(column["column_name"])
+    return columns
+
+
+def create_shadow(client: NocoDBClient, name: str, live_table_id: str) -> str:
+    """Create an empty shadow copy of table ``name``. Returns its id.
+
+    Shadows left behind by an interrupted load (never swapped in) and
+    retired tables whose drop was interrupted are removed first.
+    """
+    if name == "settings":
+        raise ValueError("The settings table holds the swap pointers and cannot be swapped")
+    leftovers = (f"{name}{SHADOW_MARKER}", f"{name}{RETIRED_MARKER}")
+    for table in client.list_tables(refresh=True):
+        if table["title"].startswith(leftovers) and table["id"] != live_table_id:
+            client.drop_table(table["id"])
+            print(f"  Dropped leftover table '{table['title']}'")
+    schema = {
+        "table_name": f"{name}{SHADOW_MARKER}{int(time.time())}",
+        "columns": shadow_columns(client, name, live_table_id),
+    }
+    table_id = client.create_table(schema)["id"]
+    print(f"  Created shadow '{schema['table_name']}' (id: {table_id})")
+    return table_id
+
+
+def swap_in(
+    client: NocoDBClient,
+    settings_table_id: str,
+    name: str,
+    old_table_id: str,
+    new_table_id: str,
+) -> None:
+    """Point readers of ``name`` at ``new_table_id`` and retire the old table.
+
+    The pointer write is the commit point; the renames that follow only
+    tidy titles. The retired table is left in place for ``drop_retired``.
+    """
+    pointer = read_pointers(client, settings_table_id).get(name)
+    if pointer:
+        client.bulk_update(
+            settings_table_id, [{"Id": pointer["Id"], "value": new_table_id}],
+            batch_size=1,
+        )
+    else:
+        client.bulk_insert(
+            settings_table_id,
+            [{
+                "key": pointer_key(name),
+                "value": new_table_id,
+                "description": f"Active table id for '{name}' (shadow swap)",
+            }],
+            batch_size=1,
+        )
+    stamp = int(time.time())
+    client.rename_table(old_table_id, f"{name}{RETIRED_MARKER}{stamp}")
+    client.rename_table(new_table_id, name)
+    print(f"  Swapped '{name}': {old_table_id} -> {new_table_id}")
+
+
+def drop_retired(
+    client: NocoDBClient, table_ids: list[str], grace: float = DEFAULT_GRACE
+) -> None:
+    """Drop swapped-out tables once readers caching their ids have moved on."""
+    if not table_ids:
+        return
+    if grace > 0:
+        print(f"  Waiting {grace:.0f}s before dropping {len(table_ids)} retired table(s)...")
+        time.sleep(grace)
+    for table_id in table_ids:
+        client.drop_table(table_id)
+        print(f"  Dropped retired table {table_id}")
@@ -0,0 +1,43 @@
+"""Local state directory shared by the Python scripts.
+
+Learned tuning values, caches and checkpoints live under a single
+directory (``scripts/.state`` by default, override with FOLIO_STATE_DIR)
+so they survive between runs and can be wiped with one ``rm -rf``.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+STATE_DIR = Path(
+    os.environ.get(
+        "FOLIO_STATE_DIR", Path(__file__).resolve().parent.parent / ".state"
+    )
+)
+
+
+def state_path(name: str) -> Path:
+    """Return the path of a state file, creating the directory if needed."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    return STATE_DIR / name
+
+
+def load_json(name: str, default: Any = None) -> Any:
+    """Load a JSON state file, returning ``default`` if missing or corrupt."""
+    path = STATE_DIR / name
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def save_json(name: str, data: Any) -> None:
+    """Atomically write a JSON state file (write to temp, then rename)."""
+    path = state_path(name)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
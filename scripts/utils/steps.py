@@ -0,0 +1,182 @@
+"""Declarative step DAG executor for migrations.
+
+A migration is a list of ``Step``s. Each step names the products it needs
+(``inputs``), the products it publishes (``outputs``) and, optionally, the
+table its records go to (``table``). The runner orders steps by those
+dependencies alone and runs independent steps concurrently on a thread
+pool; records a step yields are streamed into that table's upload sink
+(see ``utils.pipeline``).
+
+``only`` / ``skip`` select which steps upload. A selected step whose
+inputs come from an unselected step still gets them: the producer runs
+"for outputs only", its records are consumed but not uploaded. Every run
+reports per-step extraction time, record counts and upload time.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from .pipeline import UploadPipeline
+
+
+class StepContext:
+    """What a running step sees: its inputs and a place for its outputs."""
+
+    def __init__(self, step: "Step", products: dict[str, Any], lock: threading.Lock):
+        self.step = step
+        self._products = products
+        self._lock = lock
+
+    def get(self, name: str) -> Any:
+        if name not in self.step.inputs:
+            raise KeyError(f"Step '{self.step.name}' did not declare input '{name}'")
+        with self._lock:
+            return self._products[name]
+
+    def put(self, name: str, value: Any) -> None:
+        if name not in self.step.outputs:
+            raise KeyError(f"Step '{self.step.name}' did not declare output '{name}'")
+        with self._lock:
+            self._products[name] = value
+
+
+@dataclass
+class Step:
+    name: str
+    run: Callable[[Any, StepContext], Iterable[dict] | None]
+    table: str | None = None
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+@dataclass
+class StepTiming:
+    name: str
+    upload: bool
+    records: int = 0
+    seconds: float = 0.0
+    upload_seconds: float | None = None
+    deps: list[str] = field(default_factory=list)
+
+
+def select_steps(
+    steps: list[Step],
+    only: set[str] | None = None,
+    skip: set[str] | None = None,
+) -> tuple[list[Step], set[str]]:
+    """Resolve ``only``/``skip``. Returns (steps to run, names that upload).
+
+    Unknown step names raise ValueError. Steps that do not upload are the
+    producers of inputs a selected step needs.
+    """
+    by_name = {s.name: s for s in steps}
+    unknown = ((only or set()) | (skip or set())) - by_name.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown step(s): {', '.join(sorted(unknown))}. "
+            f"Steps: {', '.join(by_name)}"
+        )
+    producers = {out: s.name for s in steps for out in s.outputs}
+    selected = {s.name for s in steps if (not only or s.name in only)}
+    selected -= skip or set()
+
+    needed = set(selected)
+    stack = list(selected)
+    while stack:
+        for name in by_name[stack.pop()].inputs:
+            if name not in producers:
+                raise ValueError(f"No step produces '{name}'")
+            producer = producers[name]
+            if producer not in needed:
+                needed.add(producer)
+                stack.append(producer)
+    return [s for s in steps if s.name in needed], selected
+
+
+class StepRunner:
+    """Runs a selection of steps as a dependency graph."""
+
+    def __init__(
+        self,
+        steps: list[Step],
+        state: Any,
+        pipeline: UploadPipeline,
+        targets: dict[str, str],
+        max_workers: int = 4,
+    ):
+        self.steps = steps
+        self.state = state
+        self.pipeline = pipeline
+        self.targets = targets
+        self.max_workers = max_workers
+        self.products: dict[str, Any] = {}
+        self.timings: dict[str, StepTiming] = {}
+        self._lock = threading.Lock()
+
+    def _run_step(self, step: Step, upload: bool) -> StepTiming:
+        timing = StepTiming(step.name, upload)
+        start = time.perf_counter()
+        records = step.run(self.state, StepContext(step, self.products, self._lock))
+        if records is not None:
+            if upload and step.table:
+                with self.pipeline.sink(step.table, self.targets[step.table]) as sink:
+                    sink.extend(records)
+                timing.records = sink.queued
+            else:
+                timing.records = sum(1 for _ in records)
+        timing.seconds = time.perf_counter() - start
+        missing = [o for o in step.outputs if o not in self.products]
+        if missing:
+            raise RuntimeError(f"Step '{step.name}' did not produce {missing}")
+        suffix = "" if upload else " (for outputs only, not uploaded)"
+        print(f"  [{step.name}] {timing.records} records in {timing.seconds:.2f}s{suffix}")
+        return timing
+
+    def run(self, uploads: set[str]) -> dict[str, StepTiming]:
+        """Run every step; those in ``uploads`` stream records to their table."""
+        pending = {s.name: s for s in self.steps}
+        done: set[str] = set()
+        producers = {out: s.name for s in self.steps for out in s.outputs}
+        deps = {
+            s.name: {producers[i] for i in s.inputs} for s in self.steps
+        }
+        tables = [s.table for s in self.steps if s.table and s.name in uploads]
+        if len(tables) != len(set(tables)):
+            raise ValueError("Each table can be the target of only one step")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if deps[name] <= done:
+                        del pending[name]
+                        running[pool.submit(self._run_step, step, name in uploads)] = name
+                if not running:
+                    raise RuntimeError(f"Dependency cycle among: {', '.join(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    timing = fut.result()
+                    timing.deps = sorted(deps[name])
+                    self.timings[name] = timing
+                    done.add(name)
+        return self.timings
+
+    def print_timings(self) -> None:
+        """Per-step extraction and upload times (call after the uploads end)."""
+        print("\n=== Step timings ===")
+        print(f"  {'step':<20} {'records':>8} {'extract s':>10} {'upload s':>9}  depends on")
+        sinks = self.pipeline.sinks
+        for step in self.steps:
+            timing = self.timings.get(step.name)
+            if timing is None:
+                continue
+            sink = sinks.get(step.table) if timing.upload else None
+            upload = f"{sink.elapsed:>9.2f}" if sink else f"{'-':>9}"
+            print(
+                f"  {step.name:<20} {timing.records:>8} {timing.seconds:>10.2f} "
+                f"{upload}  {', '.join(timing.deps) or '-'}"
+            )
@@ -0,0 +1,294 @@
+"""On-disk columnar cache of parsed ``.numbers`` workbooks.
+
+``numbers_parser.Document`` decompresses and decodes the whole workbook on
+every open. ``load_workbook`` parses it once per distinct file content
+(keyed by ``file_fingerprint``) and stores every table under
+``scripts/.state/workbooks/<hash>/`` as column-major numpy arrays:
+
+  - ``tags.npy``  uint8 cell type (see ``TAG_*``), shape (cols, rows)
+  - ``nums.npy``  float64 value for numbers, bools, dates (epoch seconds)
+                  and durations (seconds)
+  - ``text.npy``  int32 index into ``strings.json`` for text cells, else -1
+
+Later runs memory-map those arrays and never import numbers_parser. The
+returned object mirrors the small part of the ``Document`` API the scripts
+use (``doc.sheets[name].tables[name].rows(values_only=True)``), so callers
+only swap the constructor. ``CachedTable.iter_chunks`` additionally decodes
+a table a fixed number of rows at a time for streaming readers.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from .checkpoint import file_fingerprint
+from .state import state_path
+
+CACHE_DIR = "workbooks"
+CACHE_VERSION = 1
+KEEP_ENTRIES = 3  # cached workbook versions kept on disk
+ROW_CHUNK_SIZE = 2000  # rows decoded at a time by iter_chunks
+
+TAG_EMPTY = 0
+TAG_FLOAT = 1
+TAG_INT = 2
+TAG_BOOL = 3
+TAG_TEXT = 4
+TAG_DATETIME = 5  # naive datetime
+TAG_DATETIME_UTC = 6  # timezone-aware datetime, stored as UTC
+TAG_DURATION = 7
+
+EPOCH = datetime(1970, 1, 1)
+
+
+# ---------------------------------------------------------------------------
+# Cell encoding
+# ---------------------------------------------------------------------------
+
+
+def _encode(value: Any, strings: dict[str, int]) -> tuple[int, float, int]:
+    """Return (tag, numeric value, string index) for one cell value."""
+    if value is None:
+        return TAG_EMPTY, 0.0, -1
+    if isinstance(value, bool):
+        return TAG_BOOL, float(value), -1
+    if isinstance(value, int):
+        return TAG_INT, float(value), -1
+    if isinstance(value, float):
+        return TAG_FLOAT, value, -1
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            utc = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return TAG_DATETIME_UTC, (utc - EPOCH).total_seconds(), -1
+        return TAG_DATETIME, (value - EPOCH).total_seconds(), -1
+    if isinstance(value, timedelta):
+        return TAG_DURATION, value.total_seconds(), -1
+    # Text, and anything unexpected, round-trips as a string
+    text = str(value)
+    return TAG_TEXT, 0.0, strings.setdefault(text, len(strings))
+
+
+def _decode(tag: int, num: float, text: int, strings: list[str]) -> Any:
+    if tag == TAG_EMPTY:
+        return None
+    if tag == TAG_FLOAT:
+        return num
+    if tag == TAG_INT:
+        return int(num)
+    if tag == TAG_BOOL:
+        return bool(num)
+    if tag == TAG_TEXT:
+        return strings[text]
+    if tag == TAG_DATETIME:
+        return EPOCH + timedelta(seconds=num)
+    if tag == TAG_DATETIME_UTC:
+        return (EPOCH + timedelta(seconds=num)).replace(tzinfo=timezone.utc)
+    return timedelta(seconds=num)
+
+
+# ---------------------------------------------------------------------------
+# Cached workbook (read side)
+# ---------------------------------------------------------------------------
+
+
+class CachedTable:
+    """One table, backed by memory-mapped column arrays."""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.tags = np.load(path / "tags.npy", mmap_mode="r")
+        self.nums = np.load(path / "nums.npy", mmap_mode="r")
+        self.text = np.load(path / "text.npy", mmap_mode="r")
+        with open(path / "strings.json") as f:
+            self.strings: list[str] = json.load(f)
+
+    @property
+    def num_rows(self) -> int:
+        return self.tags.shape[1]
+
+    @property
+    def num_cols(self) -> int:
+        return self.tags.shape[0]
+
+    def column(self, index: int, start: int = 0, stop: int | None = None) -> list:
+        """Decoded values of one column (rows ``start`` to ``stop``)."""
+        tags = self.tags[index, start:stop]
+        nums = self.nums[index, start:stop]
+        if (tags == TAG_FLOAT).all():
+            return nums.tolist()
+        strings = self.strings
+        return [
+            _decode(t, n, s, strings)
+            for t, n, s in zip(
+                tags.tolist(),
+                nums.tolist(),
+                self.text[index, start:stop].tolist(),
+            )
+        ]
+
+    def raw_column(self, index: int, start: int = 0, stop: int | None = None):
+        """Undecoded arrays of one column (for utils.converters)."""
+        from .converters import RawColumn
+
+        if index >= self.num_cols:
+            n = len(range(*slice(start, stop).indices(self.num_rows)))
+            return RawColumn(
+                np.zeros(n, dtype=np.uint8),
+                np.zeros(n),
+                np.full(n, -1, dtype=np.int32),
+                self.strings,
+            )
+        return RawColumn(
+            np.asarray(self.tags[index, start:stop]),
+            np.asarray(self.nums[index, start:stop]),
+            np.asarray(self.text[index, start:stop]),
+            self.strings,
+        )
+
+    def iter_chunks(
+        self, chunk_size: int = ROW_CHUNK_SIZE, start: int = 0
+    ) -> Iterator[list[list]]:
+        """Decode rows ``chunk_size`` at a time, from row ``start``.
+
+        Only the current chunk is ever decoded; the arrays themselves stay
+        memory-mapped, so memory does not grow with the table.
+        """
+        for offset in range(start, self.num_rows, chunk_size):
+            stop = min(offset + chunk_size, self.num_rows)
+            columns = [self.column(c, offset, stop) for c in range(self.num_cols)]
+            if columns:
+                yield [list(row) for row in zip(*columns)]
+            else:
+                yield [[] for _ in range(offset, stop)]
+
+    def iter_rows(self, values_only: bool = True) -> Iterator[tuple]:
+        """Yield rows as tuples of cell values (like numbers_parser)."""
+        for chunk in self.iter_chunks():
+            yield from map(tuple, chunk)
+
+    def rows(self, values_only: bool = True) -> list[list]:
+        return [row for chunk in self.iter_chunks() for row in chunk]
+
+
+class CachedSheet:
+    def __init__(self, name: str, tables: dict[str, CachedTable]):
+        self.name = name
+        self.tables = tables
+
+
+class CachedWorkbook:
+    """Read-only stand-in for ``numbers_parser.Document``."""
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        with open(path / "manifest.json") as f:
+            manifest = json.load(f)
+        self.sheets = {
+            sheet["name"]: CachedSheet(
+                sheet["name"],
+                {
+                    table["name"]: CachedTable(table["name"], path / table["dir"])
+                    for table in sheet["tables"]
+                },
+            )
+            for sheet in manifest["sheets"]
+        }
+
+
+# ---------------------------------------------------------------------------
+# Cache build
+# ---------------------------------------------------------------------------
+
+
+def _write_table(rows: Iterable, n_rows: int, n_cols: int, path: Path) -> None:
+    """Encode rows straight into on-disk arrays, one row at a time."""
+    path.mkdir(parents=True)
+    open_memmap = np.lib.format.open_memmap
+    tags = open_memmap(path / "tags.npy", "w+", np.uint8, (n_cols, n_rows))
+    nums = open_memmap(path / "nums.npy", "w+", np.float64, (n_cols, n_rows))
+    text = open_memmap(path / "text.npy", "w+", np.int32, (n_cols, n_rows))
+    text[:] = -1
+    strings: dict[str, int] = {}
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            tags[c, r], nums[c, r], text[c, r] = _encode(value, strings)
+    for array in (tags, nums, text):
+        array.flush()
+    del tags, nums, text
+    with open(path / "strings.json", "w") as f:
+        json.dump(list(strings), f)
+
+
+def _build(source: Path, target: Path) -> None:
+    """Parse ``source`` with numbers_parser and write the cache to ``target``."""
+    from numbers_parser import Document
+
+    doc = Document(str(source))
+    root = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}."))
+    try:
+        sheets = []
+        for s, sheet in enumerate(doc.sheets):
+            tables = []
+            for t, table in enumerate(sheet.tables):
+                directory = f"s{s}_t{t}"
+                _write_table(
+                    table.iter_rows(values_only=True),
+                    table.num_rows,
+                    table.num_cols,
+                    root / directory,
+                )
+                tables.append({"name": table.name, "dir": directory})
+            sheets.append({"name": sheet.name, "tables": tables})
+        with open(root / "manifest.json", "w") as f:
+            json.dump(
+                {"version": CACHE_VERSION, "source": source.name, "sheets": sheets},
+                f,
+                indent=2,
+            )
+        os.replace(root, target)
+    except BaseException:
+        shutil.rmtree(root, ignore_errors=True)
+        raise
+
+
+def _prune(keep: Path) -> None:
+    """Remove all but the most recently used cache entries."""
+    entries = sorted(
+        (p for p in keep.parent.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in entries[KEEP_ENTRIES:]:
+        if old != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def load_workbook(path: str | Path, use_cache: bool = True) -> CachedWorkbook:
+    """Open a ``.numbers`` workbook, parsing it only if its content changed.
+
+    Raises FileNotFoundError if ``path`` does not exist. With
+    ``use_cache=False`` the workbook is re-parsed and the cache rewritten.
+    """
+    source = Path(path)
+    if not source.exists():
+        raise FileNotFoundError(path)
+    fingerprint = file_fingerprint(source)
+    target = state_path(CACHE_DIR) / f"{fingerprint[:32]}-v{CACHE_VERSION}"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.is_dir() and not use_cache:
+        shutil.rmtree(target)
+    if target.is_dir():
+        print(f"  Using cached extraction of {source.name} ({fingerprint[:12]})")
+        os.utime(target)
+    else:
+        print(f"  Parsing {source.name} (first run for this version)...")
+        _build(source, target)
+        _prune(target)
+    return CachedWorkbook(target, fingerprint)
@@ -0,0 +1,123 @@
+import { afterEach, beforeEach, describe, expect, it, vi } from "vitest"
+
+// Mock server-only (throws at import time in non-Next.js env)
+vi.mock("server-only", () => ({}))
+
+vi.mock("../logger", () => ({
+  default: {
+    child: () => ({
+      info: vi.fn(),
+      warn: vi.fn(),
+      debug: vi.fn(),
+      error: vi.fn(),
+    }),
+  },
+}))
+
+// ---------------------------------------------------------------------------
+// Fake NocoDB: the settings table answers the table-id pointer lookup, every
+// other table returns an empty page. Tests set `pointer` / `settingsDown`.
+// ---------------------------------------------------------------------------
+
+let pointer: string | null = null
+let settingsDown = false
+const fetchMock = vi.fn(async (url: string) => {
+  if (url.includes("/tables/env_settings/records")) {
+    if (settingsDown) {
+      return { ok: false, status: 503, text: async () => "unavailable" }
+    }
+    const list = pointer ? [{ key: "table_id:options", value: pointer }] : []
+    return { ok: true, json: async () => ({ list, pageInfo: { isLastPage: true } }) }
+  }
+  return { ok: true, json: async () => ({ list: [], pageInfo: { isLastPage: true } }) }
+})
+
+/** Table id the next listRecords("options") call is sent to. */
+async function optionsTableId(listRecords: typeof import("../nocodb").listRecords) {
+  fetchMock.mockClear()
+  await listRecords("options")
+  const urls = fetchMock.mock.calls.map(([url]) => url)
+  const read = urls.find((url) => !url.includes("/tables/env_settings/"))
+  return read?.match(/\/tables\/([^/]+)\/records/)?.[1]
+}
+
+/** Number of pointer lookups made since the last optionsTableId call. */
+function lookups() {
+  return fetchMock.mock.calls.filter(([url]) => url.includes("/tables/env_settings/")).length
+}
+
+async function loadClient() {
+  vi.resetModules()
+  return (await import("../nocodb")).listRecords
+}
+
+beforeEach(() => {
+  pointer = null
+  settingsDown = false
+  vi.useFakeTimers()
+  vi.stubEnv("NOCODB_BASE_URL", "http://nocodb.test")
+  vi.stubEnv("NOCODB_API_TOKEN", "token")
+  vi.stubEnv("NOCODB_TABLE_OPTIONS", "env_options")
+  vi.stubEnv("NOCODB_TABLE_SETTINGS", "env_settings")
+  vi.stubGlobal("fetch", fetchMock)
+})
+
+afterEach(() => {
+  vi.useRealTimers()
+  vi.unstubAllEnvs()
+  vi.unstubAllGlobals()
+})
+
+// ============================================================================
+// Table ID resolution
+// ============================================================================
+describe("resolveTableId", () => {
+  it("uses the settings pointer over the env table id", async () => {
+    pointer = "shadow_options"
+    const listRecords = await loadClient()
+    expect(await optionsTableId(listRecords)).toBe("shadow_options")
+  })
+
+  it("falls back to the env table id without a pointer", async () => {
+    const listRecords = await loadClient()
+    expect(await optionsTableId(listRecords)).toBe("env_options")
+  })
+
+  it("falls back to the env table id when the first lookup fails", async () => {
+    settingsDown = true
+    const listRecords = await loadClient()
+    expect(await optionsTableId(listRecords)).toBe("env_options")
+  })
+
+  it("caches pointers for the TTL, then reads them again", async () => {
+    pointer = "shadow_1"
+    const listRecords = await loadClient()
+    expect(await optionsTableId(listRecords)).toBe("shadow_1")
+
+    pointer = "shadow_2"
+    vi.advanceTimersByTime(59_000)
+    expect(await optionsTableId(listRecords)).toBe("shadow_1")
+    expect(lookups()).toBe(0)
+
+    vi.advanceTimersByTime(2_000)
+    expect(await optionsTableId(listRecords)).toBe("shadow_2")
+    expect(lookups()).toBe(1)
+  })
+
+  it("keeps the last good pointers on failure and does not cache it", async () => {
+    pointer = "shadow_1"
+    const listRecords = await loadClient()
+    expect(await optionsTableId(listRecords)).toBe("shadow_1")
+
+    // Expired, and the lookup fails: stay on the last known table, not env
+    vi.advanceTimersByTime(61_000)
+    settingsDown = true
+    expect(await optionsTableId(listRecords)).toBe("shadow_1")
+
+    // The failure is not cached: the very next call retries
+    settingsDown = false
+    pointer = "shadow_2"
+    expect(await optionsTableId(listRecords)).toBe("shadow_2")
+    expect(lookups()).toBe(1)
+  })
+})
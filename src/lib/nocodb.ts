@@ -65,6 +65,72 @@ async function nocodbFetch<T>(path: string, init?: RequestInit): Promise<T> {
   return response.json() as Promise<T>
 }
 
+// ---------------------------------------------------------------------------
+// Table ID Resolution
+// ---------------------------------------------------------------------------
+// Tables reloaded with the scripts' --shadow mode are swapped in by writing
+// the new table id to a "table_id:<name>" row in the settings table. Those
+// rows take precedence over the env table IDs. They are cached briefly; the
+// scripts keep retired tables readable for longer than this TTL.
+//
+// A failed lookup is not cached: it falls back to the last pointers that
+// were read successfully (after a swap the env IDs name a retired table) and
+// the next call tries again.
+// ---------------------------------------------------------------------------
+
+const TABLE_ID_TTL_MS = 60_000
+const TABLE_ID_PREFIX = "table_id:"
+
+type TableIdOverrides = Partial<Record<TableName, string>>
+
+let tableIdOverrides: {
+  ids: Promise<TableIdOverrides>
+  expires: number
+} | null = null
+let lastKnownTableIds: TableIdOverrides = {}
+
+async function fetchTableIdOverrides(): Promise<TableIdOverrides> {
+  const ids: TableIdOverrides = {}
+  const searchParams = new URLSearchParams({
+    where: `(key,like,${TABLE_ID_PREFIX}%)`,
+    fields: "key,value",
+    limit: "100",
+  })
+  const page = await nocodbFetch<NocoDBListResponse<{ key: string; value: string }>>(
+    `/api/v2/tables/${TABLE_IDS.settings}/records?${searchParams}`,
+  )
+  for (const row of page.list) {
+    if (row.key?.startsWith(TABLE_ID_PREFIX) && row.value) {
+      ids[row.key.slice(TABLE_ID_PREFIX.length) as TableName] = row.value
+    }
+  }
+  return ids
+}
+
+async function resolveTableId(table: TableName): Promise<string> {
+  // The settings table holds the pointers, so it is never swapped
+  if (table === "settings") return TABLE_IDS.settings
+
+  if (!tableIdOverrides || tableIdOverrides.expires <= Date.now()) {
+    const ids: Promise<TableIdOverrides> = fetchTableIdOverrides().then(
+      (fresh) => {
+        lastKnownTableIds = fresh
+        return fresh
+      },
+      (error) => {
+        // Expire the failed entry so the next call retries the lookup
+        if (tableIdOverrides?.ids === ids) tableIdOverrides = null
+        const message = error instanceof Error ? error.message : "Unknown error"
+        log.warn({ err: message }, "table id lookup failed, using last known table IDs")
+        return lastKnownTableIds
+      },
+    )
+    tableIdOverrides = { ids, expires: Date.now() + TABLE_ID_TTL_MS }
+  }
+  const ids = await tableIdOverrides.ids
+  return ids[table] ?? TABLE_IDS[table]
+}
+
 // ---------------------------------------------------------------------------
 // Exported Functions
 // ---------------------------------------------------------------------------
@@ -79,7 +145,7 @@ export async function listRecords<T>(
   table: TableName,
   params?: ListParams,
 ): Promise<NocoDBListResponse<T>> {
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   const searchParams = new URLSearchParams()
 
   if (params?.where) searchParams.set("where", params.where)
@@ -134,7 +200,7 @@ export async function getRecord<T>(
   table: TableName,
   rowId: number,
 ): Promise<T> {
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   return nocodbFetch<T>(`/api/v2/tables/${tableId}/records/${rowId}`)
 }
 
@@ -145,7 +211,7 @@ export async function createRecord<T>(
   table: TableName,
   data: Partial<T>,
 ): Promise<T> {
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   return nocodbFetch<T>(`/api/v2/tables/${tableId}/records`, {
     method: "POST",
     body: JSON.stringify(data),
@@ -160,7 +226,7 @@ export async function updateRecord<T>(
   rowId: number,
   data: Partial<T>,
 ): Promise<T> {
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   return nocodbFetch<T>(`/api/v2/tables/${tableId}/records`, {
     method: "PATCH",
     body: JSON.stringify({ Id: rowId, ...data }),
@@ -179,7 +245,7 @@ export async function createRecords<T>(
 ): Promise<T[]> {
   if (records.length === 0) return []
 
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   return nocodbFetch<T[]>(`/api/v2/tables/${tableId}/records`, {
     method: "POST",
     body: JSON.stringify(records),
@@ -205,7 +271,7 @@ export async function updateRecords<T>(
 ): Promise<T[]> {
   if (records.length === 0) return []
 
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   const results: T[] = []
 
   for (let i = 0; i < records.length; i += BULK_UPDATE_BATCH_SIZE) {
@@ -236,7 +302,7 @@ export async function deleteRecords(
 ): Promise<number> {
   if (ids.length === 0) return 0
 
-  const tableId = TABLE_IDS[table]
+  const tableId = await resolveTableId(table)
   let deleted = 0
 
   for (let i = 0; i < ids.length; i += BULK_UPDATE_BATCH_SIZE) {